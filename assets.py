@@ -0,0 +1,125 @@
+'''
+assets.py
+Description:
+    Image assets for the phase screens. Files are looked up in the assets/ folder next to this
+    module (or in the folder named by MAFIA_ASSETS), so the game no longer depends on one
+    developer's C:/ paths. Each image is decoded and scaled once and kept as a PhotoImage in
+    an LRU cache keyed by (asset, target size), bounded by max_entries.
+
+    MafiaGameApp calls cache.preload(root) at startup. A background thread reads the files, and
+    the Tk loop decodes and scales one image per idle tick, because PhotoImage may only be made
+    on the Tk thread. By the time the first phase starts, show_image is a cache hit with no disk
+    or decode time. An asset that is not cached yet is loaded on the spot.
+'''
+
+from collections import OrderedDict
+from tracing import tracer
+import base64
+import os
+import threading
+import tkinter as tk
+
+
+ASSET_DIR = os.environ.get("MAFIA_ASSETS") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+PHASE_IMAGES = ("day_phase.png", "night_phase.png")
+DEFAULT_SIZE = (300, 300) # Largest width and height a phase image is shown at
+PRELOAD_POLL_MS = 20 # How often the Tk loop checks for files the reader thread has finished
+
+
+def asset_path(name):
+    """Absolute path of an asset file."""
+    return os.path.join(ASSET_DIR, name)
+
+
+def read_asset(name):
+    """The asset's bytes, base64 encoded the way PhotoImage(data=...) takes them."""
+    with open(asset_path(name), "rb") as f:
+        return base64.b64encode(f.read())
+
+
+def subsample_factors(width, height, size):
+    """Integer (x, y) subsample factors that fit a width x height image inside size, keeping
+    its aspect ratio. Images already smaller than size are left as they are."""
+    max_width, max_height = size
+    scale = min(max_width / width, max_height / height)
+    if scale >= 1:
+        return 1, 1
+    new_width, new_height = int(width * scale), int(height * scale)
+    return max(1, int(width / max(1, new_width))), max(1, int(height / max(1, new_height)))
+
+
+class AssetCache:
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries # Most scaled images kept at once
+        self.images = OrderedDict() # (name, size) -> PhotoImage, least recently used first
+        self.raw = {} # name -> base64 file data, or the OSError reading it raised
+        self.master = None # Tk widget the images belong to (None = the default root)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, size=DEFAULT_SIZE):
+        """The asset scaled to fit size, decoded at most once while it stays cached.
+        Raises OSError or tk.TclError if the file is missing or not an image."""
+        key = (name, size)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self.load(name, size)
+        self.images[key] = image
+        if len(self.images) > self.max_entries:
+            self.images.popitem(last=False)
+        return image
+
+    def load(self, name, size):
+        """Decode and scale one asset (Tk thread only)."""
+        data = self.raw.get(name)
+        if data is None:
+            try:
+                data = self.raw[name] = read_asset(name)
+            except OSError as e:
+                self.raw[name] = e # Don't go back to the disk for a missing file on every phase
+                raise
+        if isinstance(data, OSError):
+            raise data
+        with tracer.span("decode_image", "image", asset=name):
+            image = tk.PhotoImage(master=self.master, data=data)
+            x, y = subsample_factors(image.width(), image.height(), size)
+            return image.subsample(x, y) if (x, y) != (1, 1) else image
+
+    def preload(self, root, names=PHASE_IMAGES, size=DEFAULT_SIZE):
+        """Read names on a background thread, then decode and scale them in the Tk loop's idle time."""
+        self.master = root
+        names = list(names)
+        pending = list(names) # Still to decode; only touched by the Tk thread
+
+        def read_all():
+            for name in names:
+                try:
+                    self.raw[name] = read_asset(name)
+                except OSError as e:
+                    self.raw[name] = e
+
+        def decode_ready():
+            # One image per tick, so the menu stays responsive while assets load
+            if pending and pending[0] in self.raw:
+                name = pending.pop(0)
+                try:
+                    self.get(name, size)
+                except (OSError, tk.TclError):
+                    pass # Reported by show_image when the screen needs it
+            if pending:
+                root.after(PRELOAD_POLL_MS, decode_ready)
+
+        threading.Thread(target=read_all, name="asset-reader", daemon=True).start()
+        root.after(PRELOAD_POLL_MS, decode_ready)
+
+    def clear(self):
+        self.images.clear()
+        self.raw.clear()
+
+
+cache = AssetCache()
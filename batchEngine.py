@@ -0,0 +1,206 @@
+'''
+batchEngine.py
+Description:
+    Struct-of-arrays version of the GameEngine rules that advances thousands of AI-only games
+    in lockstep with NumPy. N games of P players are stored as arrays:
+        roles      (N, P) int8   role code of every seat (see ROLE_CODES)
+        alive      (N, P) bool   alive mask
+        protected  (N, P) bool   doctor protection for the current night
+        votes      (N, P) int    seat each player voted for this phase (-1 = no vote)
+        active     (N,)   bool   games that have not finished yet
+    Day votes, the mafia's target pick, doctor protection, random events and the win conditions
+    from GameEngine.check_win_conditions each run as one vectorized step over the whole batch.
+
+    Every player follows the easy_ai policy (a uniform pick among the valid targets), so the
+    results match simulation.play_game with an all-easy mix in distribution:
+      - vote tallies use a single bincount over (game, target) pairs;
+      - ties in the day vote and in the mafia vote are broken uniformly at random, like the
+        random.choice over tied candidates in resolve_day_votes/choose_mafia_target;
+      - random events use the same 1-in-6 roll per event and hit the second alive seat.
+
+Usage:
+    python batchEngine.py --players 10 --games 100000
+'''
+
+from gameEngine import GameEngine, RANDOM_EVENTS
+from simulation import SimulationTally, format_report, MAX_ROUNDS
+import argparse
+import numpy as np
+import time
+
+
+VILLAGER, MAFIA, DOCTOR, DETECTIVE = 0, 1, 2, 3
+ROLE_CODES = {"villager": VILLAGER, "mafia": MAFIA, "doctor": DOCTOR, "detective": DETECTIVE}
+ROLE_NAMES = {code: name for name, code in ROLE_CODES.items()}
+NO_WINNER, VILLAGE_WINS, MAFIA_WINS = 0, 1, 2
+TEAM_NAMES = {VILLAGE_WINS: "Village", MAFIA_WINS: "Mafia"}
+
+
+class BatchGameEngine:
+    def __init__(self, num_games, num_players, random_events=True, seed=None):
+        self.num_games = num_games # N, games advanced together
+        self.num_players = num_players # P, seats per game
+        self.random_events = random_events
+        self.rng = np.random.default_rng(seed)
+
+        self.roles = np.zeros((num_games, num_players), dtype=np.int8)
+        self.alive = np.ones((num_games, num_players), dtype=bool)
+        self.protected = np.zeros((num_games, num_players), dtype=bool)
+        self.votes = np.full((num_games, num_players), -1, dtype=np.int64)
+        self.active = np.ones(num_games, dtype=bool)
+        self.winner = np.full(num_games, NO_WINNER, dtype=np.int8)
+        self.rounds = np.zeros(num_games, dtype=np.int64)
+
+        self.deaths_by_role = np.zeros(len(ROLE_CODES), dtype=np.int64)
+        self.deaths_by_cause = {}
+        self._rows = np.arange(num_games)
+
+    """ =============================================================== SETUP ======================================================================= """
+
+    def assign_roles(self):
+        """Give every game a random permutation of the role list GameEngine.assignRoles would use."""
+        distribution = GameEngine(self.num_players).role_distribution()
+        base = np.concatenate([np.full(count, ROLE_CODES[role], dtype=np.int8) for role, count in distribution.items()])
+        permutations = self.rng.random((self.num_games, self.num_players)).argsort(axis=1)
+        self.roles = base[permutations]
+
+    """ =============================================================== VECTOR HELPERS ======================================================================= """
+
+    def sample_targets(self, voters, candidates, exclude_self=True):
+        """For every voter (N, P mask) pick a seat uniformly from its game's candidate mask,
+        leaving the voter out when exclude_self is set. Returns (N, P) seats, -1 where no pick."""
+        # Candidate seats first (in seat order), the rest after: order[g, r] is the r-th candidate of game g
+        order = np.argsort(~candidates, axis=1, kind="stable")
+        num_candidates = candidates.sum(axis=1, keepdims=True)
+        own_rank = np.cumsum(candidates, axis=1) - 1
+        voter_is_candidate = candidates & exclude_self
+
+        choices = num_candidates - voter_is_candidate
+        valid = voters & (choices > 0)
+        rank = np.floor(self.rng.random(voters.shape) * choices).astype(np.int64)
+        # Skip over the voter's own slot in the candidate ordering
+        rank += voter_is_candidate & (rank >= own_rank)
+        rank = np.minimum(rank, self.num_players - 1)
+
+        picks = np.take_along_axis(order, rank, axis=1)
+        return np.where(valid, picks, -1)
+
+    def tally(self, picks):
+        """Count votes per seat for every game with one bincount. Returns (N, P) counts."""
+        cast = picks >= 0
+        flat = (self._rows[:, None] * self.num_players + picks)[cast]
+        return np.bincount(flat, minlength=self.num_games * self.num_players).reshape(self.num_games, self.num_players)
+
+    def plurality(self, counts):
+        """Seat with the most votes in every game, ties broken uniformly at random; -1 if no votes."""
+        top = counts.max(axis=1, keepdims=True)
+        tied = (counts == top) & (top > 0)
+        # A random key per tied seat makes argmax a uniform draw among the tied seats
+        keys = np.where(tied, self.rng.random(counts.shape), -1.0)
+        winners = keys.argmax(axis=1)
+        return np.where(tied.any(axis=1), winners, -1)
+
+    def kill(self, games, seats, cause):
+        """Kill seats[i] in games[i] (boolean mask over games, seat per game)."""
+        rows = self._rows[games]
+        cols = seats[games]
+        newly_dead = self.alive[rows, cols]
+        rows, cols = rows[newly_dead], cols[newly_dead]
+        self.alive[rows, cols] = False
+        self.deaths_by_role += np.bincount(self.roles[rows, cols], minlength=len(ROLE_CODES))
+        self.deaths_by_cause[cause] = self.deaths_by_cause.get(cause, 0) + len(rows)
+
+    """ =============================================================== PHASES ======================================================================= """
+
+    def day_vote(self):
+        """Every alive player in an active game votes for another alive player; the plurality is eliminated."""
+        voters = self.alive & self.active[:, None]
+        self.votes = self.sample_targets(voters, self.alive)
+        eliminated = self.plurality(self.tally(self.votes))
+        self.kill(self.active & (eliminated >= 0), eliminated, "vote")
+
+    def night(self):
+        """Mafia vote on a target, the doctor protects someone, and the kill resolves unless protected."""
+        active = self.active[:, None]
+        mafia_votes = self.sample_targets(self.alive & active & (self.roles == MAFIA), self.alive)
+        target = self.plurality(self.tally(mafia_votes))
+
+        # The doctor may protect anyone alive, including themselves
+        doctor_picks = self.sample_targets(self.alive & active & (self.roles == DOCTOR), self.alive, exclude_self=False)
+        self.protected[:] = False
+        games, doctors = np.nonzero(doctor_picks >= 0)
+        self.protected[games, doctor_picks[games, doctors]] = True
+
+        has_target = self.active & (target >= 0)
+        saved = np.zeros(self.num_games, dtype=bool)
+        saved[has_target] = self.protected[self._rows[has_target], target[has_target]]
+        self.kill(has_target & ~saved, target, "mafia")
+        self.protected[:] = False
+
+    def random_event(self):
+        """Roll the 1-in-6 random events; the three disasters kill the second alive seat."""
+        roll = self.rng.integers(0, 6, size=self.num_games)
+        second_alive = np.argsort(~self.alive, axis=1, kind="stable")[:, 1]
+        for code, event in enumerate(RANDOM_EVENTS):
+            if event == "suspicious_action":
+                continue
+            self.kill(self.active & (roll == code), second_alive, event)
+
+    def check_win_conditions(self):
+        """Vectorized GameEngine.check_win_conditions: finish every game where a side has won."""
+        num_mafia = (self.alive & (self.roles == MAFIA)).sum(axis=1)
+        num_town = (self.alive & ((self.roles == VILLAGER) | (self.roles == DOCTOR))).sum(axis=1)
+        village = self.active & (num_mafia == 0)
+        mafia = self.active & ~village & (num_mafia >= num_town)
+        self.winner[village] = VILLAGE_WINS
+        self.winner[mafia] = MAFIA_WINS
+        self.active &= ~(village | mafia)
+
+    def run(self):
+        """Play every game in the batch to the end."""
+        self.assign_roles()
+        for _ in range(MAX_ROUNDS):
+            if not self.active.any():
+                break
+            self.rounds[self.active] += 1
+            self.day_vote()
+            self.check_win_conditions()
+            self.night()
+            self.check_win_conditions()
+            if self.random_events:
+                self.random_event()
+                self.check_win_conditions()
+        return self
+
+    def to_tally(self):
+        """Summarize the finished batch as a SimulationTally so it reports like simulation.py."""
+        tally = SimulationTally()
+        tally.games = self.num_games
+        for code, team in TEAM_NAMES.items():
+            count = int((self.winner == code).sum())
+            if count:
+                tally.wins[team] = count
+        rounds, counts = np.unique(self.rounds, return_counts=True)
+        tally.rounds.update({int(r): int(c) for r, c in zip(rounds, counts)})
+        tally.deaths_by_role.update({ROLE_NAMES[code]: int(n) for code, n in enumerate(self.deaths_by_role) if n})
+        tally.deaths_by_cause.update({cause: n for cause, n in self.deaths_by_cause.items() if n})
+        return tally
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run easy-AI Mafia games in lockstep with NumPy.")
+    parser.add_argument("--players", type=int, default=10, help="Players per game")
+    parser.add_argument("--games", type=int, default=100000, help="Number of games in the batch")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the batch RNG")
+    parser.add_argument("--no-random-events", action="store_true", help="Skip the multiplayer random events")
+    args = parser.parse_args(argv)
+
+    if args.players < 3:
+        parser.error("A game needs at least 3 players.")
+    start = time.perf_counter()
+    batch = BatchGameEngine(args.games, args.players, not args.no_random_events, args.seed).run()
+    print(format_report(batch.to_tally(), time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+'''
+benchmark.py
+Description:
+    Benchmark suite for the engine's hot paths, run headless (no Tk window). Each case is timed
+    at 10, 100, 1,000 and 100,000 players:
+        assign_roles        GameEngine.assignRoles on a fresh table
+        day_vote            a full AI day vote (every alive player votes) and its resolution
+        night_resolution    AI night actions, the mafia's pick and resolve_night
+        check_win           check_win_conditions
+        mafia_ally_list     mafia_ally_list for one mafia member
+        snapshot / restore  gameSnapshot.snapshot and restore of the whole game state
+        state_fork          GameState.fork of the game mid day vote, against
+        state_deepcopy      copy.deepcopy of the same state (player_list and the votes)
+        ai_<level>_<role>   one easy/normal/hard AI target pick for each role
+    plus whole-game throughput (games/sec) per difficulty on a 10 player table, the NumPy batch
+    engine's throughput, the cost of recording games to an event log (the same seeded games
+    played with and without an EventLogWriter, interleaved) and the bytes per Player. Results are written as JSON so runs can be
+    compared across commits.
+
+    --startup instead checks cold start: each entry point is imported in a fresh interpreter
+    with -X importtime, and the run fails (exit status 1) if one takes longer than its budget in
+    STARTUP_BUDGETS_MS or if a headless entry point pulls in tkinter.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --sizes 10,100 --quick
+    python benchmark.py --startup
+'''
+
+from gameEngine import GameEngine, DIFFICULTY_EASY, DIFFICULTY_NORMAL, DIFFICULTY_HARD
+from player import player_size
+from gameSnapshot import snapshot, restore
+from gameState import GameState
+from eventLog import EventLogWriter
+from seeding import game_rng
+import simulation
+import argparse
+import copy
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+DEFAULT_SIZES = [10, 100, 1000, 100000]
+DIFFICULTIES = {"easy": DIFFICULTY_EASY, "normal": DIFFICULTY_NORMAL, "hard": DIFFICULTY_HARD}
+# Cold import budget (ms) per entry point: the module's cumulative -X importtime, interpreter startup excluded
+STARTUP_BUDGETS_MS = {"mafia": 15, "simulation": 60, "main": 100}
+HEADLESS_MODULES = ("mafia", "simulation") # Must start without tkinter
+
+
+def make_game(num_players, assign=True):
+    """A headless table of num_players players, with roles assigned unless assign is False."""
+    game = GameEngine(num_players)
+    for seat in range(num_players):
+        game.add_player(f"player{seat}")
+    if assign:
+        game.assignRoles()
+    return game
+
+
+def measure(run, setup=None, min_time=0.2, max_calls=1000):
+    """Call run(state) repeatedly, each time on a fresh setup() state, until min_time seconds
+    of run time or max_calls calls. Only run is timed. Returns per-call statistics in seconds."""
+    samples = []
+    total = 0.0
+    while total < min_time and len(samples) < max_calls:
+        state = setup() if setup else None
+        start = time.perf_counter()
+        run(state)
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        total += elapsed
+    return {
+        "calls": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": total / len(samples),
+    }
+
+
+def engine_cases(num_players):
+    """(name, setup, run) for every hot path at this table size."""
+    def assign_setup():
+        return make_game(num_players, assign=False)
+
+    def day_vote(game):
+        game.resolve_day_votes(game.ai_day_votes(game.get_alive_players(), DIFFICULTY_EASY))
+
+    def night(game):
+        game.choose_mafia_target(game.ai_night_actions(DIFFICULTY_EASY))
+        game.resolve_night()
+
+    shared = make_game(num_players)
+    shared.role_beliefs() # Built (and NumPy imported) up front, not inside the first ai_hard call
+    mafia_name = shared.first_alive_with_role("mafia").name
+    saved = snapshot(shared)
+    votes = shared.new_tally()
+    for voter in shared.get_alive_players()[::2]:
+        votes.cast(mafia_name, voter.name)
+    state = GameState.from_engine(shared, votes)
+    cases = [
+        ("assign_roles", assign_setup, lambda game: game.assignRoles()),
+        ("day_vote", lambda: make_game(num_players), day_vote),
+        ("night_resolution", lambda: make_game(num_players), night),
+        ("check_win", None, lambda _: shared.check_win_conditions()),
+        ("mafia_ally_list", None, lambda _: shared.mafia_ally_list(mafia_name)),
+        ("snapshot", None, lambda _: snapshot(shared)),
+        ("restore", None, lambda _: restore(saved)),
+        ("state_fork", None, lambda _: state.fork()),
+        ("state_deepcopy", None, lambda _: copy.deepcopy((shared.player_list, votes))),
+    ]
+
+    alive = shared.get_alive_players()
+    for level_name, level in DIFFICULTIES.items():
+        for role in ("mafia", "doctor", "detective", "villager"):
+            player = shared.first_alive_with_role(role) or alive[0]
+            targets = [p for p in alive if p is not player]
+            cases.append((f"ai_{level_name}_{role}", None,
+                          lambda _, level=level, role=role, player=player, targets=targets:
+                          shared.ai_choice(level, role, player, targets)))
+    return cases
+
+
+def run_engine_benchmarks(sizes, min_time):
+    results = []
+    for num_players in sizes:
+        # Big tables rebuild an expensive setup per call, so cap their repeats
+        max_calls = 1000 if num_players <= 1000 else 5
+        for name, setup, run in engine_cases(num_players):
+            stats = measure(run, setup, min_time, max_calls)
+            results.append({"name": name, "players": num_players, **stats})
+            print(f"{name:<22} {num_players:>7} players  {stats['median'] * 1e6:>12.1f} us/call  ({stats['calls']} calls)")
+    return results
+
+
+def run_throughput_benchmarks(min_time, num_players=10):
+    """Whole AI-only games per second for each difficulty, single process."""
+    results = []
+    for level_name, level in DIFFICULTIES.items():
+        games = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < min_time * 5:
+            simulation.play_game(num_players, {level: 1.0})
+            games += 1
+        rate = games / (time.perf_counter() - start)
+        results.append({"difficulty": level_name, "players": num_players, "games": games, "games_per_sec": rate})
+        print(f"whole game ({level_name:<6}) {num_players:>4} players  {rate:>12,.0f} games/sec")
+
+    try:
+        from batchEngine import BatchGameEngine
+    except ImportError:
+        print("batch engine skipped (NumPy is not installed)")
+        return results
+    batch_games = 20000
+    start = time.perf_counter()
+    BatchGameEngine(batch_games, num_players, seed=0).run()
+    rate = batch_games / (time.perf_counter() - start)
+    results.append({"difficulty": "easy (batch)", "players": num_players, "games": batch_games, "games_per_sec": rate})
+    print(f"whole game (batch ) {num_players:>4} players  {rate:>12,.0f} games/sec")
+    return results
+
+
+def run_event_log_benchmarks(min_time, num_players=10):
+    """Per-game time with the event log off and on, for easy-only games and simulation.py's default
+    mix. Game i is played twice from the same seed, alternating which run goes first, and the
+    overhead is the median of the per-game on/off ratios so a stall in either run doesn't skew it."""
+    results = []
+    for mix_name in ("easy=1", simulation.DEFAULT_MIX):
+        mix = simulation.parse_mix(mix_name)
+        writer = EventLogWriter(io.BytesIO())
+        times = {False: [], True: []}
+        total = 0.0
+        while total < min_time * 10:
+            index = len(times[False])
+            for logged in ((False, True) if index % 2 else (True, False)):
+                start = time.perf_counter()
+                simulation.play_game(num_players, mix, True, writer if logged else None, game_rng(0, index))
+                elapsed = time.perf_counter() - start
+                times[logged].append(elapsed)
+                total += elapsed
+        writer.close()
+        off, on = statistics.median(times[False]), statistics.median(times[True])
+        overhead = statistics.median(map(float.__truediv__, times[True], times[False])) - 1
+        results.append({"mix": mix_name, "players": num_players, "games": len(times[False]), "off_median": off,
+                        "on_median": on, "overhead_pct": overhead * 100})
+        print(f"event log ({mix_name}) {num_players:>4} players  {off * 1e6:>8.1f} us/game off, {on * 1e6:.1f} on  ({overhead:+.1%})")
+    return results
+
+
+def import_profile(module):
+    """Import module in a fresh interpreter with -X importtime.
+    Returns (cumulative import time of module in ms, names of every module imported)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    total, loaded = None, set()
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue # The header line
+        loaded.add(name.strip())
+        if name.strip() == module:
+            total = int(cumulative) / 1000
+    return total, loaded
+
+
+def run_startup_benchmarks(runs=5):
+    """Best-of-runs cold import time for each entry point, checked against STARTUP_BUDGETS_MS.
+    Returns (results, failure messages)."""
+    results, failures = [], []
+    for module, budget in STARTUP_BUDGETS_MS.items():
+        import_profile(module) # Warm-up run so .pyc compilation is not counted
+        profiles = [import_profile(module) for _ in range(runs)]
+        best = min(total for total, _ in profiles)
+        loaded = profiles[0][1]
+        results.append({"module": module, "import_ms": best, "budget_ms": budget, "modules_loaded": len(loaded)})
+        print(f"import {module:<12} {best:>8.1f} ms  (budget {budget} ms, {len(loaded)} modules)")
+        if best > budget:
+            failures.append(f"import {module} took {best:.1f} ms, over its {budget} ms budget")
+        if module in HEADLESS_MODULES and "tkinter" in loaded:
+            failures.append(f"import {module} loads tkinter")
+    return results, failures
+
+
+def git_revision():
+    """Short commit hash of the tree being benchmarked, if git is available."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Mafia engine's hot paths.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated player counts")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--quick", action="store_true", help="Shorter timing loops")
+    parser.add_argument("--startup", action="store_true", help="Only check cold start import times against their budgets")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        results, failures = run_startup_benchmarks()
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({"meta": {"revision": git_revision(), "python": platform.python_version()},
+                           "startup": results}, f, indent=2)
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if failures:
+            sys.exit(1)
+        return results
+
+    min_time = 0.05 if args.quick else 0.2
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "bytes_per_player": player_size(),
+        },
+        "engine": run_engine_benchmarks(sizes, min_time),
+        "throughput": run_throughput_benchmarks(min_time),
+        "event_log": run_event_log_benchmarks(min_time),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+'''
+eventLog.py
+Description:
+    Append-only binary log of every game action, compact enough to keep millions of simulated
+    games on disk. EventLogWriter turns each game event into a record of a few bytes: a one-byte
+    event code followed by one-byte arguments (seat numbers, role and cause codes), so no names
+    or strings are stored. Seats are the player's index in player_list. The engine calls the
+    writer directly where it emits each event (GameEngine.event_log) rather than through its
+    listeners, and a record is one list.extend of small ints; the list becomes bytes once per
+    segment (struct.pack_into into a bytearray costs ~3x as much per record).
+
+    Records are collected in memory and written in segments: once a segment's raw size reaches
+    segment_bytes (1 MiB) it is compressed with zlib and appended to the output as
+        b"ML" | format version (1 byte) | raw length (u32) | compressed length (u32) | zlib data
+    Segments are self-contained, so logs can be written by several processes and concatenated
+    (simulation.py workers return their segments and the parent appends them to one file).
+
+    A 10-player simulated game logs about 100 raw bytes, ~44 compressed. Recording costs the
+    median game ~4% of simulation.py's default mix and ~12% of an easy-only game, which is only
+    ~200 us of play (python benchmark.py plays the same seeded games with the log on and off).
+    Most of it is the writer calls themselves and the name -> seat lookups of the ballots. zlib
+    level 1 is used because level 6 would add as much again for a 20% smaller file.
+
+Records (code: arguments), as read_games yields them:
+    GAME_START: players             ROLES: players, then one byte per seat: role | attribute << 3 | difficulty << 5
+    VOTES: ballots, then voter, candidate per ballot, then the seat eliminated
+    MAFIA_VOTES: ballots, then voter, candidate per ballot
+    MAFIA_TARGET: seat              PROTECT / INVESTIGATE: doctor or detective, target
+    NIGHT_RESULT: outcome, seat     RANDOM_EVENT: event, seat
+    PHASE: phase, round (2 bytes)   GAME_OVER: winner
+    NO_SEAT (255) stands for "nobody". The writer stores less than that and read_games fills the
+    rest in: no record is written that the others imply. A day starts with its vote and a night
+    with its first night action (PHASE), the night's result follows from its MAFIA_TARGET and
+    PROTECT records (NIGHT_RESULT), and the deaths are the VOTES record's last seat, a "killed"
+    NIGHT_RESULT and every RANDOM_EVENT but suspicious_action. Attributes go to the first
+    villagers, as GameEngine.assignRoles gives them. Per-seat and per-ballot data is stored as
+    runs (the role codes, then the difficulties; the voters, then their candidates), written
+    without a Python loop per seat or ballot. Version 1 logs wrote all of the above plus a DEATH record
+    (seat, cause) per death; read_games still reads them, folding the deaths into the records
+    that imply them.
+
+Usage:
+    python simulation.py --players 10 --games 100000 --event-log games.mlog
+    python eventLog.py games.mlog
+'''
+
+from gameEngine import RANDOM_EVENTS
+from player import ROLE_NAMES, ROLE_VILLAGER
+from itertools import chain, repeat
+from operator import attrgetter
+import argparse
+import struct
+import zlib
+
+
+FORMAT_VERSION = 2 # 1: every record as read_games yields it; 2: no record that the others imply, per-seat data as runs
+SEGMENT_HEADER = struct.Struct("<2sBII") # Magic, format version, raw length, compressed length
+SEGMENT_MAGIC = b"ML"
+DEFAULT_SEGMENT_BYTES = 1 << 20
+NO_SEAT = 255
+MAX_SEATS = 254
+SEATS = range(MAX_SEATS)
+
+# Event codes
+GAME_START, ROLES, PHASE, VOTES, MAFIA_VOTES, MAFIA_TARGET, PROTECT, INVESTIGATE, DEATH, NIGHT_RESULT, RANDOM_EVENT, GAME_OVER = range(12)
+EVENT_NAMES = ("game_start", "roles", "phase", "votes", "mafia_votes", "mafia_target", "protect",
+               "investigate", "death", "night_result", "random_event", "game_over")
+ARG_COUNTS = (1, None, 3, None, None, 1, 2, 2, 2, 2, 2, 1) # Argument bytes per event code (None: variable)
+ITEM_BYTES = {ROLES: 2, VOTES: 2, MAFIA_VOTES: 2} # Variable records: a count byte, then this many bytes per item
+V1_ITEM_BYTES = {ROLES: 1, VOTES: 2, MAFIA_VOTES: 2}
+
+# Value tables; a value is stored as its index
+PHASES = ("day", "night")
+ATTRIBUTES = (None, "Intuition", "Suspicion Radar")
+CAUSES = ("vote", "mafia", *RANDOM_EVENTS, "unknown")
+OUTCOMES = (None, "killed", "saved")
+EVENTS = (None, *RANDOM_EVENTS)
+WINNERS = (None, "Village", "Mafia")
+VOTE_CAUSE, UNKNOWN_CAUSE = 0, len(CAUSES) - 1
+DAY, NIGHT = range(len(PHASES))
+NIGHT_CODES = (MAFIA_VOTES, MAFIA_TARGET, PROTECT, INVESTIGATE) # Records only written at night
+# Value -> code lookups for the writer
+_EVENT_CODES, _WINNER_CODES = ({value: code for code, value in enumerate(table)} for table in (EVENTS, WINNERS))
+_NAME, _ROLE_CODE = attrgetter("name"), attrgetter("role_code")
+
+
+class EventLogWriter:
+    __slots__ = ("out", "segment_bytes", "level", "codes", "names", "seat_by_name", "engine", "games", "bytes_written")
+
+    def __init__(self, out, segment_bytes=DEFAULT_SEGMENT_BYTES, level=1):
+        self.out = out # Binary file-like object the segments are appended to
+        self.segment_bytes = segment_bytes
+        self.level = level # zlib level; 1 keeps compression cheap next to the games (6 saves ~20% of the size at 7x the time)
+        self.codes = [] # Bytes of the segment being filled, as ints, turned into bytes once per segment
+        self.names = [] # Player names of the game being recorded, in seat order
+        self.seat_by_name = {}
+        self.engine = None
+        self.games = 0
+        self.bytes_written = 0
+
+    def record(self, engine):
+        """Start logging a game. Call after its players are added and before roles are assigned;
+        the game's start record is written together with its roles."""
+        players = engine.player_list
+        if len(players) > MAX_SEATS:
+            raise ValueError(f"The event log holds games of up to {MAX_SEATS} players.")
+        names = list(map(_NAME, players))
+        if names != self.names: # Simulated games reuse the same names, and so the same seat map
+            self.names = names
+            self.seat_by_name = dict(zip(names, SEATS))
+        self.engine = engine
+        self.games += 1
+        engine.event_log = self
+
+    """ =============================================================== RECORDS ======================================================================= """
+    # GameEngine calls these directly where it emits the matching event (when its event_log is set),
+    # so a record costs one call and a few list.extends: no listener chain, no per-event dict.
+    # Per-seat and per-ballot bytes come from map() over the players or ballots, not a Python loop.
+
+    def roles(self):
+        """The GAME_START and ROLES records: each seat's role, then each seat's difficulty."""
+        engine = self.engine
+        players = engine.player_list
+        codes = self.codes
+        codes.extend((GAME_START, len(players), ROLES, len(players)))
+        codes.extend(map(_ROLE_CODE, players))
+        codes.extend(map(engine.ai_difficulty.get, self.names, repeat(engine.game_difficulty, len(players))))
+
+    def day_votes(self, ballots, eliminated):
+        """The day's ballots, voter -> candidate (none for a plain count dict, which doesn't say who
+        voted for whom), and the seat they eliminated: the vote death needs no record of its own."""
+        codes, seat = self.codes, self.seat_by_name.__getitem__
+        codes.extend((VOTES, len(ballots)))
+        codes.extend(map(seat, ballots)) # The voters, then their candidates in the same order
+        codes.extend(map(seat, ballots.values()))
+        codes.append(seat(eliminated.name) if eliminated else NO_SEAT)
+
+    def mafia_votes(self, ballots, target):
+        """The mafia's ballots and the target they settled on."""
+        codes, seats = self.codes, self.seat_by_name
+        codes.extend((MAFIA_VOTES, len(ballots)))
+        for voter in ballots: # Only a few ballots: cheaper than map() here
+            codes.append(seats[voter])
+        for candidate in ballots.values():
+            codes.append(seats[candidate])
+        codes.extend((MAFIA_TARGET, seats.get(target, NO_SEAT)))
+
+    def protect(self, doctor, target):
+        seats = self.seat_by_name
+        self.codes.extend((PROTECT, seats[doctor.name], seats[target.name]))
+
+    def investigate(self, detective, target):
+        seats = self.seat_by_name
+        self.codes.extend((INVESTIGATE, seats[detective.name], seats[target.name]))
+
+    def random_event(self, event, player):
+        self.codes.extend((RANDOM_EVENT, _EVENT_CODES[event], self.seat_by_name[player.name] if player else NO_SEAT))
+
+    def game_over(self, winning_team):
+        self.codes.extend((GAME_OVER, _WINNER_CODES[winning_team]))
+        self.engine.event_log = None
+        self.engine = None
+        if len(self.codes) >= self.segment_bytes:
+            self.flush() # Segments only end between games
+
+    def flush(self):
+        """Compress the buffered records into one segment and append it to the output."""
+        if not self.codes:
+            return
+        raw = bytes(self.codes)
+        data = zlib.compress(raw, self.level)
+        self.out.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, FORMAT_VERSION, len(raw), len(data)))
+        self.out.write(data)
+        self.bytes_written += SEGMENT_HEADER.size + len(data)
+        self.codes.clear()
+
+    def close(self):
+        self.flush()
+
+
+def read_segments(f):
+    """Yield (format version, raw decompressed records) for each segment in a log file."""
+    while header := f.read(SEGMENT_HEADER.size):
+        if len(header) < SEGMENT_HEADER.size:
+            raise ValueError("Truncated segment header.")
+        magic, version, raw_length, length = SEGMENT_HEADER.unpack(header)
+        if magic != SEGMENT_MAGIC or not 1 <= version <= FORMAT_VERSION:
+            raise ValueError(f"Not an event log segment (magic {magic!r}, version {version}).")
+        raw = zlib.decompress(f.read(length))
+        if len(raw) != raw_length:
+            raise ValueError("Corrupt segment: wrong decompressed length.")
+        yield version, raw
+
+
+def read_games(f):
+    """Yield each logged game as a list of (event code, arguments tuple), starting with GAME_START,
+    in the layout of the Records table: what the writer leaves out is put back where the engine
+    would have written it. A day's PHASE goes just before its VOTES, a night's before its first
+    night record and its NIGHT_RESULT (from the mafia's target and the doctor's protections)
+    after its last one. Version 1 segments, which stored every record, only move the vote death
+    into its VOTES record and drop the deaths that follow from other records."""
+    game = None
+    for version, raw in read_segments(f):
+        item_bytes = ITEM_BYTES if version > 1 else V1_ITEM_BYTES
+        i, end = 0, len(raw)
+        while i < end:
+            code = raw[i]
+            n = ARG_COUNTS[code]
+            if n is None:
+                n = 1 + item_bytes[code] * raw[i + 1] + (code == VOTES and version > 1) # + the eliminated seat
+            args = tuple(raw[i + 1:i + 1 + n])
+            i += 1 + n
+            if code == GAME_START:
+                if game:
+                    yield game
+                game, phase, round_cycle = [], None, 0
+            if version == 1:
+                if code == VOTES:
+                    args += (NO_SEAT,) # Until a vote death follows
+                elif code == DEATH and args[1] == VOTE_CAUSE:
+                    if game[-1][0] == VOTES:
+                        game[-1] = (VOTES, game[-1][1][:-1] + args[:1])
+                    else:
+                        game.append((VOTES, (0, args[0]))) # The ballots of a plain count dict weren't logged
+                    continue
+                elif code == DEATH and args[1] != UNKNOWN_CAUSE:
+                    continue # Follows from the NIGHT_RESULT or RANDOM_EVENT record before it
+                game.append((code, args))
+                continue
+
+            if code in NIGHT_CODES:
+                if phase is None: # Nobody voted that day
+                    game.append((PHASE, (DAY, round_cycle & 0xFF, round_cycle >> 8)))
+                if phase != NIGHT:
+                    phase, target, protected = NIGHT, NO_SEAT, set()
+                    game.append((PHASE, (NIGHT, round_cycle & 0xFF, round_cycle >> 8)))
+                if code == PROTECT:
+                    protected.add(args[1])
+                elif code == MAFIA_TARGET:
+                    target = args[0]
+            elif phase == NIGHT: # resolve_night ran just before this record and ended the round
+                outcome = "saved" if target in protected else "killed" if target != NO_SEAT else None
+                game.append((NIGHT_RESULT, (OUTCOMES.index(outcome), target)))
+                phase, round_cycle = None, round_cycle + 1
+            if code == VOTES and phase is None:
+                phase = DAY
+                game.append((PHASE, (DAY, round_cycle & 0xFF, round_cycle >> 8)))
+
+            if code == ROLES:
+                args = args[:1] + packed_roles(args[1:args[0] + 1], args[args[0] + 1:])
+            elif code == VOTES or code == MAFIA_VOTES: # Voters then candidates, back to a voter and candidate per ballot
+                count = args[0]
+                args = (count, *chain.from_iterable(zip(args[1:count + 1], args[count + 1:2 * count + 1])), *args[2 * count + 1:])
+            game.append((code, args))
+    if game:
+        yield game
+
+
+def packed_roles(roles, difficulties):
+    """One ROLES byte per seat from the stored roles and difficulties. The villager attributes
+    aren't stored: GameEngine.assignRoles gives them out in order to the first villagers."""
+    attributes = iter(range(1, len(ATTRIBUTES)))
+    return tuple(role | (next(attributes, 0) if role == ROLE_VILLAGER else 0) << 3 | difficulty << 5
+                 for role, difficulty in zip(roles, difficulties))
+
+
+def describe(code, args):
+    """A readable form of one record, e.g. ("death", {"seat": 3, "cause": "vote"})."""
+    if code == GAME_START:
+        return "game_start", {"players": args[0]}
+    if code == ROLES:
+        return "roles", {"roles": [(ROLE_NAMES[seat & 7], ATTRIBUTES[seat >> 3 & 3], seat >> 5) for seat in args[1:]]}
+    if code == VOTES:
+        return "votes", {"ballots": dict(zip(args[1:-1:2], args[2:-1:2])), "eliminated": args[-1]}
+    if code == MAFIA_VOTES:
+        return "mafia_votes", {"ballots": dict(zip(args[1::2], args[2::2]))}
+    if code == PHASE:
+        return "phase", {"phase": PHASES[args[0]], "round": args[1] | args[2] << 8}
+    if code == DEATH:
+        return "death", {"seat": args[0], "cause": CAUSES[args[1]]}
+    if code == NIGHT_RESULT:
+        return "night_result", {"outcome": OUTCOMES[args[0]], "seat": args[1]}
+    if code == RANDOM_EVENT:
+        return "random_event", {"event": EVENTS[args[0]], "seat": args[1]}
+    if code == GAME_OVER:
+        return "game_over", {"winner": WINNERS[args[0]]}
+    return EVENT_NAMES[code], dict(zip(("seat", "target"), args)) if len(args) == 2 else {"seat": args[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a binary game event log.")
+    parser.add_argument("path", help="Event log file")
+    parser.add_argument("--dump", type=int, default=0, help="Also print the records of the first N games")
+    args = parser.parse_args(argv)
+
+    games = records = 0
+    with open(args.path, "rb") as f:
+        for game in read_games(f):
+            if games < args.dump:
+                print(f"game {games}:")
+                for code, event_args in game:
+                    print("  ", *describe(code, event_args))
+            games += 1
+            records += len(game)
+        size = f.tell()
+    print(f"{games} games, {records} records, {size:,} bytes ({size / max(games, 1):.1f} bytes/game)")
+
+
+if __name__ == "__main__":
+    main()
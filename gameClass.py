@@ -7,28 +7,21 @@ Description:
     It interacts with the Player class to handle individual player attributes and behaviors.
 '''
 
-from player import Player
+from gameEngine import GameEngine
+from metrics import timed
+from tracing import traced
 import os
-import random
 import tkinter as tk
 from tkinter import messagebox
 
-class GameClass:
+class GameClass(GameEngine):
     def __init__(self, players, game_mode, frame, app):
+        super().__init__(players, game_mode)
         self.frame = frame # Reuse root window to avoid opening new one (passed through parameter)
         self.app = app # Store the reference to MafiaGameApp
-        self.num_players = players # Total number of players in the game
-        self.num_mafia = 0 # Counter for mafia players
-        self.num_doctors = 0 # Counter for doctor players
-        self.num_villagers = 0 # Counter for villager players
-        self.gameCompleted = False # Boolean value to indicate if the game has ended
-        self.player_list = [] # List to store player objects
-        self.round_cycle = 0 # Tracks if the game has gone through a full day/night cycle (for target history mafia method)
-        self.mafia_votes = {}
-        self.game_mode = game_mode
-        self.game_difficulty = 0
         self.main_player 
 
+    @traced("ui")
     def clear_frame(self):
         """Clears current frame"""
         for widget in self.frame.winfo_children():
@@ -42,135 +35,44 @@ class GameClass:
         self.message_label.pack()
         return
 
-
-    def easy_ai(self, cur_list):
-        """Randomly selects a target from the current list."""
-        return random.choice(cur_list)
-
-    
-    def normal_ai(self, role, player, cur_list):
-        """Makes informed decisions based on available game information."""
-        if role == 'mafia':
-            # Avoid targeting other Mafia; focus on non-Mafia players
-            non_mafia = [p for p in cur_list if p.role != 'mafia' and p.status == 'alive']
-            return random.choice(non_mafia)
-        elif role == 'doctor':
-            # Protect players at higher risk (non-Mafia, especially Detective)
-            return max(cur_list, key=lambda x: x.status)  # Dummy logic; refine as needed
-        elif role == 'detective':
-            # Investigate new, uninvestigated players
-            uninvestigated = [p for p in cur_list if p not in player.investigated]
-            return random.choice(uninvestigated) if uninvestigated else random.choice(cur_list)
-        elif role == 'villager':
-            # Vote for suspected Mafia
-            suspected_mafia = [p for p in cur_list if self.is_suspected_mafia(p)]
-            return random.choice(suspected_mafia) if suspected_mafia else random.choice(cur_list)
-        return random.choice(cur_list)  # Fallback for edge cases
-
-
-    def hard_ai(self, role, player, cur_list):
-        """Makes optimal decisions for each role."""
-        if role == 'mafia':
-            # Prioritize critical roles (Doctor, Detective) over Villagers
-            high_value_targets = [p for p in cur_list if p.role in ['doctor', 'detective']]
-            return random.choice(high_value_targets) if high_value_targets else random.choice(cur_list)
-        elif role == 'doctor':
-            # Protect high-value roles (Detective or critical Villager)
-            protect_targets = [p for p in cur_list if p.role in ['detective', 'villager'] and p.status == 'alive']
-            return max(protect_targets, key=lambda x: x.status)  # Prioritize active players
-        elif role == 'detective':
-            # Check uninvestigated or suspicious players
-            unknown_roles = [p for p in cur_list if p.role is None and p.status == 'alive']
-            return random.choice(unknown_roles) if unknown_roles else random.choice(cur_list)
-        elif role == 'villager':
-            # Vote strategically against known Mafia
-            return self.vote_mafia_strategy(cur_list)
-        return random.choice(cur_list)
-
-
-
-        # Automated day phase voting based on current knowledge
-        self.simulate_strategic_voting()
-        
-    def assign_villager_attribute(self):
-        attributes = ["Intuition", "Suspicion Radar"]
-        return random.choice(attributes)
-
     def villager_intuition(self, villager):
-        potential_targets = [p for p in self.player_list if p.status == 'alive' and p != villager]
-        if potential_targets:
-            target = random.choice(potential_targets)
-            is_correct_hint = random.random() > 0.5
-            hint_role = "Mafia" if is_correct_hint and target.role == 'mafia' else "Not Mafia"
+        hint = super().villager_intuition(villager)
+        if hint:
+            target, hint_role = hint
             hint_role_text = f"Hint for {villager.name}: {target.name} might be {hint_role}."
             hint_role_message = tk.Label(self.frame, text=hint_role_text)
             hint_role_message.pack()
             print(f"Hint for {villager.name}: {target.name} might be {hint_role}.")
+        return hint
 
 
     def suspicion_radar(self, villager, mafia_votes):
-        if villager.name in mafia_votes:
+        alert = super().suspicion_radar(villager, mafia_votes)
+        if alert:
             suspicion_radar_text = f"Suspicion Radar Alert: {villager.name}, the Mafia may have targeted you last night."
-            suspicion_radar_message = tk.Label(self.frame, text=suspicion_radar_text)
-            suspicion_radar_message.pack()
-            print(f"Suspicion Radar Alert: {villager.name}, the Mafia may have targeted you last night.")
         else:
             suspicion_radar_text = f"Suspicion Radar: {villager.name}, no suspicious activity detected."
-            suspicion_radar_message = tk.Label(self.frame, text=suspicion_radar_text)
-            suspicion_radar_message.pack()
-            print(f"Suspicion Radar: {villager.name}, no suspicious activity detected.")
+        suspicion_radar_message = tk.Label(self.frame, text=suspicion_radar_text)
+        suspicion_radar_message.pack()
+        print(suspicion_radar_text)
+        return alert
 
 
     def activate_villager_attributes(self):
-        for player in self.player_list:
-            if player.role == "villager" and player.status == "alive":
-                if player.attribute == "Intuition":
-                    self.villager_intuition(player)
-                elif player.attribute == "Suspicion Radar":
-                    self.suspicion_radar(player, self.mafia_votes)
+        for player in self.alive_with_role("villager"):
+            if player.attribute == "Intuition":
+                self.villager_intuition(player)
+            elif player.attribute == "Suspicion Radar":
+                self.suspicion_radar(player, self.mafia_votes)
 
     def resolve_mafia_votes(self, mafia_votes):
-        if mafia_votes:
-            max_votes = max(mafia_votes.values())
-            targets = [p for p, count in mafia_votes.items() if count == max_votes]
-            target = random.choice(targets)
-            target_obj = next((p for p in self.player_list if p.name == target), None)
-            if target_obj and not target_obj.protected:
-                target_obj.status = "dead"
+        if self.choose_mafia_target(mafia_votes):
+            outcome, target_obj = self.resolve_night()
+            if outcome == "killed":
                 print(f"{target_obj.name} was killed during the night.")
-            elif target_obj and target_obj.protected:
+            elif outcome == "saved":
                 print(f"{target_obj.name} was protected by the Doctor and survived.")
 
-    
-    def select_priority_target(self, targets):
-        # Mafia targets critical roles first, then any non-mafia
-        priority_targets = [p for p in targets if p.role in ['detective', 'doctor']]
-        return random.choice(priority_targets) if priority_targets else random.choice(targets)
-
-    def select_protective_target(self, targets):
-        # Doctor protects based on previous targeting or critical role
-        return max(targets, key=lambda x: (self.target_history.get(x.name, 0), x.role in ['detective']))
-
-    def detective_select_target(self, targets):
-        # Detective checks a new player each night, prioritizing those with suspicious behavior
-        return random.choice(targets)  # Replace with more nuanced logic based on behavior
-
-    def simulate_strategic_voting(self):
-        for player in self.player_list:
-            if player.status == 'alive':
-                player.vote(self.strategic_vote(player))
-
-    def strategic_vote(self, player):
-        # Players vote based on detected Mafia or most suspicious behavior
-        if player.role == 'villager':
-            suspected_mafia = [p for p in self.player_list if self.is_suspected_mafia(p)]
-            return random.choice(suspected_mafia) if suspected_mafia else None
-        return None
-
-    def is_suspected_mafia(self, player):
-        # Example placeholder for suspicion logic
-        return player.role == 'mafia' and player.has_been_suspicious
-        
     def ai_mode(self):
         input_flag = True
         while input_flag:
@@ -188,60 +90,20 @@ class GameClass:
     def main_player(self, name):
         self.main_player = name
         return self.main_player
-    
-    # Method to add a new player to the game
-    def add_player(self, name):
-        """Add a new player to the game with a placeholder role."""
-        # Create a new Player instance with a name and no role assigned yet
-        player = Player(role=None, name=name)
-        # Add the player to the player list
-        self.player_list.append(player)
-
-    def assign_villager_attribute(self):
-        """Assigns a random passive attribute to a villager."""
-        attributes = ["Intuition", "Suspicion Radar"]
-        return random.choice(attributes)
 
     def assignRoles(self):
         """ Dynamically assigns roles to players based on the number of players. """
-        # Calculate number of roles based on player count
-        num_mafia = max(1, self.num_players // 3)  # At least 1 mafia, ~1/3 of players
-        num_detective = 1 if self.num_players >= 5 else 0  # 1 detective for 5+ players
-        num_doctors = 1 if self.num_players >= 4 else 0  # 1 doctor for 4+ players
-        num_villagers = self.num_players - (num_mafia + num_detective + num_doctors)  # Remaining players are villagers
-
-        # Create a role list based on calculated numbers
-        roles = (
-            ['mafia'] * num_mafia +
-            ['detective'] * num_detective +
-            ['doctor'] * num_doctors +
-            ['villager'] * num_villagers
-        )
-        
-        # Shuffle roles to ensure randomness
-        random.shuffle(roles)
-
-        # Assign roles to players and update role counts
-        attributes = ["Intuition", "Suspicion Radar"]  # Villager attributes
-        for player in self.player_list:
-            role = roles.pop()  # Assign a role from the shuffled list
-            player.role = role
-            self.update_role_count(role, increment=True)
-
-            if role == "villager":
-                if attributes:
-                    player.attribute = attributes.pop(0)  # Assign unique attribute
-                else:
-                    player.attribute = None  # No attribute left to assign
+        distribution = super().assignRoles()
 
         # Debugging output to check balance
         self.clear_frame()
-        role_distribution_message = f"Roles Distribution: Mafia: {num_mafia}, Doctor: {num_doctors}, Detective: {num_detective}, Villagers: {num_villagers}"
+        role_distribution_message = f"Roles Distribution: Mafia: {distribution['mafia']}, Doctor: {distribution['doctor']}, Detective: {distribution['detective']}, Villagers: {distribution['villager']}"
         self.message_label = tk.Label(self.frame, text=role_distribution_message)
         self.message_label.pack()
-        print(f"Roles distribution: Mafia: {num_mafia}, Doctor: {num_doctors}, Detective: {num_detective}, Villagers: {num_villagers}")
+        print(f"Roles distribution: Mafia: {distribution['mafia']}, Doctor: {distribution['doctor']}, Detective: {distribution['detective']}, Villagers: {distribution['villager']}")
 
         self.role_call()  # Perform the private role call
+        return distribution
 
     def role_call(self):
         """Trigger the role call through the appropriate method."""
@@ -252,18 +114,6 @@ class GameClass:
         else:
             raise AttributeError("Neither the app nor the current class has a start_role_call method.")
 
-    def update_role_count(self, role, increment=True):
-        """Update the count of each role based on the player's assigned role."""
-        if role == "mafia":
-            # Increment or decrement the mafia count based on the increment flag
-            self.num_mafia += 1 if increment else -1
-        elif role == "doctor":
-            # Increment or decrement the doctor count based on the increment flag
-            self.num_doctors += 1 if increment else -1
-        elif role == "villager":
-            # Increment or decrement the villager count based on the increment flag
-            self.num_villagers += 1 if increment else -1
-
     def singleplayer_voting_phase(self):
         self.singleplayer_clear_frame_ui()
        
@@ -287,7 +137,7 @@ class GameClass:
         vote_entry.pack()
 
         vote_for = vote_entry.get().lower()
-        if vote_for not in [p.lower() for p in alive_players]:
+        if self.find_alive_player(vote_for, exclude=main_player) is None:
             messagebox.showerror(f"Invalid choice. Please select from: {', '.join(alive_players)}")
         else:
             messagebox.showinfo(f"Vote submitted. You voted to eliminate {vote_for.capitalize()}.")
@@ -296,22 +146,16 @@ class GameClass:
         vote_button.pack()
 
     def singleplayer_submit_vote(self, vote_for):
-        votes = {}
-        votes[vote_for] = votes.get(vote_for, 0) + 1
+        votes = self.new_tally()
+        target = self.find_alive_player(vote_for)
+        if target:
+            votes.cast(target.name, self.player_list[0].name)
         votes = self.easyAI_submit_vote(votes)
-        if votes:
-            max_votes = max(votes.values())
-            candidates = [name for name, count in votes.items() if count == max_votes]
-
-            eliminated_player = random.choice(candidates) if len(candidates) > 1 else candidates[0]
-            eliminated_player_obj = next((p for p in self.player_list if p.name.lower() == eliminated_player.lower()), None)
-
-            if eliminated_player_obj:
-                eliminated_player_obj.status = "dead"
-                eliminated_text = f"{eliminated_player_obj.name.capitalize()} has been eliminated."
-                eliminated_message = tk.Label(self.frame, text=eliminated_text)
-                eliminated_message.pack()
-                self.update_role_count(eliminated_player_obj.role, increment=False)
+        eliminated_player_obj = self.resolve_day_votes(votes)
+        if eliminated_player_obj:
+            eliminated_text = f"{eliminated_player_obj.name.capitalize()} has been eliminated."
+            eliminated_message = tk.Label(self.frame, text=eliminated_text)
+            eliminated_message.pack()
         self.check_win_conditions()
         button = tk.Button(self.frame, text="Night Phase: Everyone, close your eyes.", command=self.night_phase)
         button.pack()
@@ -321,7 +165,7 @@ class GameClass:
         alive_players = [p.name for p in self.player_list if p.status == "alive" and p.name != self.player_list[0].name]
         for p in alive_players:
             vote_for = self.easy_ai(alive_players)
-            votes[vote_for] = votes.get(vote_for, 0) + 1
+            votes.cast(vote_for, p)
             vote_text = f"{p} (AI) votes for {vote_for.capitalize()}."
             vote_message = tk.Label(self.frame, text=vote_text)
             vote_message.pack()
@@ -329,6 +173,8 @@ class GameClass:
 
 
 
+    @traced("ui")
+    @timed("day_phase")
     def day_phase(self):
         """Handles the day phase, allowing players to vote while displaying private role-specific information."""
         day_phase_message = tk.Label(self.frame, text="Day Phase: Time to vote!")
@@ -339,8 +185,8 @@ class GameClass:
         input("Press Enter to begin the day phase...")
         self.clear_console()
 
-        # Dictionary to store votes
-        votes = {}
+        # Tally of the day's votes
+        votes = self.new_tally()
 
         # Call each player for their turn
         for player in self.player_list:
@@ -373,15 +219,16 @@ class GameClass:
                     vote_entry.pack()
 
                     vote_for = input(f"{player.name}, who do you vote to eliminate? ").lower()
-                    while vote_for not in [p.lower() for p in alive_players]:
+                    while self.find_alive_player(vote_for, exclude=player) is None:
                         print(f"Invalid choice. Please select from: {', '.join(alive_players)}")
                         vote_for = input(f"{player.name}, who do you vote to eliminate? ").lower()
 
-                    # Record the vote
-                    votes[vote_for] = votes.get(vote_for, 0) + 1
+                    # Record the vote under the player's own name
+                    vote_for = self.find_player(vote_for).name
+                    votes.cast(vote_for, player.name)
                 elif self.game_mode == 1 and player.name != self.main_player:
                     vote_for = self.easy_ai(alive_players)
-                    votes[vote_for] = votes.get(vote_for, 0) + 1
+                    votes.cast(vote_for, player.name)
                     print(f"{player.name} (AI) votes for {vote_for.capitalize()}.")
 
                 # Clear the console before transitioning to the next player
@@ -390,25 +237,17 @@ class GameClass:
             else:
                 print(f"{player.name.capitalize()} is not in the game.")
 
-        # Determine the player with the most votes
-        if votes:
-            max_votes = max(votes.values())
-            candidates = [name for name, count in votes.items() if count == max_votes]
-
-            # Handle ties with random selection
-            eliminated_player = random.choice(candidates) if len(candidates) > 1 else candidates[0]
-            eliminated_player_obj = next((p for p in self.player_list if p.name.lower() == eliminated_player.lower()), None)
-
-            # Eliminate the chosen player
-            if eliminated_player_obj:
-                eliminated_player_obj.status = "dead"
-                print(f"{eliminated_player_obj.name.capitalize()} has been eliminated.")
-                self.update_role_count(eliminated_player_obj.role, increment=False)
+        # Determine the player with the most votes and eliminate them
+        eliminated_player_obj = self.resolve_day_votes(votes)
+        if eliminated_player_obj:
+            print(f"{eliminated_player_obj.name.capitalize()} has been eliminated.")
 
         # Check win conditions after the voting phase
         self.check_win_conditions()
 
 
+    @traced("ui")
+    @timed("night_phase")
     def night_phase(self):
         self.singleplayer_clear_frame_ui()
         alive_players = [p.name for p in self.player_list if p.status == "alive" and p.name != self.player_list[0].name]
@@ -427,7 +266,7 @@ class GameClass:
         player_list_message = tk.Label(self.frame, text=player_list_text)
         player_list_message.pack()
         
-        mafia_votes = {}  # Dictionary to store votes for each target
+        mafia_votes = self.new_tally()  # Tally of the votes for each target
         for player in self.player_list:
             if (player.role == "mafia" and player.status == "alive" and self.game_mode == 2) or (player.name == self.player_list[0].name):
                 mafia_votes_text = f"Mafia votes: {self.mafia_votes}"
@@ -443,14 +282,11 @@ class GameClass:
                 #target_name = input(f"{player.name.capitalize()} (Mafia), choose your target: ").lower()
                 """NEEDS A BUTTON for input"""
 
-                if target_name_entry:
-                    target_player = next((p for p in self.player_list if p.name == target_name_entry and p.status == "alive"), None)
-                #if target_name:
-                    #target_player = next((p for p in self.player_list if p.name == target_name and p.status == "alive"), None)
+                target_player = self.find_alive_player(target_name_entry.get())
                 
                 if target_player:
                     player.mafia_action(target_player)  # Mafia player uses mafia_action method
-                    mafia_votes[target_player] = mafia_votes.get(target_player, 0) + 1
+                    mafia_votes.cast(target_player.name, player.name)
                 mafia_vote_button = tk.Button(self.frame, text="Vote", command=lambda: final_mafia_vote(mafia_votes))
                 mafia_vote_button.pack()
                 self.clear_console()
@@ -458,15 +294,12 @@ class GameClass:
         # Determine final target with most votes
         def final_mafia_vote(mafia_votes):
             self.singleplayer_clear_frame_ui()
-            target = None
-            if mafia_votes:
-                max_votes = max(mafia_votes.values())
-                targets_with_max_votes = [p for p, votes in mafia_votes.items() if votes == max_votes]
-                target = random.choice(targets_with_max_votes) if len(targets_with_max_votes) > 1 else targets_with_max_votes[0]
-                target_announcement_text = f"Mafia has chosen to target {target.name}."
+            target = self.choose_mafia_target(mafia_votes)
+            if target:
+                target_announcement_text = f"Mafia has chosen to target {target}."
                 target_announcement_message = tk.Label(self.frame, text=target_announcement_text)
                 target_announcement_message.pack()
-                print(f"Mafia has chosen to target {target.name}.")  # Announce chosen target
+                print(f"Mafia has chosen to target {target}.")  # Announce chosen target
 
         # Close Mafia phase
         print("Mafia, close your eyes.")
@@ -479,19 +312,18 @@ class GameClass:
         doctor_vote_message = tk.Label(self.frame, text="Doctor, open your eyes.\nDoctor, choose a player to protect.")
         doctor_vote_message.pack()
 
-        for player in self.player_list:
-            if player.role == "doctor" and player.status == "alive":
-                target_name = input(f"{player.name} (Doctor), choose a player to protect: ").lower()
-                target_player = next((p for p in self.player_list if p.name == target_name and p.status == "alive"), None)
+        for player in self.alive_with_role("doctor"):
+            target_name = input(f"{player.name} (Doctor), choose a player to protect: ").lower()
+            target_player = self.find_alive_player(target_name)
 
-                target_name_entry = tk.Entry(self.frame)
-                target_name_entry.pack()
-                button = tk.Button(self.frame, text="Vote", command=self.singleplayer_clear_frame_ui)
-                
+            target_name_entry = tk.Entry(self.frame)
+            target_name_entry.pack()
+            button = tk.Button(self.frame, text="Vote", command=self.singleplayer_clear_frame_ui)
+            
 
-                if target_player:
-                    player.doctor_action(target_player)  # Doctor uses doctor_action method
-                self.clear_console()
+            if target_player:
+                self.protect_player(player, target_player)
+            self.clear_console()
 
         # Close Doctor phase
         print("Doctor, close your eyes.")
@@ -518,36 +350,20 @@ class GameClass:
         print("The day begins...")
 
         # Resolve night actions based on Mafia target and Doctor protection
-        if target and not target.protected:
-            target.status = "dead"  # Mark as dead if unprotected
+        outcome, target = self.resolve_night()
+        if outcome == "killed":
             print(f"{target.name} was killed during the night.")
-        elif target and target.protected:
+        elif outcome == "saved":
             print(f"{target.name} was protected by the Doctor and survived the night.")
 
-        # Reset night actions for all players
-        for player in self.player_list:
-            player.reset_night_actions()
-
         # Check win conditions
         self.check_win_conditions()
 
     def check_win_conditions(self):
-        """Checks if a win condition is met."""
-        # Update counts 
-        self.num_mafia = len([p for p in self.player_list if p.role == 'mafia' and p.status == 'alive'])
-        self.num_villagers = len([p for p in self.player_list if p.role == 'villager' and p.status == 'alive'])
-        self.num_doctors = len([p for p in self.player_list if p.role == 'doctor' and p.status == 'alive'])
-
-        # Check if the village wins (all mafia members are eliminated)
-        if self.num_mafia == 0:
-            self.gameCompleted = True
-            self.show_winning_team_screen("Village")
-            return True  # Stop further processing
-
-        # Check if the mafia wins (mafia outnumber or equal the villagers and doctors)
-        elif self.num_mafia >= (self.num_villagers + self.num_doctors):
-            self.gameCompleted = True
-            self.show_winning_team_screen("Mafia")
+        """Checks if a win condition is met and shows the winning team."""
+        winning_team = super().check_win_conditions()
+        if winning_team:
+            self.show_winning_team_screen(winning_team)
             return True  # Stop further processing
 
         return False
@@ -612,19 +428,3 @@ class GameClass:
         self.night_phase()
         if not self.game_over:
             self.day_phase()
-
-    # Returns the list of mafia allies
-    def mafia_ally_list(self, cur_player):
-        ally_list = []
-        for player in self.player_list:
-            if player.role == "mafia" and player.status == "alive" and player.name != cur_player:
-                ally_list.append(player.name)
-        return ", ".join(ally_list)
-
-    def targetHistory(self, cur_player, day_vote):
-        history = {} # store mafia member's day cycle votes
-        for player in self.player_list:
-            if player.role == "mafia" and player.status == "alive" and player.name != cur_player:
-                history[cur_player] = day_vote
-        self.mafia_votes = history
-        return self.mafia_votes
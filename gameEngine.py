@@ -0,0 +1,535 @@
+'''
+gameEngine.py
+Description:
+    This file contains the GameEngine, which owns the rules of Mafia without any tkinter code.
+    It keeps the player list, assigns roles, resolves day votes and night actions, checks the
+    win conditions and drives the AI players. Instead of drawing widgets it sends out events
+    to any registered listener, so a game can run headless (simulations, servers) or under one
+    of the Tk views (GameClass, SinglePlayerMode, MultiplayerGameClass) that build on it.
+
+Events:
+    Every listener is called as listener(event, data) where data is a dict. The engine emits
+    "player_added", "roles_assigned", "player_died", "day_vote_result", "mafia_target",
+    "protected", "investigation", "hint", "suspicion_radar", "night_result", "random_event"
+    and "game_over". Hosts that run the phases one action at a time (the server) also get
+    "phase_started" from start_phase and "vote_cast" from cast_vote. A game being recorded to
+    an event log (eventLog.py) also calls its writer directly at each of those points.
+
+Randomness:
+    Role shuffles, AI picks, vote tie-breaks, hints and random events all draw from self.rng,
+    the global random module unless a random.Random is passed as rng (see seeding.py).
+'''
+
+from voteTally import VoteTally, random_tie_break
+from tracing import traced
+import metrics
+from player import Player, ROLE_NAMES, ROLE_MAFIA, ROLE_DOCTOR, ROLE_DETECTIVE
+import random
+
+
+RANDOM_EVENTS = ["hurricane", "tornado", "village_fire", "suspicious_action"]  # Index matches the random_event roll
+DIFFICULTY_EASY = 1
+DIFFICULTY_NORMAL = 2
+DIFFICULTY_HARD = 3
+DIFFICULTY_EXPERT = 4 # Tree search (treeSearch.py); simulation and tournament only, not offered in the GUI until it clearly beats hard
+SUSPICION_THRESHOLD = 0.5 # is_suspected_mafia: the belief that a player is Mafia needed to suspect them
+
+
+class GameEngine:
+    def __init__(self, players, game_mode=1, detective_enabled=True, rng=None):
+        self.num_players = players # Total number of players in the game
+        self.gameCompleted = False # Boolean value to indicate if the game has ended
+        self.winning_team = None # "Village" or "Mafia" once the game has ended
+        self.player_list = [] # List to store player objects
+        self.players_by_name = {} # Casefolded name -> Player, kept up to date by add_player
+        self.alive_by_role = {role: {} for role in ROLE_NAMES[1:]} # Role -> alive players (dict keys keep seat order)
+        self.round_cycle = 0 # Tracks if the game has gone through a full day/night cycle (for target history mafia method)
+        self.mafia_votes = {}
+        self.mafia_target = None # Name of the player the mafia chose for the current night
+        self.game_mode = game_mode
+        self.game_difficulty = 0
+        self.ai_difficulty = {} # Per-player difficulty (name -> 1/2/3); falls back to game_difficulty
+        self.detective_enabled = detective_enabled # Single player mode has no detective UI yet
+        self.listeners = [metrics.record_event] # Callables notified of every engine event (counters are no-ops while metrics are off)
+        self.rng = random if rng is None else rng # Every random decision of the game (a seeded random.Random makes it reproducible)
+        self.tie_break = None # Tie-break policy for every vote tally (None = uniform random from rng)
+        self.phase = None # "day" or "night" while a host runs the phases through start_phase
+        self.beliefs = None # RoleBeliefs of the hard AI players (roleBeliefs.py), created by role_beliefs()
+        self.search = None # TreeSearch of the expert AI players (treeSearch.py), created on their first decision
+        self.search_budget = None # Seconds the expert AI searches per decision (None: treeSearch.DEFAULT_BUDGET)
+        self.search_workers = 1 # Processes searching each expert AI decision side by side
+        self.event_log = None # EventLogWriter recording this game (eventLog.py); called directly, not as a listener
+
+    """ =============================================================== EVENTS ======================================================================= """
+
+    def add_listener(self, listener):
+        """Register a callable that receives (event, data) for every engine event."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop sending events to a previously registered listener."""
+        self.listeners.remove(listener)
+
+    def emit(self, event, /, **data):
+        """Send an event to every registered listener."""
+        for listener in self.listeners:
+            listener(event, data)
+
+    """ =============================================================== PLAYERS AND ROLES ======================================================================= """
+
+    # Method to add a new player to the game
+    def add_player(self, name):
+        """Add a new player to the game with a placeholder role. Names must be unique (ignoring case)."""
+        key = name.casefold()
+        if key in self.players_by_name:
+            raise ValueError(f"A player named '{name}' is already in the game.")
+        # Create a new Player instance with a name and no role assigned yet
+        player = Player(role=None, name=name)
+        # Add the player to the player list and the name index
+        self.player_list.append(player)
+        self.players_by_name[key] = player
+        self.emit("player_added", player=player)
+        return player
+
+    def find_player(self, name):
+        """Return the player with the given name (case-insensitive), or None."""
+        if not isinstance(name, str):
+            return None
+        return self.players_by_name.get(name.casefold())
+
+    def find_alive_player(self, name, exclude=None):
+        """Return the alive player with the given name, or None if there is none (or it is exclude).
+        Used to validate vote and night-action targets."""
+        player = self.find_player(name)
+        if player is None or not player.alive or player is exclude:
+            return None
+        return player
+
+    def get_alive_players(self, exclude=None):
+        """Return the alive players, optionally leaving out one player."""
+        return [p for p in self.player_list if p.alive and p is not exclude]
+
+    def assign_villager_attribute(self):
+        """Assigns a random passive attribute to a villager."""
+        attributes = ["Intuition", "Suspicion Radar"]
+        return self.rng.choice(attributes)
+
+    def role_distribution(self):
+        """Calculate how many of each role a game of this size gets."""
+        num_mafia = max(1, self.num_players // 3)  # At least 1 mafia, ~1/3 of players
+        num_detective = 1 if self.num_players >= 5 and self.detective_enabled else 0  # 1 detective for 5+ players
+        num_doctors = 1 if self.num_players >= 4 else 0  # 1 doctor for 4+ players
+        num_villagers = self.num_players - (num_mafia + num_detective + num_doctors)  # Remaining players are villagers
+        return {"mafia": num_mafia, "detective": num_detective, "doctor": num_doctors, "villager": num_villagers}
+
+    @traced("engine")
+    def assignRoles(self):
+        """ Dynamically assigns roles to players based on the number of players. """
+        distribution = self.role_distribution()
+
+        # Create a role list based on calculated numbers
+        roles = (
+            ['mafia'] * distribution["mafia"] +
+            ['detective'] * distribution["detective"] +
+            ['doctor'] * distribution["doctor"] +
+            ['villager'] * distribution["villager"]
+        )
+
+        # Shuffle roles to ensure randomness
+        self.rng.shuffle(roles)
+
+        # Assign roles to players
+        attributes = ["Intuition", "Suspicion Radar"]  # Villager attributes
+        for player in self.player_list:
+            role = roles.pop()  # Assign a role from the shuffled list
+            player.role = role
+
+            if role == "villager":
+                if attributes:
+                    player.attribute = attributes.pop(0)  # Assign unique attribute
+                else:
+                    player.attribute = None  # No attribute left to assign
+
+        self.rebuild_role_index()
+        if self.beliefs is None and any(self.difficulty_for(p) >= DIFFICULTY_HARD for p in self.player_list):
+            self.role_beliefs() # Track the evidence from the start of the game
+        if self.event_log is not None:
+            self.event_log.roles()
+        self.emit("roles_assigned", distribution=distribution)
+        return distribution
+
+    def rebuild_role_index(self):
+        """Refill alive_by_role from player_list (after roles are assigned or a game is restored)."""
+        for alive in self.alive_by_role.values():
+            alive.clear()
+        for player in self.player_list:
+            if player.alive and player.role is not None:
+                self.alive_by_role[player.role][player] = None
+
+    def alive_with_role(self, role):
+        """Return the alive players with the given role, in seat order."""
+        return list(self.alive_by_role[role])
+
+    def first_alive_with_role(self, role):
+        """Return the first alive player with the given role, or None."""
+        return next(iter(self.alive_by_role[role]), None)
+
+    # Role counters, always current because every death goes through kill_player
+    @property
+    def num_mafia(self):
+        return len(self.alive_by_role["mafia"])
+
+    @property
+    def num_doctors(self):
+        return len(self.alive_by_role["doctor"])
+
+    @property
+    def num_villagers(self):
+        return len(self.alive_by_role["villager"])
+
+    @property
+    def num_detectives(self):
+        return len(self.alive_by_role["detective"])
+
+    def kill_player(self, player, cause):
+        """Mark a player as dead. Every death (vote, night kill, random event) goes through here,
+        so this is the only place that updates the alive-by-role index."""
+        if not player.alive:
+            return
+        player.alive = False
+        if player.role is not None:
+            self.alive_by_role[player.role].pop(player, None)
+        self.emit("player_died", player=player, cause=cause)
+
+    # Returns the list of mafia allies
+    def mafia_ally_list(self, cur_player):
+        return ", ".join(player.name for player in self.alive_by_role["mafia"] if player.name != cur_player)
+
+    def targetHistory(self, cur_player, day_vote):
+        history = {} # store mafia member's day cycle votes
+        for player in self.player_list:
+            if player.role == "mafia" and player.status == "alive" and player.name != cur_player:
+                history[cur_player] = day_vote
+        self.mafia_votes = history
+        return self.mafia_votes
+
+    """ =============================================================== VOTES ======================================================================= """
+
+    def new_tally(self):
+        """Start an empty vote tally that uses this game's tie-break policy."""
+        return VoteTally(self.tie_break or random_tie_break(self.rng))
+
+    def cast_vote(self, votes, candidate, voter, kind="day"):
+        """Count one ballot in a tally and announce it (kind is "day" or "mafia")."""
+        previous = votes.ballots.get(voter) # Candidate losing a vote if this ballot replaces one
+        votes.cast(candidate, voter)
+        self.emit("vote_cast", votes=votes, candidate=candidate, previous=previous, voter=voter, kind=kind)
+
+    def as_tally(self, votes):
+        """Accept either a VoteTally or a plain {name: count} dict of votes."""
+        if isinstance(votes, VoteTally):
+            return votes
+        return VoteTally.from_counts(votes, self.tie_break or random_tie_break(self.rng))
+
+    """ =============================================================== DAY PHASE ======================================================================= """
+
+    def start_phase(self, phase):
+        """Mark the start of a day or night phase for the listeners."""
+        self.phase = phase
+        self.emit("phase_started", phase=phase, round=self.round_cycle)
+
+    @traced("engine")
+    def resolve_day_votes(self, votes):
+        """Eliminate the player with the most votes (ties settled by the tie-break policy).
+        votes is a VoteTally or a {name: count} dict. Returns the eliminated player or None."""
+        if not votes:
+            return None
+        tally = self.as_tally(votes)
+        eliminated_player_obj = self.find_player(tally.winner())
+        if self.event_log is not None:
+            self.event_log.day_votes(tally.ballots, eliminated_player_obj)
+        self.emit("day_vote_result", votes=votes, eliminated=eliminated_player_obj)
+
+        # Eliminate the chosen player
+        if eliminated_player_obj:
+            self.kill_player(eliminated_player_obj, "vote")
+        return eliminated_player_obj
+
+    def villager_intuition(self, villager):
+        """Give a villager a (possibly wrong) hint about another player. Returns (target, hint_role) or None."""
+        potential_targets = [p for p in self.player_list if p.alive and p is not villager]
+        if not potential_targets:
+            return None
+        target = self.rng.choice(potential_targets)
+        is_correct_hint = self.rng.random() > 0.5
+        hint_role = "Mafia" if is_correct_hint and target.role_code == ROLE_MAFIA else "Not Mafia"
+        self.emit("hint", villager=villager, target=target, hint_role=hint_role)
+        return target, hint_role
+
+    def suspicion_radar(self, villager, mafia_votes):
+        """Returns True if the mafia voted for this villager."""
+        alert = villager.name in mafia_votes
+        self.emit("suspicion_radar", villager=villager, alert=alert)
+        return alert
+
+    """ =============================================================== NIGHT PHASE ======================================================================= """
+
+    @traced("engine")
+    def choose_mafia_target(self, mafia_votes):
+        """Pick the mafia's target from their votes (ties settled by the tie-break policy).
+        mafia_votes is a VoteTally or a {name: count} dict. Returns the target's name or None."""
+        if not mafia_votes:
+            return None
+        tally = self.as_tally(mafia_votes)
+        self.mafia_target = tally.winner()
+        if self.event_log is not None:
+            self.event_log.mafia_votes(tally.ballots, self.mafia_target)
+        self.emit("mafia_target", votes=mafia_votes, target=self.mafia_target)
+        return self.mafia_target
+
+    def protect_player(self, doctor, target):
+        """The doctor protects the target for the rest of the night."""
+        target.protected = True
+        if self.event_log is not None:
+            self.event_log.protect(doctor, target)
+        self.emit("protected", doctor=doctor, target=target)
+
+    def investigate(self, detective, target):
+        """The detective learns the target's role. Returns the role."""
+        detective.investigated = target
+        if self.event_log is not None:
+            self.event_log.investigate(detective, target)
+        self.emit("investigation", detective=detective, target=target, role=target.role)
+        return target.role
+
+    @traced("engine")
+    def resolve_night(self):
+        """Apply the mafia's kill unless the target was protected, then reset night actions.
+        Returns ("killed" | "saved", player) or (None, None) if the mafia had no target."""
+        outcome, target_player = None, None
+        if self.mafia_target:
+            target_player = self.find_player(self.mafia_target)
+        if target_player:
+            if target_player.protected:
+                outcome = "saved"
+            else:
+                outcome = "killed"
+                self.kill_player(target_player, "mafia")
+        self.emit("night_result", outcome=outcome, player=target_player)
+
+        # Reset night actions for all players
+        for player in self.player_list:
+            player.reset_night_actions()
+        self.mafia_target = None
+        self.round_cycle += 1
+        return outcome, target_player
+
+    @traced("engine")
+    def trigger_random_event(self):
+        """Roll for a random event. Returns (event, player) where event is None on a quiet day."""
+        choice = self.rng.randint(0, 5)
+        if choice >= len(RANDOM_EVENTS):
+            if self.event_log is not None:
+                self.event_log.random_event(None, None)
+            self.emit("random_event", event=None, player=None)
+            return None, None
+
+        event = RANDOM_EVENTS[choice]
+        alive_players = self.get_alive_players()
+        target_player = alive_players[1]
+        if self.event_log is not None:
+            self.event_log.random_event(event, target_player)
+        self.emit("random_event", event=event, player=target_player)
+        if event != "suspicious_action":
+            self.kill_player(target_player, event)
+        return event, target_player
+
+    """ =============================================================== WIN CONDITIONS ======================================================================= """
+
+    @traced("engine")
+    def check_win_conditions(self):
+        """Checks if a win condition is met. Returns "Village", "Mafia" or None."""
+        num_mafia = len(self.alive_by_role["mafia"])
+
+        winning_team = None
+        # Check if the village wins (all mafia members are eliminated)
+        if num_mafia == 0:
+            winning_team = "Village"
+        # Check if the mafia wins (mafia outnumber or equal the villagers and doctors)
+        elif num_mafia >= len(self.alive_by_role["villager"]) + len(self.alive_by_role["doctor"]):
+            winning_team = "Mafia"
+
+        if winning_team:
+            self.gameCompleted = True
+            self.winning_team = winning_team
+            if self.search is not None:
+                self.search.close() # Shuts down its worker processes
+                self.search = None
+            if self.event_log is not None:
+                self.event_log.game_over(winning_team)
+            self.emit("game_over", winning_team=winning_team)
+        return winning_team
+
+    """ =============================================================== AI PLAYERS ======================================================================= """
+
+    def easy_ai(self, cur_list):
+        """Randomly selects a target from the current list."""
+        return self.rng.choice(cur_list)
+
+    def normal_ai(self, role, player, cur_list):
+        """Makes informed decisions based on available game information."""
+        if role == 'mafia':
+            # Avoid targeting other Mafia; focus on non-Mafia players
+            non_mafia = [p for p in cur_list if p.role_code != ROLE_MAFIA and p.alive]
+            return self.rng.choice(non_mafia) if non_mafia else self.rng.choice(cur_list)
+        elif role == 'doctor':
+            # Protect players at higher risk (non-Mafia, especially Detective)
+            return max(cur_list, key=lambda x: x.status)  # Dummy logic; refine as needed
+        elif role == 'detective':
+            # Investigate new, uninvestigated players
+            uninvestigated = [p for p in cur_list if p is not player.investigated]
+            return self.rng.choice(uninvestigated) if uninvestigated else self.rng.choice(cur_list)
+        elif role == 'villager':
+            # Vote for suspected Mafia
+            suspected_mafia = [p for p in cur_list if self.is_suspected_mafia(p, player)]
+            return self.rng.choice(suspected_mafia) if suspected_mafia else self.rng.choice(cur_list)
+        return self.rng.choice(cur_list)  # Fallback for edge cases
+
+    def hard_ai(self, role, player, cur_list):
+        """Makes the best decision for each role from what the player believes (see roleBeliefs.py),
+        never from the other players' real roles. Falls back to normal_ai without NumPy."""
+        beliefs = self.role_beliefs()
+        if beliefs is None:
+            return self.normal_ai(role, player, cur_list)
+        if role == 'mafia':
+            # Prioritize the likely Doctor and Detective, never an ally
+            return beliefs.pick(player, "mafia", cur_list)
+        elif role == 'doctor':
+            # Protect the likely Detective, not a likely Mafia member
+            return beliefs.pick(player, "doctor", cur_list)
+        elif role == 'detective':
+            # Investigate the most suspicious player whose role is still unknown
+            return beliefs.pick(player, "detective", cur_list)
+        elif role == 'villager':
+            # Vote strategically against the likeliest Mafia member
+            return beliefs.pick(player, "villager", cur_list)
+        return self.rng.choice(cur_list)
+
+    def role_beliefs(self):
+        """The RoleBeliefs the hard AI decides with, created on first use (None without NumPy).
+        Hard and expert AI players are its observers."""
+        if self.beliefs is None:
+            try:
+                from roleBeliefs import RoleBeliefs # NumPy is only loaded for games with a hard AI
+            except ImportError:
+                return None
+            self.beliefs = RoleBeliefs(self, [p for p in self.player_list if self.difficulty_for(p) >= DIFFICULTY_HARD])
+        return self.beliefs
+
+    def expert_ai(self, role, player, cur_list, phase=None):
+        """Searches the rest of the game (ISMCTS, see treeSearch.py) for the move that wins most often,
+        within the search's time budget. phase ("day" or "night") is the phase the pick is for;
+        without it, and for decisions the search doesn't model, hard_ai picks."""
+        if phase is None:
+            return self.hard_ai(role, player, cur_list)
+        if self.search is None:
+            from treeSearch import TreeSearch, DEFAULT_BUDGET
+            self.search = TreeSearch(self.search_budget or DEFAULT_BUDGET, self.search_workers)
+        choice = self.search.choose(self, role, player, cur_list, phase)
+        return choice if choice is not None else self.hard_ai(role, player, cur_list)
+
+    @traced("ai")
+    def ai_choice(self, difficulty, role, player, cur_list, phase=None):
+        """Pick a target from cur_list with the AI that matches the difficulty setting.
+        phase ("day" or "night") tells the expert AI which phase the pick is for."""
+        if difficulty == DIFFICULTY_EXPERT:
+            return self.expert_ai(role, player, cur_list, phase)
+        if difficulty == DIFFICULTY_HARD:
+            return self.hard_ai(role, player, cur_list)
+        elif difficulty == DIFFICULTY_NORMAL:
+            return self.normal_ai(role, player, cur_list)
+        return self.easy_ai(cur_list)
+
+    def difficulty_for(self, player):
+        """Return the AI difficulty that controls this player."""
+        return self.ai_difficulty.get(player.name, self.game_difficulty)
+
+    def vote_mafia_strategy(self, cur_list, observer=None):
+        """Vote for a player the observer suspects of being Mafia, or anyone if nobody is suspected."""
+        suspected_mafia = [p for p in cur_list if self.is_suspected_mafia(p, observer)]
+        return self.rng.choice(suspected_mafia) if suspected_mafia else self.rng.choice(cur_list)
+
+    def select_priority_target(self, targets):
+        # Mafia targets critical roles first, then any non-mafia
+        priority_targets = [p for p in targets if p.role in ['detective', 'doctor']]
+        return self.rng.choice(priority_targets) if priority_targets else self.rng.choice(targets)
+
+    def select_protective_target(self, targets):
+        # Doctor protects based on previous targeting or critical role
+        target_history = getattr(self, "target_history", {})
+        return max(targets, key=lambda x: (target_history.get(x.name, 0), x.role in ['detective']))
+
+    def detective_select_target(self, targets):
+        # Detective checks a new player each night, prioritizing those with suspicious behavior
+        return self.rng.choice(targets)  # Replace with more nuanced logic based on behavior
+
+    def strategic_vote(self, player):
+        # Players vote based on detected Mafia or most suspicious behavior
+        if player.role == 'villager':
+            suspected_mafia = [p for p in self.player_list if self.is_suspected_mafia(p, player)]
+            return self.rng.choice(suspected_mafia) if suspected_mafia else None
+        return None
+
+    def is_suspected_mafia(self, player, observer=None):
+        """Whether observer (an AI player) believes player is likely Mafia. Only hard AI players hold
+        beliefs (roleBeliefs.py); anyone else suspects nobody rather than reading the real role."""
+        if self.beliefs is None or observer is None:
+            return False
+        probability = self.beliefs.mafia_probability(observer, player)
+        return probability is not None and probability >= SUSPICION_THRESHOLD
+
+    def ai_target(self, difficulty, role, player, alive, phase=None):
+        """Pick a target other than player from the alive list, or None if there is nobody else.
+        Easy AI draws from alive directly and redraws on itself, which is the same uniform pick
+        without building a per-player list (keeps a whole day vote linear in the table size)."""
+        if len(alive) < 2:
+            return None
+        if difficulty not in (DIFFICULTY_NORMAL, DIFFICULTY_HARD, DIFFICULTY_EXPERT):
+            target = self.easy_ai(alive)
+            while target is player:
+                target = self.easy_ai(alive)
+            return target
+        return self.ai_choice(difficulty, role, player, [p for p in alive if p is not player], phase)
+
+    @traced("engine")
+    def ai_day_votes(self, voters, difficulty=None, votes=None):
+        """Let each AI voter pick another alive player. Returns the VoteTally (pass votes to add to one).
+        With no difficulty given each voter uses their own (see difficulty_for)."""
+        votes = self.new_tally() if votes is None else votes
+        alive = self.get_alive_players()
+        for voter in voters:
+            level = self.difficulty_for(voter) if difficulty is None else difficulty
+            vote_for = self.ai_target(level, "mafia" if voter.role_code == ROLE_MAFIA else "villager", voter, alive, "day")
+            if vote_for:
+                votes.cast(vote_for.name, voter.name)
+        return votes
+
+    @traced("engine")
+    def ai_night_actions(self, difficulty=None, skip=None):
+        """Let every alive AI with a night role act. The player in skip (a human) is left out.
+        Returns the mafia votes as a VoteTally."""
+        mafia_votes = self.new_tally()
+        alive = self.get_alive_players()
+        night_roles = [p for role in ("mafia", "doctor", "detective") for p in self.alive_by_role[role]]
+        for player in night_roles:
+            if player is skip or len(alive) < 2:
+                continue
+            level = self.difficulty_for(player) if difficulty is None else difficulty
+            if player.role_code == ROLE_MAFIA:
+                target = self.ai_target(level, "mafia", player, alive, "night")
+                mafia_votes.cast(target.name, player.name)
+            elif player.role_code == ROLE_DOCTOR:
+                self.protect_player(player, self.ai_choice(level, "doctor", player, alive, "night"))
+            elif player.role_code == ROLE_DETECTIVE:
+                self.investigate(player, self.ai_target(level, "detective", player, alive, "night"))
+        return mafia_votes
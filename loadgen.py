@@ -0,0 +1,282 @@
+'''
+loadgen.py
+Description:
+    Load generator for the multiplayer server (server.py). It starts many bot clients in one
+    asyncio process. Each bot joins a lobby, plays with the easy_ai / normal_ai / hard_ai
+    policies, then joins the next game, until the run ends. Load ramps up in steps (e.g.
+    100, 500, 1000, 2000 clients) and each step reports latency percentiles:
+        connect      TCP connect + join until the "joined" reply
+        vote rtt     an "act" message until its "ack"
+        transition   the last action of a phase until the next phase (or game over) arrives,
+                     measured once per lobby and phase
+    plus games finished per second and error counts.
+
+    A bot only knows what its client is told: its own role, its mafia allies and its own
+    investigation results. Its AI runs on a local GameEngine that mirrors that knowledge, so the
+    bots never see hidden roles.
+
+Usage:
+    python loadgen.py --local --steps 100,500,1000 --step-seconds 10
+    python loadgen.py --host 127.0.0.1 --port 7878 --steps 2000 --mix easy=1,hard=1
+'''
+
+from gameEngine import GameEngine
+from server import DEFAULT_PORT
+from simulation import parse_mix
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentiles(samples, points=PERCENTILES):
+    """{"p50": ..., ...} in milliseconds for a list of durations in seconds (empty -> None)."""
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    return {f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000 for p in points}
+
+
+class LoadStats:
+    """Samples and counters for one ramp step."""
+
+    def __init__(self):
+        self.connect = []
+        self.vote_rtt = []
+        self.transition = []
+        self.games = 0
+        self.errors = 0
+        self.disconnects = 0
+
+    def summary(self, clients, seconds):
+        return {
+            "clients": clients,
+            "seconds": seconds,
+            "games": self.games,
+            "games_per_sec": self.games / seconds if seconds else 0.0,
+            "errors": self.errors,
+            "disconnects": self.disconnects,
+            "connect_ms": percentiles(self.connect),
+            "vote_rtt_ms": percentiles(self.vote_rtt),
+            "transition_ms": percentiles(self.transition),
+        }
+
+
+class BotClient:
+    def __init__(self, generator, name, level):
+        self.generator = generator
+        self.name = name
+        self.level = level # AI difficulty this bot plays with
+        self.reader = self.writer = None
+        self.view = None # Local GameEngine holding what this bot knows about the current game
+        self.me = None
+        self.lobby = None
+        self.sent_at = None # When the pending action was sent
+        self.phase_key = None # (round, phase) of the phase being played
+
+    def send(self, message):
+        self.writer.write((json.dumps(message, separators=(",", ":")) + "\n").encode())
+
+    async def run(self):
+        gen = self.generator
+        start = time.perf_counter()
+        try:
+            self.reader, self.writer = await asyncio.open_connection(gen.host, gen.port)
+            first_join = True
+            while not gen.stopping:
+                self.send({"op": "join", "name": self.name, "size": gen.table_size})
+                await self.play_one_game(start if first_join else None)
+                first_join = False
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            gen.stats.disconnects += 1
+        finally:
+            if self.writer:
+                self.writer.close()
+
+    async def play_one_game(self, connect_start):
+        """Read messages until this bot's game ends."""
+        gen = self.generator
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            message = json.loads(line)
+            kind = message["type"]
+            now = time.perf_counter()
+            if kind == "joined":
+                self.lobby = message["lobby"]
+                self.view = None
+                if connect_start is not None:
+                    gen.stats.connect.append(now - connect_start)
+            elif kind == "role":
+                self.role, self.attribute, self.allies = message["role"], message["attribute"], message.get("allies", [])
+            elif kind == "phase":
+                self.phase_key = (message["round"], message["phase"])
+                gen.phase_started(self.lobby, self.phase_key, now)
+                self.update_view(message["alive"])
+                if message["acting"]:
+                    self.act(message["phase"])
+            elif kind == "ack":
+                gen.stats.vote_rtt.append(now - self.sent_at)
+            elif kind == "investigation" and self.view:
+                target = self.view.find_player(message["target"])
+                if target:
+                    target.role = message["role"]
+                    self.view.rebuild_role_index()
+            elif kind == "game_over":
+                gen.phase_started(self.lobby, "over", now)
+                gen.game_finished(self.lobby)
+                return
+            elif kind == "error":
+                gen.stats.errors += 1
+
+    def update_view(self, alive):
+        """Build the local view on the first phase, then mark players who died since."""
+        if self.view is None:
+            self.view = GameEngine(len(alive))
+            for name in alive:
+                self.view.add_player(name)
+            self.me = self.view.find_player(self.name)
+            self.me.role = self.role
+            self.me.attribute = self.attribute
+            for ally in self.allies:
+                self.view.find_player(ally).role = "mafia"
+            self.view.rebuild_role_index()
+            self.view.game_difficulty = self.level
+            return
+        alive = set(alive)
+        for player in self.view.get_alive_players():
+            if player.name not in alive:
+                self.view.kill_player(player, "unknown")
+
+    def act(self, phase):
+        view, me = self.view, self.me
+        alive = view.get_alive_players()
+        if phase == "night" and me.role == "doctor":
+            target = view.ai_choice(self.level, "doctor", me, alive, phase)
+        else:
+            role = me.role if phase == "night" else ("mafia" if me.role == "mafia" else "villager")
+            target = view.ai_target(self.level, role, me, alive, phase)
+        self.sent_at = time.perf_counter()
+        self.generator.action_sent(self.lobby, self.phase_key, self.sent_at)
+        self.send({"op": "act", "target": target.name})
+
+
+class LoadGenerator:
+    def __init__(self, host, port, table_size=8, difficulty_mix=None):
+        self.host = host
+        self.port = port
+        self.table_size = table_size
+        self.difficulty_mix = difficulty_mix or {1: 1.0}
+        self.stats = LoadStats()
+        self.stopping = False
+        self.tasks = []
+        self.last_action = {} # Lobby -> (phase key, when the latest action of that phase was sent)
+        self.finished_lobbies = set() # So each game is counted once, not once per bot
+        self._names = 0
+
+    def action_sent(self, lobby, phase_key, when):
+        self.last_action[lobby] = (phase_key, when)
+
+    def phase_started(self, lobby, phase_key, when):
+        """The first client of a lobby to see a new phase records the transition latency."""
+        last = self.last_action.get(lobby)
+        if last is not None and last[0] != phase_key:
+            del self.last_action[lobby]
+            self.stats.transition.append(when - last[1])
+
+    def game_finished(self, lobby):
+        if lobby not in self.finished_lobbies:
+            self.finished_lobbies.add(lobby)
+            self.stats.games += 1
+
+    def add_clients(self, count):
+        levels, weights = list(self.difficulty_mix), list(self.difficulty_mix.values())
+        for level in random.choices(levels, weights, k=count):
+            self._names += 1
+            bot = BotClient(self, f"bot{self._names}", level)
+            self.tasks.append(asyncio.create_task(bot.run()))
+
+    async def ramp(self, steps, step_seconds):
+        """Grow to each client count in steps (rounded up to full tables) and report each step."""
+        report = []
+        for target in steps:
+            target = -(-target // self.table_size) * self.table_size
+            self.stats = LoadStats()
+            self.add_clients(target - len(self.tasks))
+            start = time.perf_counter()
+            await asyncio.sleep(step_seconds)
+            summary = self.stats.summary(len(self.tasks), time.perf_counter() - start)
+            report.append(summary)
+            print(format_step(summary))
+        self.stopping = True
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        return report
+
+
+def format_step(summary):
+    def fmt(values):
+        return " / ".join("-" if v is None else f"{v:.1f}" for v in values.values())
+    return (f"{summary['clients']:>6} clients  {summary['games_per_sec']:>8.1f} games/s  "
+            f"connect {fmt(summary['connect_ms'])} ms  vote rtt {fmt(summary['vote_rtt_ms'])} ms  "
+            f"transition {fmt(summary['transition_ms'])} ms  (p50/p90/p99, {summary['errors']} errors, "
+            f"{summary['disconnects']} disconnects)")
+
+
+def start_local_server(port):
+    """Run server.py in its own process so the bots and the server don't share one CPU."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    process = subprocess.Popen([sys.executable, script, "--port", str(port)], stdout=subprocess.PIPE, text=True)
+    process.stdout.readline() # "Mafia server listening on ..."
+    return process
+
+
+def raise_file_limit():
+    """Thousands of sockets need more than the usual 1024 file descriptors."""
+    try:
+        import resource
+    except ImportError:
+        return # Not available on Windows
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Mafia server with bot clients.")
+    parser.add_argument("--host", default="127.0.0.1", help="Server address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Server port")
+    parser.add_argument("--local", action="store_true", help="Start a server on this machine for the run")
+    parser.add_argument("--steps", default="100,500,1000", help="Comma-separated client counts to ramp through")
+    parser.add_argument("--step-seconds", type=float, default=10.0, help="How long to hold each step")
+    parser.add_argument("--players", type=int, default=8, help="Players per table")
+    parser.add_argument("--mix", default="easy=1,normal=1,hard=1", help="Bot difficulty weights, e.g. easy=2,hard=1")
+    parser.add_argument("--output", default=None, help="Write the per-step results to this JSON file")
+    args = parser.parse_args(argv)
+
+    raise_file_limit()
+    server = start_local_server(args.port) if args.local else None
+    try:
+        generator = LoadGenerator(args.host, args.port, args.players, parse_mix(args.mix))
+        steps = [int(step) for step in args.steps.split(",")]
+        report = asyncio.run(generator.ramp(steps, args.step_seconds))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"players": args.players, "mix": args.mix, "steps": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
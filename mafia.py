@@ -0,0 +1,48 @@
+'''
+mafia.py
+Description:
+    Single entry point for every way of running the game. Only the module for the chosen
+    command is imported, so the headless commands never load tkinter or the Tk views, and the
+    GUI loads a game mode's view only once it is picked from the main menu.
+
+Usage:
+    python -m mafia gui
+    python -m mafia simulate --players 10 --games 100000
+    python -m mafia batch --players 10 --games 100000
+    python -m mafia benchmark --quick
+    python -m mafia serve --port 7878
+    python -m mafia loadgen --local --steps 100,500,1000
+    python -m mafia replay games.mlog --stats
+    python -m mafia tournament --policies easy,normal,hard --games 2000
+'''
+
+import importlib
+import sys
+
+
+# Command -> (module, function called with the remaining arguments)
+COMMANDS = {
+    "gui": ("main", "main"),
+    "simulate": ("simulation", "main"),
+    "batch": ("batchEngine", "main"),
+    "benchmark": ("benchmark", "main"),
+    "serve": ("server", "main"),
+    "loadgen": ("loadgen", "main"),
+    "replay": ("replay", "main"),
+    "tournament": ("tournament", "main"),
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(f"usage: python -m mafia {{{','.join(COMMANDS)}}} [options]", file=sys.stderr)
+        return 2
+    module_name, function_name = COMMANDS[argv[0]]
+    run = getattr(importlib.import_module(module_name), function_name)
+    run(argv[1:])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
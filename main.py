@@ -51,13 +51,20 @@ Invariants:
 Known Faults:
     - Input validation is minimal; role validation is not enforced strictly.  
 '''
-from multiplayerGameClass import MultiplayerGameClass
 from tkinter import Tk, Label, Button, Entry, StringVar, messagebox, Frame, Radiobutton, IntVar
-from gameClass import GameClass
-from singlePlayer_gameClass import SinglePlayerMode
+from tracing import traced
+import assets
+import importlib
 import sys
 
 
+# Menu choice -> (module, class) of its game view, imported only once the mode is picked
+GAME_MODES = {
+    1: ("singlePlayer_gameClass", "SinglePlayerMode"),
+    2: ("multiplayerGameClass", "MultiplayerGameClass"),
+}
+
+
 class MafiaGameApp:
     def __init__(self, root):
         self.root = root
@@ -66,8 +73,11 @@ class MafiaGameApp:
         self.main_frame.pack(pady=20, padx=20)
 
         self.gamemode = IntVar()
+        self.game_class = None # View class for the chosen mode, loaded by handle_main_menu
         self.create_main_menu()
+        assets.cache.preload(root) # Phase images are ready before the first phase starts
 
+    @traced("ui")
     def clear_frame(self):
         for widget in self.main_frame.winfo_children():
             widget.destroy()
@@ -81,18 +91,26 @@ class MafiaGameApp:
         Radiobutton(self.main_frame, text="Exit", variable=self.gamemode, value=3).pack(anchor="w")
         Button(self.main_frame, text="Proceed", command=self.handle_main_menu).pack(pady=10)
 
+    @traced("ui")
     def handle_main_menu(self):
         """Handle the user's choice from the main menu."""
         mode = self.gamemode.get()
         if mode == 3:
             sys.exit("Exit Complete.")
         elif mode == 1:
+            self.game_class = self.load_game_mode(mode)
             self.create_singleplayer_setup()
         elif mode == 2:
+            self.game_class = self.load_game_mode(mode)
             self.create_multiplayer_setup()
         else:
             messagebox.showerror("Invalid Input", "Please select a mode!")
 
+    def load_game_mode(self, mode):
+        """Import the view class for a game mode (the module is only loaded the first time)."""
+        module_name, class_name = GAME_MODES[mode]
+        return getattr(importlib.import_module(module_name), class_name)
+
     def create_singleplayer_setup(self):
         self.clear_frame()
         Label(self.main_frame, text="Single Player Mode", font=("Arial", 14)).pack(pady=10)
@@ -101,6 +119,7 @@ class MafiaGameApp:
         Entry(self.main_frame, textvariable=self.player_name).pack(pady=5)
         Button(self.main_frame, text="Start Game", command=self.start_singleplayer).pack(pady=10)
 
+    @traced("ui")
     def start_singleplayer(self):
         name = self.player_name.get().lower()
         if not name:
@@ -112,15 +131,16 @@ class MafiaGameApp:
         Button(self.main_frame, text="Normal Mode", command=lambda: self.start_game(name, 2)).pack(pady=5)
         Button(self.main_frame, text="Hard Mode", command=lambda: self.start_game(name, 3)).pack(pady=5)
 
+    @traced("ui")
     def start_game(self, name, difficulty):
         """Initialize the game and start the first phase."""
-        self.game = SinglePlayerMode(10, 1, self.main_frame, self)  # Pass `self` as the `app` parameter
+        self.game = self.game_class(10, 1, self.main_frame, self)  # Pass `self` as the `app` parameter
         self.game.main_player(name)
         self.game.add_player(name)
 
-        # Add other players
-        name_list = ["John", "Bob", "Robin", "Elizabeth", "Alice", "Danny", "Alphonso", "Sedrick", "Darius"]
-        for player in name_list:
+        # Add other players (skipping any AI name the player already took)
+        name_list = ["John", "Bob", "Robin", "Elizabeth", "Alice", "Danny", "Alphonso", "Sedrick", "Darius", "Evelyn"]
+        for player in [n for n in name_list if n.casefold() != name.casefold()][:9]:
             self.game.add_player(player)
 
         # Assign roles and set difficulty
@@ -138,6 +158,7 @@ class MafiaGameApp:
         Entry(self.main_frame, textvariable=self.num_players).pack(pady=5)
         Button(self.main_frame, text="Setup Players", command=self.setup_multiplayer).pack(pady=10)
 
+    @traced("ui")
     def setup_multiplayer(self):
         try:
             number_of_players = int(self.num_players.get())
@@ -159,35 +180,51 @@ class MafiaGameApp:
 
         Button(self.main_frame, text="Start Game", command=lambda: self.start_multiplayer_game()).pack(pady=10)
 
+    @traced("ui")
     def start_multiplayer(self):
+        from gameClass import GameClass # Legacy console view, only needed on this path
         self.game = GameClass(len(self.multiplayer_names), 2, self.main_frame, self)  # Pass self
         for name_var in self.multiplayer_names:
             name = name_var.get().lower()
             if not name:
                 messagebox.showerror("Error", "Player names cannot be empty!")
                 return
-            self.game.add_player(name)
+            try:
+                self.game.add_player(name)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
 
         self.game.assignRoles()
 
         # Start the role call UI
         self.role_call(self.game)
     
+    @traced("ui")
     def start_multiplayer_game(self):
         """Initialize the game for multiplayer and start the first phase."""
-        self.game = MultiplayerGameClass(len(self.multiplayer_names), self.main_frame, self)
+        self.game = self.game_class(len(self.multiplayer_names), self.main_frame, self)
 
         for name_var in self.multiplayer_names:
             name = name_var.get().lower()
             if not name:
                 messagebox.showerror("Error", "Player names cannot be empty!")
                 return
-            self.game.add_player(name)
+            try:
+                self.game.add_player(name)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
 
         self.game.assignRoles()
         self.game.start_role_call(self.game)  # No arguments required
 
-if __name__ == "__main__":
+def main(argv=None):
+    """Open the game window and run the Tk loop."""
     root = Tk()
     app = MafiaGameApp(root)
     root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+'''
+metrics.py
+Description:
+    Lightweight in-process metrics for finding where a game's time goes. The registry holds
+    counters (votes cast, kills, saves, random events, finished games) and latency histograms
+    per phase (day_phase, night_phase, mafia_phase, show_image, ...). Values can be read with
+    registry.snapshot() or dumped in the Prometheus text format with registry.to_prometheus().
+
+    Metrics are off by default and cost one attribute check per timed call while disabled.
+    Turn them on with enable() or by setting MAFIA_METRICS=1 in the environment. Every GameEngine
+    reports its events through record_event, which returns at once while metrics are off.
+'''
+
+from voteTally import VoteTally
+from bisect import bisect_left
+from functools import wraps
+import os
+import time
+
+
+# Upper bounds (seconds) of the latency buckets; the +Inf bucket is implicit
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1) # Last slot is the +Inf bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs, ending with +Inf."""
+        running = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.metrics = {} # (name, labels) -> Counter or Histogram
+        self.help = {} # name -> (type, help text)
+
+    def counter(self, name, help_text="", **labels):
+        """Get (or create) the counter with this name and labels."""
+        return self._get(Counter, "counter", name, help_text, labels)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS, **labels):
+        """Get (or create) the histogram with this name and labels."""
+        return self._get(lambda: Histogram(buckets), "histogram", name, help_text, labels)
+
+    def _get(self, factory, kind, name, help_text, labels):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self.metrics.get(key)
+        if metric is None:
+            metric = self.metrics[key] = factory()
+            self.help.setdefault(name, (kind, help_text))
+        return metric
+
+    def reset(self):
+        """Drop every recorded value."""
+        self.metrics.clear()
+        self.help.clear()
+
+    def snapshot(self):
+        """Current values as plain data: {name: [{"labels": {...}, "value": n} or histogram fields]}."""
+        data = {}
+        for (name, labels), metric in sorted(self.metrics.items()):
+            entry = {"labels": dict(labels)}
+            if isinstance(metric, Counter):
+                entry["value"] = metric.value
+            else:
+                entry.update(count=metric.count, sum=metric.sum, buckets=metric.cumulative())
+            data.setdefault(name, []).append(entry)
+        return data
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for name, entries in self.snapshot().items():
+            kind, help_text = self.help[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for entry in entries:
+                labels = entry["labels"]
+                if kind == "counter":
+                    lines.append(f"{name}{format_labels(labels)} {entry['value']}")
+                    continue
+                for bound, count in entry["buckets"]:
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{format_labels({**labels, 'le': le})} {count}")
+                lines.append(f"{name}_sum{format_labels(labels)} {entry['sum']}")
+                lines.append(f"{name}_count{format_labels(labels)} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+registry = MetricsRegistry(enabled=os.environ.get("MAFIA_METRICS") == "1")
+
+
+def enable():
+    registry.enabled = True
+
+
+def disable():
+    registry.enabled = False
+
+
+def timed(phase):
+    """Decorator recording the call's duration in the mafia_phase_duration_seconds histogram."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.histogram("mafia_phase_duration_seconds", "Time spent in each game phase or UI step",
+                                   phase=phase).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def record_event(event, data):
+    """GameEngine listener that turns engine events into counters."""
+    if not registry.enabled:
+        return
+    if event == "day_vote_result" or event == "mafia_target":
+        votes = data["votes"]
+        total = votes.total if isinstance(votes, VoteTally) else sum(votes.values())
+        kind = "day" if event == "day_vote_result" else "mafia"
+        registry.counter("mafia_votes_cast_total", "Votes cast", vote=kind).inc(total)
+    elif event == "player_died":
+        registry.counter("mafia_deaths_total", "Players who died, by cause", cause=data["cause"]).inc()
+        if data["cause"] == "mafia":
+            registry.counter("mafia_kills_total", "Night kills by the mafia").inc()
+    elif event == "night_result" and data["outcome"] == "saved":
+        registry.counter("mafia_saves_total", "Mafia targets saved by the doctor").inc()
+    elif event == "random_event":
+        registry.counter("mafia_random_events_total", "Random events fired", event=data["event"] or "none").inc()
+    elif event == "game_over":
+        registry.counter("mafia_games_completed_total", "Finished games by winner", winner=data["winning_team"]).inc()
@@ -1,23 +1,60 @@
 from gameClass import GameClass
+from metrics import timed
+from tracing import traced
+from screens import MessageScreen, PlayerChoiceScreen
+import assets
 import tkinter as tk
-import random
 from tkinter import Label, Button, Entry, StringVar, messagebox, Radiobutton
 
 class MultiplayerGameClass(GameClass):
     def __init__(self, num_players, main_frame, app):
         super().__init__(num_players, 2, main_frame, app)
         self.main_frame = main_frame  # Store the main_frame for UI updates
+        self.screens = {} # Reusable screens, built on first use (see show_screen)
 
+    """ =============================================================== SCREENS ======================================================================= """
+
+    @traced("ui")
+    def clear_frame(self):
+        """Hide the reusable screens and destroy any one-off widgets."""
+        pooled = {screen.frame for screen in self.screens.values()}
+        for widget in self.frame.winfo_children():
+            if widget in pooled:
+                widget.pack_forget()
+            else:
+                widget.destroy()
+
+    def show_screen(self, name, factory):
+        """Clear the frame and show the named reusable screen, building it with factory(frame) the first time."""
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = self.screens[name] = factory(self.frame)
+        self.clear_frame()
+        screen.show()
+        return screen
+
+    def show_message(self, lines, buttons):
+        """Show lines of (text, font) over buttons of (text, command) on the reusable message screen."""
+        self.show_screen("message", MessageScreen).update(lines, buttons)
+
+    def show_player_choice(self, lines, choices, submit_text, command):
+        """Show a pick-a-player prompt on the reusable choice screen. Returns the choice's StringVar."""
+        screen = self.show_screen("choice", lambda frame: PlayerChoiceScreen(frame, self.player_list))
+        return screen.update(lines, choices, submit_text, command)
+
+    @traced("ui")
     def start_day_phase(self):
         """Handles the day phase for multiplayer mode, allowing players to vote."""
-        self.show_image(r"C:/Users/Murph/OneDrive/Desktop/Code/EECS581/Mafia/day_phase.png", self.multiplayer_day_phase)
+        self.show_image("day_phase.png", self.multiplayer_day_phase)
 
+    @traced("ui")
+    @timed("multiplayer_day_phase")
     def multiplayer_day_phase(self):
         """Handles the day phase for multiplayer mode, allowing players to vote."""
         self.clear_frame()
         tk.Label(self.frame, text="Day Phase: Time to vote!", font=("Arial", 14)).pack(pady=10)
 
-        self.votes = {}
+        self.votes = self.new_tally()
         self.current_voter_index = 0
         self.alive_players = [p for p in self.player_list if p.status == "alive"]
 
@@ -34,40 +71,28 @@ class MultiplayerGameClass(GameClass):
         else:
             self.tally_multiplayer_votes()
 
+    @traced("ui")
     def show_multiplayer_voting_screen(self, voter):
         """Show the voting screen for the current player in multiplayer."""
-        self.clear_frame()
-
-        # Display the voter's name and instruction
-        tk.Label(self.frame, text=f"{voter.name.capitalize()}, it's your turn to vote!", font=("Arial", 14)).pack(pady=10)
-
-        # Initialize the StringVar for vote_target with an empty value
-        self.vote_target = tk.StringVar(value="")
-
         # List of alive players to vote for (exclude the voter themselves)
-        alive_targets = [p for p in self.player_list if p.status == "alive" and p.name != voter.name]
+        alive_targets = self.get_alive_players(exclude=voter)
 
         if not alive_targets:
+            self.clear_frame()
             tk.Label(self.frame, text="No valid targets to vote for!", font=("Arial", 12)).pack(pady=10)
             self.current_voter_index += 1
             self.multiplayer_next_voter()  # Move to the next voter
             return
 
-        for player in alive_targets:
-            tk.Radiobutton(
-                self.frame,
-                text=player.name.capitalize(),
-                variable=self.vote_target,
-                value=player.name
-            ).pack(anchor="w")
-
-        # Submit vote button
-        tk.Button(
-            self.frame,
-            text="Submit Vote",
-            command=lambda: self.submit_multiplayer_vote(voter)
-        ).pack(pady=10)
+        # Same screen for every voter; only the prompt, the hidden voter and the command change
+        self.vote_target = self.show_player_choice(
+            [(f"{voter.name.capitalize()}, it's your turn to vote!", ("Arial", 14))],
+            alive_targets,
+            "Submit Vote",
+            lambda: self.submit_multiplayer_vote(voter)
+        )
 
+    @traced("ui")
     def submit_multiplayer_vote(self, voter):
         """Record the current player's vote and move to the next voter."""
         selected_player = self.vote_target.get()
@@ -75,7 +100,7 @@ class MultiplayerGameClass(GameClass):
             messagebox.showerror("Error", "You must select a player to vote!")
             return
 
-        self.votes[selected_player] = self.votes.get(selected_player, 0) + 1
+        self.votes.cast(selected_player, voter.name)
         self.current_voter_index += 1
 
         if self.current_voter_index < len(self.alive_players):
@@ -87,15 +112,9 @@ class MultiplayerGameClass(GameClass):
         """Tally votes and eliminate the player with the most votes."""
         self.clear_frame()
 
-        if self.votes:
-            max_votes = max(self.votes.values())
-            candidates = [name for name, count in self.votes.items() if count == max_votes]
-            eliminated_player_name = random.choice(candidates) if len(candidates) > 1 else candidates[0]
-            eliminated_player = next(p for p in self.player_list if p.name == eliminated_player_name)
-
-            eliminated_player.status = "dead"
+        eliminated_player = self.resolve_day_votes(self.votes)
+        if eliminated_player:
             tk.Label(self.frame, text=f"{eliminated_player.name.capitalize()} has been eliminated!", font=("Arial", 16)).pack(pady=20)
-            self.update_role_count(eliminated_player.role, increment=False)
 
             if self.check_win_conditions():
                 return
@@ -106,9 +125,10 @@ class MultiplayerGameClass(GameClass):
             command=self.start_night_phase
         ).pack(pady=10)
 
+    @traced("ui")
     def start_night_phase(self):
         """Handles the Night Phase for multiplayer mode."""
-        self.show_image(r"C:/Users/Murph/OneDrive/Desktop/Code/EECS581/Mafia/night_phase.png", self.multiplayer_night_phase)
+        self.show_image("night_phase.png", self.multiplayer_night_phase)
 
     def multiplayer_night_phase(self):
         """Handles the Night Phase for multiplayer mode."""
@@ -124,6 +144,8 @@ class MultiplayerGameClass(GameClass):
             command=self.mafia_phase
         ).pack(pady=10)
 
+    @traced("ui")
+    @timed("mafia_phase")
     def mafia_phase(self):
         """Handles the Mafia's voting phase."""
         self.clear_frame()
@@ -131,49 +153,33 @@ class MultiplayerGameClass(GameClass):
         tk.Label(self.frame, text="Mafia, choose a player to eliminate.", font=("Arial", 12)).pack(pady=10)
 
         # Create a dictionary for Mafia votes
-        self.mafia_votes = {}
+        self.mafia_votes = self.new_tally()
         self.current_mafia_index = 0  # Start with the first Mafia player
         self.show_mafia_voting_screen()
     
+    @traced("ui")
     def show_mafia_voting_screen(self):
         """Display the voting screen for the current Mafia player."""
         # Get the current mafia player
-        mafia_players = [p for p in self.player_list if p.role == "mafia" and p.status == "alive"]
+        mafia_players = self.alive_with_role("mafia")
         mafia_player = mafia_players[self.current_mafia_index]
 
-        self.clear_frame()
-
-        # Display the current mafia player's name and instruction
-        tk.Label(self.frame, text=f"{mafia_player.name.capitalize()}, it's your turn to vote!", font=("Arial", 14)).pack(pady=10)
-        tk.Label(self.frame, text="Mafia allies:", font=("Arial", 12, "bold")).pack(pady=5)
-
         # Display the list of mafia allies
         mafia_allies = [p.name.capitalize() for p in mafia_players if p != mafia_player]
-        if mafia_allies:
-            tk.Label(self.frame, text=", ".join(mafia_allies), font=("Arial", 12)).pack(pady=5)
-        else:
-            tk.Label(self.frame, text="No other mafia allies alive.", font=("Arial", 12)).pack(pady=5)
+        allies_text = ", ".join(mafia_allies) if mafia_allies else "No other mafia allies alive."
 
         # Voting options for the mafia player
-        alive_targets = [p for p in self.player_list if p.status == "alive" and p.name != mafia_player.name]
-        self.vote_target = tk.StringVar(value="")
-
-        tk.Label(self.frame, text="Choose a player to eliminate:", font=("Arial", 12)).pack(pady=10)
-
-        for player in alive_targets:
-            tk.Radiobutton(
-                self.frame,
-                text=player.name.capitalize(),
-                variable=self.vote_target,
-                value=player.name
-            ).pack(anchor="w")
-
-        # Submit vote button
-        tk.Button(
-            self.frame,
-            text="Submit Vote",
-            command=lambda: self.submit_mafia_vote(mafia_player)
-        ).pack(pady=10)
+        self.vote_target = self.show_player_choice(
+            [
+                (f"{mafia_player.name.capitalize()}, it's your turn to vote!", ("Arial", 14)),
+                ("Mafia allies:", ("Arial", 12, "bold")),
+                (allies_text, ("Arial", 12)),
+                ("Choose a player to eliminate:", ("Arial", 12)),
+            ],
+            self.get_alive_players(exclude=mafia_player),
+            "Submit Vote",
+            lambda: self.submit_mafia_vote(mafia_player)
+        )
 
     def submit_mafia_vote(self, mafia_player):
         """Record the Mafia player's vote and move to the next Mafia player."""
@@ -184,13 +190,11 @@ class MultiplayerGameClass(GameClass):
             return
 
         # Record the vote
-        self.mafia_votes[selected_player] = self.mafia_votes.get(selected_player, 0) + 1
+        self.mafia_votes.cast(selected_player, mafia_player.name)
 
         # Move to the next Mafia player
         self.current_mafia_index += 1
-        mafia_players = [p for p in self.player_list if p.role == "mafia" and p.status == "alive"]
-
-        if self.current_mafia_index < len(mafia_players):
+        if self.current_mafia_index < self.num_mafia:
             self.show_mafia_voting_screen()
         else:
             self.resolve_mafia_votes()
@@ -198,11 +202,7 @@ class MultiplayerGameClass(GameClass):
     def resolve_mafia_votes(self):
         """Determine and announce the Mafia's chosen target."""
         self.clear_frame()
-        if self.mafia_votes:
-            max_votes = max(self.mafia_votes.values())
-            targets_with_max_votes = [name for name, count in self.mafia_votes.items() if count == max_votes]
-            self.mafia_target = random.choice(targets_with_max_votes)
-
+        if self.choose_mafia_target(self.mafia_votes):
             tk.Label(
                 self.frame,
                 text=f"Mafia has chosen to target {self.mafia_target.capitalize()}.",
@@ -215,6 +215,8 @@ class MultiplayerGameClass(GameClass):
             command=self.detective_phase  # Transition to the Detective Phase
         ).pack(pady=10)
 
+    @traced("ui")
+    @timed("doctor_phase")
     def doctor_phase(self):
         """Handles the Doctor's protection phase."""
         self.clear_frame()
@@ -224,34 +226,22 @@ class MultiplayerGameClass(GameClass):
         # Display Doctor voting screen
         self.show_doctor_screen()
 
+    @traced("ui")
     def show_doctor_screen(self):
         """Display the screen for the Doctor to choose a player to protect."""
-        doctor_player = next((p for p in self.player_list if p.role == "doctor" and p.status == "alive"), None)
+        doctor_player = self.first_alive_with_role("doctor")
 
         if not doctor_player:
             self.proceed_to_villager_phase()
             return
 
-        self.clear_frame()
-        tk.Label(self.frame, text=f"{doctor_player.name.capitalize()}, it's your turn to protect a player!", font=("Arial", 14)).pack(pady=10)
-
-        # List of alive players
-        self.protect_target = tk.StringVar()
-        alive_players = [p for p in self.player_list if p.status == "alive"]
-
-        for player in alive_players:
-            tk.Radiobutton(
-                self.frame,
-                text=player.name.capitalize(),
-                variable=self.protect_target,
-                value=player.name
-            ).pack(anchor="w")
-
-        tk.Button(
-            self.frame,
-            text="Submit Protection",
-            command=self.submit_doctor_protection
-        ).pack(pady=10)
+        # The doctor may protect any alive player, themselves included
+        self.protect_target = self.show_player_choice(
+            [(f"{doctor_player.name.capitalize()}, it's your turn to protect a player!", ("Arial", 14))],
+            self.get_alive_players(),
+            "Submit Protection",
+            self.submit_doctor_protection
+        )
 
     def submit_doctor_protection(self):
         """Record the Doctor's protection choice."""
@@ -262,8 +252,8 @@ class MultiplayerGameClass(GameClass):
             return
 
         # Protect the selected player
-        protected_player = next(p for p in self.player_list if p.name == selected_player)
-        protected_player.protected = True
+        doctor_player = self.first_alive_with_role("doctor")
+        self.protect_player(doctor_player, self.find_player(selected_player))
 
         self.proceed_to_villager_phase()
 
@@ -272,8 +262,8 @@ class MultiplayerGameClass(GameClass):
         self.clear_frame()
         tk.Label(self.frame, text="Villagers with Suspicion Radar, open your eyes.", font=("Arial", 16)).pack(pady=10)
 
-        for player in self.player_list:
-            if player.role == "villager" and player.status == "alive" and player.attribute == "Suspicion Radar":
+        for player in self.alive_with_role("villager"):
+            if player.attribute == "Suspicion Radar":
                 if player.name in self.mafia_votes:
                     tk.Label(
                         self.frame,
@@ -293,21 +283,18 @@ class MultiplayerGameClass(GameClass):
             command=self.resolve_night_phase
         ).pack(pady=10)
 
+    @traced("ui")
+    @timed("resolve_night_phase")
     def resolve_night_phase(self):
         """Resolve the Night Phase actions and announce the results."""
         self.clear_frame()
 
-        if self.mafia_target:
-            target_player = next(p for p in self.player_list if p.name == self.mafia_target)
-            if target_player.protected:
-                tk.Label(self.frame, text=f"{target_player.name.capitalize()} was protected by the Doctor and survived!", font=("Arial", 14)).pack(pady=10)
-            else:
-                target_player.status = "dead"
-                tk.Label(self.frame, text=f"{target_player.name.capitalize()} was killed during the night!", font=("Arial", 14)).pack(pady=10)
-
-        # Reset night actions
-        for player in self.player_list:
-            player.reset_night_actions()
+        # Apply the mafia's kill (unless protected) and reset night actions
+        outcome, target_player = self.resolve_night()
+        if outcome == "saved":
+            tk.Label(self.frame, text=f"{target_player.name.capitalize()} was protected by the Doctor and survived!", font=("Arial", 14)).pack(pady=10)
+        elif outcome == "killed":
+            tk.Label(self.frame, text=f"{target_player.name.capitalize()} was killed during the night!", font=("Arial", 14)).pack(pady=10)
 
         # Check win conditions before transitioning to the next day
         if self.check_win_conditions():
@@ -319,119 +306,88 @@ class MultiplayerGameClass(GameClass):
             command=self.random_event_generator
         ).pack(pady=10)
 
+    @traced("ui")
     def start_role_call(self, game):
         """Begin the role call sequence with a transition screen for the first player."""
         self.current_role_index = 0  # Start with the first player
         self.transition_screen()
 
+    @traced("ui")
     def show_player_role(self, player):
         """Display the current player's role."""
-        self.clear_frame()
-
-        tk.Label(self.frame, text=f"{player.name.capitalize()}, it's your turn!", font=("Arial", 14)).pack(pady=10)
-        tk.Label(self.frame, text=f"Your role: {player.role.capitalize()}", font=("Arial", 12)).pack(pady=10)
+        lines = [
+            (f"{player.name.capitalize()}, it's your turn!", ("Arial", 14)),
+            (f"Your role: {player.role.capitalize()}", ("Arial", 12)),
+        ]
 
         # Display special abilities for villagers
         if player.role == "villager" and player.attribute:
-            tk.Label(self.frame, text=f"Special ability: {player.attribute.capitalize()}", font=("Arial", 12)).pack(pady=5)
+            lines.append((f"Special ability: {player.attribute.capitalize()}", ("Arial", 12)))
 
         # Add a button for the next step
         if self.current_role_index < len(self.player_list) - 1:
-            tk.Button(self.frame, text="Next", command=self.next_player_role).pack(pady=10)
+            button = ("Next", self.next_player_role)
         else:
-            tk.Button(self.frame, text="Proceed to Day Phase", command=self.start_day_phase).pack(pady=10)
+            button = ("Proceed to Day Phase", self.start_day_phase)
+        self.show_message(lines, [button])
 
+    @traced("ui")
     def transition_screen(self):
         """Show a transition screen between players' role displays."""
-        self.clear_frame()
-
-        # Display a message for the next player
-        tk.Label(
-            self.frame,
-            text=f"Next Player: {self.player_list[self.current_role_index].name.capitalize()}",
-            font=("Arial", 14),
-        ).pack(pady=20)
-        tk.Label(
-            self.frame,
-            text="Please come to the screen. Press 'Continue' when ready.",
-            font=("Arial", 12),
-        ).pack(pady=10)
-
-        # Add a button to proceed
-        tk.Button(
-            self.frame,
-            text="Continue",
-            command=lambda: self.show_player_role(self.player_list[self.current_role_index]),
-        ).pack(pady=10)
+        # Display a message for the next player, with a button to proceed
+        self.show_message(
+            [
+                (f"Next Player: {self.player_list[self.current_role_index].name.capitalize()}", ("Arial", 14)),
+                ("Please come to the screen. Press 'Continue' when ready.", ("Arial", 12)),
+            ],
+            [("Continue", lambda: self.show_player_role(self.player_list[self.current_role_index]))]
+        )
             
     def next_player_role(self):
         self.current_role_index += 1
         self.transition_screen()
 
+    @traced("ui")
+    @timed("detective_phase")
     def detective_phase(self):
         """Handles the Detective's investigation phase."""
         self.clear_frame()
 
         # Identify the detective
-        detective = next((p for p in self.player_list if p.role == "detective" and p.status == "alive"), None)
+        detective = self.first_alive_with_role("detective")
 
         if not detective:
             # No active detective, proceed to the Doctor Phase
             self.proceed_to_doctor_phase()
             return
 
-        # UI for the detective's turn
-        tk.Label(self.frame, text=f"{detective.name.capitalize()}, it's your turn to investigate!", font=("Arial", 14)).pack(pady=10)
-        tk.Label(self.frame, text="Select a player to investigate:", font=("Arial", 12)).pack(pady=10)
-
-        # List of alive players to investigate
-        self.investigation_target = tk.StringVar()
-        alive_players = [p for p in self.player_list if p.status == "alive" and p.name != detective.name]
-
-        for player in alive_players:
-            tk.Radiobutton(
-                self.frame,
-                text=player.name.capitalize(),
-                variable=self.investigation_target,
-                value=player.name
-            ).pack(anchor="w")
-
-        # Button to submit investigation
-        tk.Button(
-            self.frame,
-            text="Investigate",
-            command=lambda: self.show_investigation_result(detective)
-        ).pack(pady=10)
-
+        # UI for the detective's turn: any other alive player can be investigated
+        self.investigation_target = self.show_player_choice(
+            [
+                (f"{detective.name.capitalize()}, it's your turn to investigate!", ("Arial", 14)),
+                ("Select a player to investigate:", ("Arial", 12)),
+            ],
+            self.get_alive_players(exclude=detective),
+            "Investigate",
+            lambda: self.show_investigation_result(detective)
+        )
+
+    @traced("ui")
     def show_detective_screen(self):
         """Display the screen for the Detective to choose a player to investigate."""
-        detective_player = next((p for p in self.player_list if p.role == "detective" and p.status == "alive"), None)
+        detective_player = self.first_alive_with_role("detective")
 
         if not detective_player:
             self.proceed_to_doctor_phase()  # Skip this phase if no detective is alive
             return
 
-        self.clear_frame()
-        tk.Label(self.frame, text=f"{detective_player.name.capitalize()}, it's your turn to investigate a player!", font=("Arial", 14)).pack(pady=10)
-
-        # List of alive players to investigate
-        self.investigate_target = tk.StringVar(value="")  # No default selection
-        alive_players = [p for p in self.player_list if p.status == "alive" and p.name != detective_player.name]
-
-        for player in alive_players:
-            tk.Radiobutton(
-                self.frame,
-                text=player.name.capitalize(),
-                variable=self.investigate_target,
-                value=player.name
-            ).pack(anchor="w")
-
-        # Submit investigation button
-        tk.Button(
-            self.frame,
-            text="Submit Investigation",
-            command=self.submit_detective_investigation
-        ).pack(pady=10)
+        # List of alive players to investigate (no default selection)
+        self.investigate_target = self.show_player_choice(
+            [(f"{detective_player.name.capitalize()}, it's your turn to investigate a player!", ("Arial", 14))],
+            self.get_alive_players(exclude=detective_player),
+            "Submit Investigation",
+            self.submit_detective_investigation
+        )
 
     def submit_detective_investigation(self):
         """Record the Detective's investigation and reveal the result."""
@@ -442,9 +398,11 @@ class MultiplayerGameClass(GameClass):
             return
 
         # Reveal the investigated player's role
-        investigated_player = next((p for p in self.player_list if p.name == selected_player_name), None)
+        investigated_player = self.find_player(selected_player_name)
 
         if investigated_player:
+            detective_player = self.first_alive_with_role("detective")
+            self.investigate(detective_player, investigated_player)
             role_message = f"{investigated_player.name.capitalize()} is a {investigated_player.role.capitalize()}."
             messagebox.showinfo("Investigation Result", role_message)
 
@@ -459,8 +417,9 @@ class MultiplayerGameClass(GameClass):
             messagebox.showerror("Error", "You must select a player to investigate!")
             return
 
-        # Find the target player
-        target_player = next(p for p in self.player_list if p.name == target_name)
+        # Find the target player and investigate them
+        target_player = self.find_player(target_name)
+        self.investigate(detective, target_player)
 
         # Clear the current screen
         self.clear_frame()
@@ -487,7 +446,7 @@ class MultiplayerGameClass(GameClass):
 
     def check_for_doctor_phase(self):
         """Check if a doctor is alive before proceeding to the Doctor Phase."""
-        if not any(player.role == "doctor" and player.status == "alive" for player in self.player_list):
+        if not self.alive_by_role["doctor"]:
             # Skip to Villager Phase if no doctors are alive
             self.proceed_to_villager_phase()
         else:
@@ -505,18 +464,20 @@ class MultiplayerGameClass(GameClass):
             command=self.doctor_phase
         ).pack(pady=10)
 
+    @traced("ui")
+    @timed("random_event_generator")
     def random_event_generator(self):
         self.clear_frame()
 
-        choice = random.randint(0,5)
-        if choice == 0:
-            self.hurricane()
-        elif choice == 1:
-            self.tornado()
-        elif choice == 2:
-            self.village_fire()
-        elif choice == 3:
-            self.suspicious_action()
+        event, target_player = self.trigger_random_event()
+        if event == "hurricane":
+            self.hurricane(target_player)
+        elif event == "tornado":
+            self.tornado(target_player)
+        elif event == "village_fire":
+            self.village_fire(target_player)
+        elif event == "suspicious_action":
+            self.suspicious_action(target_player)
         else:
             tk.Label(
                 self.frame,
@@ -533,70 +494,46 @@ class MultiplayerGameClass(GameClass):
             command=self.start_day_phase
         ).pack(pady=10)
 
-    def hurricane(self):
+    def hurricane(self, target_player):
         tk.Label(
             self.frame,
             text="A massive hurricane hits the village!",
             font=("Arial", 12),
         ).pack(pady=10)
-        self.alive_players = [p for p in self.player_list if p.status == "alive"]
-        target_player = self.alive_players[1]
-        target_player.status = "dead"
         tk.Label(self.frame, text=f"{target_player.name.capitalize()} was killed in the hurricane!", font=("Arial", 14)).pack(pady=10)
 
-    def tornado(self):
+    def tornado(self, target_player):
         tk.Label(
             self.frame,
             text="Look! A tornado is heading towards the village!",
             font=("Arial", 12),
         ).pack(pady=10)
-        self.alive_players = [p for p in self.player_list if p.status == "alive"]
-        target_player = self.alive_players[1]
-        target_player.status = "dead"
         tk.Label(self.frame, text=f"{target_player.name.capitalize()} was killed in the tornado!", font=("Arial", 14)).pack(pady=10)
 
-    def village_fire(self):
+    def village_fire(self, target_player):
         tk.Label(
             self.frame,
             text="Oh no! A villager's house is on fire!",
             font=("Arial", 12),
         ).pack(pady=10)
-        self.alive_players = [p for p in self.player_list if p.status == "alive"]
-        target_player = self.alive_players[1]
-        target_player.status = "dead"
         tk.Label(self.frame, text=f"{target_player.name.capitalize()} was killed in the fire!", font=("Arial", 14)).pack(pady=10)        
 
-    def suspicious_action(self):
+    def suspicious_action(self, target_player):
         tk.Label(
             self.frame,
             text="The word around the town is that someone has been doing some suspicious things.",
             font=("Arial", 12),
         ).pack(pady=10)
-        self.alive_players = [p for p in self.player_list if p.status == "alive"]
-        target_player = self.alive_players[1]
         tk.Label(self.frame, text=f"{target_player.name.capitalize()} has been hiding guns and knives in his house! Do with that info as you please.", font=("Arial", 14)).pack(pady=10)
 
-    def show_image(self, image_path, next_phase_callback):
-        """Displays a PNG image and proceeds to the next phase when clicked."""
+    @traced("ui")
+    @timed("show_image")
+    def show_image(self, image_name, next_phase_callback):
+        """Displays a phase image (an asset name, see assets.py) and proceeds to the next phase when clicked."""
         self.clear_frame()
         try:
-            # Load the image
-            image = tk.PhotoImage(file=image_path)
-            
-            # Resize the image (set width and height, preserving aspect ratio)
-            max_width, max_height = 300, 300  # Desired dimensions
-            original_width = image.width()
-            original_height = image.height()
-
-            # Scale factors
-            scale_width = max_width / original_width
-            scale_height = max_height / original_height
-            scale = min(scale_width, scale_height)
-
-            # Apply scaling
-            new_width = int(original_width * scale)
-            new_height = int(original_height * scale)
-            resized_image = image.subsample(int(original_width / new_width), int(original_height / new_height))
+            # Decoded and scaled once, then served from the asset cache
+            resized_image = assets.cache.get(image_name)
 
             # Display the resized image
             label = tk.Label(self.frame, image=resized_image)
@@ -0,0 +1,259 @@
+'''
+replay.py
+Description:
+    Replays games recorded in a binary event log (eventLog.py) on a headless GameEngine. The
+    replay re-applies the recorded actions through the engine (kill_player, protect_player,
+    investigate, ...), so the engine's listeners see the same events as in the original game,
+    without re-running any AI or dice roll. Deaths are re-applied from the records that imply
+    them (the VOTES record's eliminated seat, a "killed" NIGHT_RESULT, a deadly RANDOM_EVENT).
+
+    Seeking: while a GameReplay indexes its game it stores a keyframe (a copy of the engine's
+    state) every keyframe_interval records, plus the record position of every phase start.
+    seek(position) bisects the keyframes for the last one at or before position, restores it and
+    applies the k records after it; seek_phase(round, phase) bisects the phase index first.
+    Both are O(log n + k) with k < keyframe_interval, instead of replaying from the start.
+
+    replay_stats replays a whole log without keyframes, turning it back into the same
+    SimulationTally that simulation.py reports, far faster than the games took to play.
+
+Usage:
+    python replay.py games.mlog --stats
+    python replay.py games.mlog --game 12 --round 3 --phase night
+'''
+
+from bisect import bisect_left, bisect_right
+from eventLog import (read_games, GAME_START, ROLES, PHASE, VOTES, MAFIA_VOTES, MAFIA_TARGET, PROTECT,
+                      INVESTIGATE, DEATH, NIGHT_RESULT, RANDOM_EVENT, GAME_OVER, NO_SEAT, PHASES, ATTRIBUTES,
+                      CAUSES, OUTCOMES, EVENTS, WINNERS)
+from gameEngine import GameEngine
+from simulation import SimulationTally, format_report
+from collections import Counter
+import argparse
+import time
+
+
+KEYFRAME_INTERVAL = 16 # Records between keyframes
+
+
+def seat_name(seat):
+    """Player name used for a seat (the names simulation.py gives its players)."""
+    return f"player{seat}"
+
+
+class GameReplay:
+    def __init__(self, records, keyframe_interval=KEYFRAME_INTERVAL):
+        if not records or records[0][0] != GAME_START:
+            raise ValueError("A recorded game starts with a GAME_START record.")
+        self.records = records
+        self.keyframe_interval = keyframe_interval # None = no keyframes (play straight through)
+        self.engine = GameEngine(records[0][1][0])
+        self.engine.listeners = [] # Only listeners added for the replay hear its events
+        for seat in range(self.engine.num_players):
+            self.engine.add_player(seat_name(seat))
+        self.seats = self.engine.player_list
+        self.position = 0 # Index of the next record to apply
+        self.votes = None # Day VoteTally of the current phase
+        self.mafia_votes = None
+        self.keyframe_positions = [] # Record positions of the keyframes, ascending
+        self.keyframes = []
+        self.phase_keys = [] # (round, phase code) of every phase start, ascending
+        self.phase_positions = [] # Record position of each of those phase starts
+        if keyframe_interval:
+            self.build_index()
+
+    """ =============================================================== INDEX ======================================================================= """
+
+    def build_index(self):
+        """One pass over the game that records the keyframes and the phase starts, then rewinds."""
+        initial = self.capture()
+        while self.position < len(self.records):
+            if self.position % self.keyframe_interval == 0:
+                self.keyframe_positions.append(self.position)
+                self.keyframes.append(self.capture())
+            code, args = self.records[self.position]
+            if code == PHASE:
+                self.phase_keys.append((args[1] | args[2] << 8, args[0]))
+                self.phase_positions.append(self.position)
+            self.step()
+        self.restore(initial)
+
+    def capture(self):
+        """The replay state as plain values (a keyframe)."""
+        engine = self.engine
+        seat_of = {player: seat for seat, player in enumerate(self.seats)}
+        players = tuple((p.role_code, p.attribute, p.alive, p.protected, seat_of.get(p.investigated))
+                        for p in self.seats)
+        return (self.position, engine.round_cycle, engine.phase, engine.mafia_target, engine.gameCompleted,
+                engine.winning_team, dict(engine.ai_difficulty), players,
+                dict(self.votes.ballots) if self.votes is not None else None,
+                dict(self.mafia_votes.ballots) if self.mafia_votes is not None else None)
+
+    def restore(self, keyframe):
+        engine = self.engine
+        (self.position, engine.round_cycle, engine.phase, engine.mafia_target, engine.gameCompleted,
+         engine.winning_team, difficulty, players, votes, mafia_votes) = keyframe
+        engine.ai_difficulty = dict(difficulty)
+        for player, (role_code, attribute, alive, protected, investigated) in zip(self.seats, players):
+            player.role_code, player.attribute, player.alive, player.protected = role_code, attribute, alive, protected
+            player.investigated = None if investigated is None else self.seats[investigated]
+        engine.rebuild_role_index()
+        self.votes = self.tally_from(votes)
+        self.mafia_votes = self.tally_from(mafia_votes)
+
+    def tally_from(self, ballots):
+        if ballots is None:
+            return None
+        tally = self.engine.new_tally()
+        for voter, candidate in ballots.items():
+            tally.cast(candidate, voter)
+        return tally
+
+    """ =============================================================== PLAYBACK ======================================================================= """
+
+    def seek(self, position):
+        """Jump to just before record `position`: restore the nearest keyframe, then apply the rest."""
+        if not 0 <= position <= len(self.records):
+            raise IndexError(f"Position {position} is outside the game (0-{len(self.records)}).")
+        if position < self.position and not self.keyframes:
+            raise ValueError("This replay was built without keyframes and can only move forward.")
+        if position < self.position or (self.keyframes and position - self.position >= self.keyframe_interval):
+            index = bisect_right(self.keyframe_positions, position) - 1
+            self.restore(self.keyframes[index])
+        while self.position < position:
+            self.step()
+
+    def seek_phase(self, round_cycle, phase):
+        """Jump to the start of a phase, e.g. seek_phase(7, "night")."""
+        key = (round_cycle, PHASES.index(phase))
+        index = bisect_left(self.phase_keys, key)
+        if index == len(self.phase_keys) or self.phase_keys[index] != key:
+            raise KeyError(f"The game has no {phase} phase in round {round_cycle}.")
+        self.seek(self.phase_positions[index] + 1)
+
+    def play(self, listeners=()):
+        """Apply every remaining record, sending the engine's events to the given listeners."""
+        self.engine.listeners.extend(listeners)
+        try:
+            while self.position < len(self.records):
+                self.step()
+        finally:
+            for listener in listeners:
+                self.engine.remove_listener(listener)
+
+    def step(self):
+        """Apply the next record through the engine."""
+        engine, seats = self.engine, self.seats
+        code, args = self.records[self.position]
+        self.position += 1
+        if code == ROLES:
+            for player, packed in zip(seats, args[1:]):
+                player.role_code, player.attribute = packed & 7, ATTRIBUTES[packed >> 3 & 3]
+                engine.ai_difficulty[player.name] = packed >> 5
+            engine.rebuild_role_index()
+            engine.emit("roles_assigned", distribution=engine.role_distribution())
+        elif code == PHASE:
+            phase = PHASES[args[0]]
+            engine.round_cycle = args[1] | args[2] << 8
+            if phase == "day":
+                self.votes = engine.new_tally()
+            else:
+                self.mafia_votes = engine.new_tally()
+            engine.start_phase(phase)
+        elif code == VOTES:
+            for voter, target in zip(args[1:-1:2], args[2:-1:2]):
+                self.votes.cast(seats[target].name, seats[voter].name)
+            eliminated = seats[args[-1]] if args[-1] != NO_SEAT else None
+            engine.emit("day_vote_result", votes=self.votes, eliminated=eliminated)
+            if eliminated:
+                engine.kill_player(eliminated, "vote")
+        elif code == MAFIA_VOTES:
+            for voter, target in zip(args[1::2], args[2::2]):
+                self.mafia_votes.cast(seats[target].name, seats[voter].name)
+        elif code == MAFIA_TARGET:
+            engine.mafia_target = seats[args[0]].name if args[0] != NO_SEAT else None
+            engine.emit("mafia_target", votes=self.mafia_votes, target=engine.mafia_target)
+        elif code == PROTECT:
+            engine.protect_player(seats[args[0]], seats[args[1]])
+        elif code == INVESTIGATE:
+            engine.investigate(seats[args[0]], seats[args[1]])
+        elif code == DEATH:
+            engine.kill_player(seats[args[0]], CAUSES[args[1]])
+        elif code == NIGHT_RESULT:
+            if OUTCOMES[args[0]] == "killed":
+                engine.kill_player(seats[args[1]], "mafia")
+            engine.emit("night_result", outcome=OUTCOMES[args[0]], player=seats[args[1]] if args[1] != NO_SEAT else None)
+            for player in seats:
+                player.reset_night_actions()
+            engine.mafia_target = None
+            engine.round_cycle += 1
+        elif code == RANDOM_EVENT:
+            event = EVENTS[args[0]]
+            engine.emit("random_event", event=event, player=seats[args[1]] if args[1] != NO_SEAT else None)
+            if event is not None and event != "suspicious_action":
+                engine.kill_player(seats[args[1]], event)
+        elif code == GAME_OVER:
+            engine.gameCompleted = True
+            engine.winning_team = WINNERS[args[0]]
+            engine.emit("game_over", winning_team=engine.winning_team)
+
+
+def replay_stats(f):
+    """Replay every game in a log file into a SimulationTally (the report simulation.py prints)."""
+    tally = SimulationTally()
+    start = time.perf_counter()
+    for records in read_games(f):
+        deaths_by_role, deaths_by_cause = Counter(), Counter()
+
+        def record_death(event, data):
+            if event == "player_died":
+                deaths_by_role[data["player"].role] += 1
+                deaths_by_cause[data["cause"]] += 1
+
+        replay = GameReplay(records, keyframe_interval=None)
+        replay.play([record_death])
+        days = sum(1 for code, args in records if code == PHASE and args[0] == 0)
+        tally.add_game({"winning_team": replay.engine.winning_team, "rounds": days,
+                        "deaths_by_role": deaths_by_role, "deaths_by_cause": deaths_by_cause})
+    tally.elapsed = time.perf_counter() - start
+    return tally
+
+
+def describe_state(replay):
+    engine = replay.engine
+    lines = [f"Round {engine.round_cycle}, {engine.phase or 'before the first phase'} (record {replay.position} of {len(replay.records)})"]
+    for player in replay.seats:
+        lines.append(f"  {player.name:10s} {player.role or '-':10s} {player.status}")
+    if engine.gameCompleted:
+        lines.append(f"  Winner: {engine.winning_team}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay games from a binary event log.")
+    parser.add_argument("path", help="Event log file")
+    parser.add_argument("--stats", action="store_true", help="Replay every game and print the simulation report")
+    parser.add_argument("--game", type=int, default=0, help="Game to inspect (index in the log)")
+    parser.add_argument("--round", type=int, default=None, help="Round to jump to")
+    parser.add_argument("--phase", choices=PHASES, default="day", help="Phase of that round")
+    args = parser.parse_args(argv)
+
+    with open(args.path, "rb") as f:
+        if args.stats:
+            tally = replay_stats(f)
+            print(format_report(tally, tally.elapsed))
+            return
+        for index, records in enumerate(read_games(f)):
+            if index == args.game:
+                break
+        else:
+            parser.error(f"The log has no game {args.game}.")
+    replay = GameReplay(records)
+    if args.round is None:
+        replay.play()
+    else:
+        replay.seek_phase(args.round, args.phase)
+    print(describe_state(replay))
+
+
+if __name__ == "__main__":
+    main()
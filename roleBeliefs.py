@@ -0,0 +1,224 @@
+'''
+roleBeliefs.py
+Description:
+    What each hard AI player believes about everyone's role, built only from what that player
+    may know. For O observers (the hard AI players) and P seats, RoleBeliefs keeps one NumPy
+    array
+        beliefs  (4, O, P)  float  beliefs[r, o, p] = P(seat p has role r) for observer o
+    Roles come first (in ROLE_ORDER) so each role is one contiguous (O, P) matrix: the sums
+    over roles and over seats are then plain adds, ~5x faster than reducing a last axis of 4.
+    Each observer starts knowing its own role (and, for the mafia, its allies) and spreads the
+    remaining role counts evenly over the other seats. Engine events then update the array:
+        player_died        (public)   a night kill makes the victim unlikely to be mafia
+        day_vote_result    (public)   a ballot for a likely mafia member makes the voter
+                                      less likely to be mafia (the mafia rarely votes for an ally)
+                                      and more likely to be the detective (who votes out the
+                                      mafia it found)
+        night_result       (public)   a "saved" target is likelier the detective (whom the doctor
+                                      guards) or the doctor itself
+        investigation      (detective) the target's role becomes certain
+        hint               (villager)  "Mafia" is always right; "Not Mafia" halves the odds
+        suspicion_radar    (villager)  an alert makes whoever voted against the villager that
+                                       day more likely to be mafia
+    Every update multiplies a few columns by likelihoods for all observers at once, then
+    renormalizes: each seat's row sums to 1 and one rescaling pass pulls each role's column
+    towards the number of players who have that role. Cost grows with O * P: ~15 us per event
+    at 10 players, ~60 us at 100 players with 34 observers, so only hard AI players observe.
+
+    hard_ai picks its targets with pick(): the candidate with the best weighted belief, e.g.
+    the most likely detective for the mafia. No decision reads another player's real role.
+    The mafia's picks only differ from normal_ai's once the votes or a save give the specials
+    away: against a town that votes at random (easy, normal) it plays much like normal_ai.
+    state() and RoleBeliefs.restore save and rebuild the beliefs exactly (gameSnapshot.py).
+'''
+
+from player import ROLE_VILLAGER, ROLE_MAFIA, ROLE_DOCTOR, ROLE_DETECTIVE
+import numpy as np
+
+
+ROLE_ORDER = ("villager", "mafia", "doctor", "detective") # Column order; column = role_code - 1
+VILLAGER, MAFIA, DOCTOR, DETECTIVE = (code - 1 for code in (ROLE_VILLAGER, ROLE_MAFIA, ROLE_DOCTOR, ROLE_DETECTIVE))
+
+# Likelihoods, relative to the same evidence from a non-mafia player
+NIGHT_KILL_MAFIA = 0.05 # The mafia's night kill hits one of their own
+VOTE_FOR_ALLY = 0.25 # A mafia member votes for a fellow mafia member
+HINT_NOT_MAFIA = 0.5 # A mafia member gets a "Not Mafia" intuition hint (the hint is right half the time)
+RADAR_VOTER = 1.5 # A villager the mafia targeted at night was voted against by a mafia member that day
+DETECTIVE_VOTE = 8.0 # The detective votes for a mafia member (it may have investigated them)
+SAVED_SPECIAL = 2.0 # The doctor's protection lands on the detective or the doctor
+
+# Weights over ROLE_ORDER for each kind of decision: the score of a candidate is weights . beliefs
+TARGET_WEIGHTS = {
+    "mafia": (0.0, -1.0, 1.0, 1.0), # Kill (or vote out) the doctor or detective, never an ally
+    "doctor": (0.0, -1.0, 0.0, 1.0), # Protect the likely detective, not a likely mafia member
+    "detective": (0.0, 1.0, 0.0, 0.0), # Investigate the likeliest mafia member not yet known
+    "villager": (0.0, 1.0, 0.0, 0.0), # Vote for the likeliest mafia member
+}
+_WEIGHTS = {decision: np.array(weights) for decision, weights in TARGET_WEIGHTS.items()}
+KNOWN = 0.999 # A role believed at least this strongly counts as known
+
+
+class RoleBeliefs:
+    def __init__(self, engine, observers=None):
+        self.engine = engine
+        self.players = list(engine.player_list)
+        self.seat = {player: seat for seat, player in enumerate(self.players)}
+        self.seat_by_name = {player.name: seat for seat, player in enumerate(self.players)}
+        self.observers = [] # Observer index -> Player
+        self.observer_index = {} # Player -> index in beliefs
+        self.counts = np.zeros(4) # Players of each role in the game
+        self.beliefs = np.zeros((4, 0, len(self.players)))
+        self.last_voters = self.last_targets = np.zeros(0, dtype=np.intp) # Seats of the last day vote's ballots
+        self.pending = list(self.players if observers is None else observers) # Observers waiting for the roles
+        if any(p.role_code for p in self.players):
+            self.reset()
+        engine.add_listener(self.on_engine_event)
+
+    """ =============================================================== SETUP ======================================================================= """
+
+    def reset(self):
+        """Start every observer from its prior (once roles are assigned)."""
+        distribution = self.engine.role_distribution()
+        self.counts = np.array([distribution[role] for role in ROLE_ORDER], dtype=float)[:, None, None]
+        observers = self.observers or self.pending
+        self.observers = []
+        self.observer_index = {}
+        self.beliefs = np.zeros((4, 0, len(self.players)))
+        self.add_observers(observers)
+
+    def add_observers(self, observers):
+        """Add observers that start from their prior (what they know before any evidence)."""
+        observers = [p for p in observers if p not in self.observer_index]
+        if not observers:
+            return
+        own = np.array([p.role_code - 1 for p in observers])
+        mafia = own == MAFIA
+        # Roles left for the other seats, spread evenly; the mafia know all their allies already
+        rows = np.arange(len(observers))
+        prior = np.repeat(self.counts[:, :, 0], len(observers), axis=1) # (4, observers)
+        prior[own, rows] -= 1
+        prior[MAFIA, mafia] = 0
+        prior /= prior.sum(axis=0)
+        beliefs = np.repeat(prior[:, :, None], len(self.players), axis=2)
+        beliefs[:, rows, [self.seat[p] for p in observers]] = np.eye(4)[:, own]
+        ally_seats = [self.seat[p] for p in self.players if p.role_code == ROLE_MAFIA]
+        for row in np.flatnonzero(mafia):
+            beliefs[:, row, ally_seats] = np.eye(4)[:, MAFIA, None]
+        for player in observers:
+            self.observer_index[player] = len(self.observers)
+            self.observers.append(player)
+        self.beliefs = np.concatenate([self.beliefs, beliefs], axis=1)
+
+    def normalize(self):
+        """Pull each role's total towards its count, then make every row a distribution again."""
+        beliefs = self.beliefs
+        totals = beliefs.sum(axis=2, keepdims=True) # (4, O, 1) expected players of each role
+        np.divide(self.counts, totals, out=totals, where=totals > 0)
+        beliefs *= totals
+        rows = beliefs[0] + beliefs[1]
+        rows += beliefs[2]
+        rows += beliefs[3]
+        rows[rows == 0] = 1.0 # A row with no possible role left stays all zero
+        beliefs /= rows
+
+    def state(self):
+        """Everything restore() needs, as plain values: the observer and pending seats, the role
+        counts, the beliefs as little-endian float64 bytes and the last day vote's voter and target seats."""
+        seat = self.seat
+        return ([seat[p] for p in self.observers], [seat[p] for p in self.pending], self.counts.ravel().tolist(),
+                self.beliefs.astype("<f8").tobytes(), self.last_voters.tolist(), self.last_targets.tolist())
+
+    @classmethod
+    def restore(cls, engine, observers, pending, counts, beliefs, last_voters, last_targets):
+        """Rebuild the beliefs exactly from state() over the engine's current players (gameSnapshot.py)."""
+        tracked = cls(engine, [])
+        players = tracked.players
+        tracked.observers = [players[seat] for seat in observers]
+        tracked.observer_index = {player: index for index, player in enumerate(tracked.observers)}
+        tracked.pending = [players[seat] for seat in pending]
+        tracked.counts = np.array(counts, dtype=float)[:, None, None]
+        tracked.beliefs = np.frombuffer(beliefs, dtype="<f8").reshape(4, len(observers), len(players)).astype(float)
+        tracked.last_voters = np.array(last_voters, dtype=np.intp)
+        tracked.last_targets = np.array(last_targets, dtype=np.intp)
+        return tracked
+
+    """ =============================================================== EVIDENCE ======================================================================= """
+
+    def on_engine_event(self, event, data):
+        """Engine listener: turn public evidence (and each observer's private evidence) into updates."""
+        if event == "roles_assigned":
+            self.reset()
+        elif not self.observers:
+            return
+        elif event == "day_vote_result":
+            ballots = getattr(data["votes"], "ballots", None) # Plain count dicts don't say who voted for whom
+            if ballots:
+                by_name = self.seat_by_name
+                self.last_voters = np.fromiter(map(by_name.__getitem__, ballots), dtype=np.intp, count=len(ballots))
+                self.last_targets = np.fromiter(map(by_name.__getitem__, ballots.values()), dtype=np.intp, count=len(ballots))
+                self.observe_votes(self.last_voters, self.last_targets)
+        elif event == "player_died":
+            if data["cause"] == "mafia":
+                self.beliefs[MAFIA, :, self.seat[data["player"]]] *= NIGHT_KILL_MAFIA
+                self.normalize()
+        elif event == "night_result":
+            if data["outcome"] == "saved":
+                seat = self.seat[data["player"]]
+                self.beliefs[DOCTOR, :, seat] *= SAVED_SPECIAL
+                self.beliefs[DETECTIVE, :, seat] *= SAVED_SPECIAL
+                self.normalize()
+        elif event == "investigation":
+            self.reveal(data["detective"], data["target"])
+        elif event == "hint":
+            index = self.observer_index.get(data["villager"])
+            if index is not None:
+                if data["hint_role"] == "Mafia":
+                    self.reveal(data["villager"], data["target"])
+                else:
+                    self.beliefs[MAFIA, index, self.seat[data["target"]]] *= HINT_NOT_MAFIA
+                    self.normalize()
+        elif event == "suspicion_radar":
+            index = self.observer_index.get(data["villager"])
+            if index is not None and data["alert"]:
+                voters = self.last_voters[self.last_targets == self.seat[data["villager"]]]
+                self.beliefs[MAFIA, index, voters] *= RADAR_VOTER
+                self.normalize()
+
+    def observe_votes(self, voters, targets):
+        """Ballots for likely mafia members make their voters less likely to be mafia and more likely
+        to be the detective, for every observer."""
+        mafia = self.beliefs[MAFIA]
+        against = mafia[:, targets] # (O, ballots) how likely each ballot is against the mafia
+        self.beliefs[DETECTIVE][:, voters] *= 1.0 + against * (DETECTIVE_VOTE - 1.0)
+        mafia[:, voters] *= 1.0 - against * (1.0 - VOTE_FOR_ALLY)
+        self.normalize()
+
+    def reveal(self, observer, player):
+        """The observer now knows the player's real role."""
+        index = self.observer_index.get(observer)
+        if index is not None:
+            self.beliefs[:, index, self.seat[player]] = np.eye(4)[player.role_code - 1]
+            self.normalize()
+
+    """ =============================================================== DECISIONS ======================================================================= """
+
+    def beliefs_of(self, observer):
+        """The observer's (4, P) belief matrix, adding the observer (from its prior) if it has none."""
+        if observer not in self.observer_index:
+            self.add_observers([observer])
+        return self.beliefs[:, self.observer_index[observer]]
+
+    def mafia_probability(self, observer, player):
+        """How likely the observer thinks player is mafia, or None if observer isn't tracked."""
+        index = self.observer_index.get(observer)
+        return None if index is None else self.beliefs[MAFIA, index, self.seat[player]]
+
+    def pick(self, observer, decision, candidates):
+        """The candidate with the best score for a decision ("mafia", "doctor", "detective" or
+        "villager"); ties are settled with the game's rng."""
+        beliefs = self.beliefs_of(observer)[:, [self.seat[p] for p in candidates]]
+        scores = _WEIGHTS[decision] @ beliefs
+        if decision == "detective":
+            scores[beliefs.max(axis=0) >= KNOWN] = -1.0 # Investigating a known role teaches nothing
+        best = np.flatnonzero(scores >= scores.max() - 1e-9)
+        return candidates[best[0] if len(best) == 1 else self.engine.rng.choice(best)]
@@ -0,0 +1,111 @@
+'''
+screens.py
+Description:
+    Reusable Tk screens for the hot-seat turns in multiplayer. A screen is built once per game
+    and updated in place for every turn: labels are relabeled, unused widgets are hidden and
+    shown again, and buttons get a new command. Passing the device to the next voter or the
+    next player in the role call changes a few widget options instead of destroying and
+    recreating the whole screen.
+
+    MessageScreen       lines of text over a row of buttons (transition and role screens)
+    PlayerChoiceScreen  a prompt, one radio button per player and a submit button (voting,
+                        mafia target, doctor protection, detective investigation)
+
+    PlayerChoiceScreen keeps one radio button per player in a fixed grid row. Dead players and
+    the current voter are hidden with grid_remove, which remembers the row, so each turn only
+    touches the buttons whose visibility actually changes.
+'''
+
+import tkinter as tk
+
+
+class WidgetStack:
+    """Widgets packed top to bottom in a frame. update() reconfigures them in place, makes
+    more when it needs them and hides the extras (always a suffix, so packing order holds)."""
+
+    def __init__(self, parent, factory, **pack_options):
+        self.frame = tk.Frame(parent)
+        self.frame.pack()
+        self.factory = factory # Called with the frame to make one more widget
+        self.pack_options = pack_options
+        self.widgets = []
+        self.shown = 0
+
+    def update(self, options):
+        """options is one dict of widget options per widget to show, in order."""
+        for i, config in enumerate(options):
+            if i == len(self.widgets):
+                self.widgets.append(self.factory(self.frame))
+            self.widgets[i].configure(**config)
+            if i >= self.shown:
+                self.widgets[i].pack(**self.pack_options)
+        for widget in self.widgets[len(options):self.shown]:
+            widget.pack_forget()
+        self.shown = len(options)
+
+
+class Screen:
+    """A frame of widgets that is built once and shown or hidden as a whole."""
+
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent)
+        self.lines = WidgetStack(self.frame, tk.Label, pady=10)
+
+    def show(self):
+        self.frame.pack()
+
+    def hide(self):
+        self.frame.pack_forget()
+
+    def set_lines(self, lines):
+        """lines is a list of (text, font) tuples."""
+        self.lines.update([{"text": text, "font": font} for text, font in lines])
+
+
+class MessageScreen(Screen):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.buttons = WidgetStack(self.frame, tk.Button, pady=10)
+
+    def update(self, lines, buttons):
+        """buttons is a list of (text, command) tuples."""
+        self.set_lines(lines)
+        self.buttons.update([{"text": text, "command": command} for text, command in buttons])
+
+
+class PlayerChoiceScreen(Screen):
+    def __init__(self, parent, players):
+        super().__init__(parent)
+        self.choice = tk.StringVar(value="") # Name of the selected player ("" = no selection)
+        self.options = tk.Frame(self.frame)
+        self.options.pack()
+        self.radios = {} # Player name -> Radiobutton in a fixed grid row
+        self.visible = set() # Names whose radio button is currently shown
+        for player in players:
+            self.add_player(player)
+        self.submit = tk.Button(self.frame)
+        self.submit.pack(pady=10)
+
+    def add_player(self, player):
+        radio = tk.Radiobutton(self.options, text=player.name.capitalize(), variable=self.choice, value=player.name)
+        radio.grid(row=len(self.radios), sticky="w")
+        radio.grid_remove()
+        self.radios[player.name] = radio
+
+    def update(self, lines, choices, submit_text, command):
+        """Show lines, a radio button for each player in choices and the submit button.
+        Clears the previous selection. Returns the StringVar holding the choice."""
+        self.set_lines(lines)
+        self.choice.set("")
+        names = set()
+        for player in choices:
+            if player.name not in self.radios:
+                self.add_player(player)
+            names.add(player.name)
+        for name in self.visible - names:
+            self.radios[name].grid_remove()
+        for name in names - self.visible:
+            self.radios[name].grid()
+        self.visible = names
+        self.submit.configure(text=submit_text, command=command)
+        return self.choice
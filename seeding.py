@@ -0,0 +1,37 @@
+'''
+seeding.py
+Description:
+    Seed hierarchy for reproducible runs. A run has one root seed, and every game (or anything
+    else that needs its own random stream) gets a seed derived from the root and its path in
+    the run, e.g. (root, game index). The path is hashed with BLAKE2b into a 64-bit seed for its
+    own random.Random, so
+        - streams don't depend on which worker or chunk played the game: game 4,711 of a run
+          is the same game with 1 worker or 64;
+        - neighbouring paths give unrelated seeds (no seed, seed + 1, ... overlap between games);
+        - any single game can be played again from the root seed and its index.
+    Pass the stream to GameEngine(rng=...), which routes every random decision through it.
+
+Usage:
+    root = new_root_seed()
+    game = GameEngine(10, rng=game_rng(root, 4711))
+'''
+
+import hashlib
+import os
+import random
+
+
+def new_root_seed():
+    """A fresh 64-bit root seed for a run that wasn't given one."""
+    return int.from_bytes(os.urandom(8), "little")
+
+
+def derive_seed(root, *path):
+    """64-bit seed of the stream at path under root (path parts are ints or strings)."""
+    key = repr((root, *path)).encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def game_rng(root, *path):
+    """A random.Random for the stream at path under root, e.g. game_rng(root, game_index)."""
+    return random.Random(derive_seed(root, *path))
@@ -0,0 +1,528 @@
+'''
+server.py
+Description:
+    Asyncio server for networked multiplayer. Every player plays from their own client instead
+    of passing one Tk window around, so a phase takes as long as the slowest player rather than
+    the sum of every handoff. One process hosts many lobbies at once; each lobby owns a headless
+    GameEngine and uses its rules for roles, day votes (VoteTally), night actions, random events
+    and the win conditions, exactly as MultiplayerGameClass does.
+
+    A day phase ends once every alive player has voted, a night once every alive mafia member,
+    doctor and detective has acted. If a player disconnects mid-game their seat is played by
+    the AI (ai_target / ai_choice) so the table never stalls on an empty chair. Every action
+    also has a deadline (DEFAULT_DEADLINES, per phase and night role); a player who lets it pass
+    gets the AI's choice, or abstains with --timeout-action abstain, so an idle player can't
+    stall the table either. All deadlines of all lobbies share one TimerWheel.
+
+    Clients can follow a game as a stream of versioned state deltas (stateSync.py) instead of
+    the event messages: players by joining with "sync": true, read-only spectators with
+    "watch". A spectator who arrives mid-game is caught up from the last keyframe.
+    A client that stops reading is disconnected once MAX_BUFFERED_BYTES are waiting for it.
+
+Protocol:
+    Newline-delimited JSON over TCP, one object per line.
+    Client -> server:
+        {"op": "join", "name": "alice", "lobby": "abc", "size": 8}
+            Join (or create) lobby "abc". Without "lobby" the player is matched into an open
+            lobby of that size. A lobby with a size starts by itself once it is full.
+            With "sync": true the client gets snapshot/delta messages instead of the event
+            messages (death, day_result, mafia_target, investigation, night_result,
+            random_event, game_over).
+        {"op": "watch", "lobby": "abc"}  follow lobby "abc" as a spectator (public deltas only)
+        {"op": "start"}                  start the lobby now (needs at least MIN_PLAYERS)
+        {"op": "act", "target": "bob"}   this phase's action: the day vote, or the mafia kill
+                                         vote / doctor protection / detective investigation
+        {"op": "leave"}  /  {"op": "ping", "id": 1}
+    Server -> client (field "type"):
+        joined, watching, player_joined, player_left, role (private: role, attribute, mafia allies),
+        phase (day/night, round, alive players, whether you act, seconds you have to act),
+        ack, timeout (your deadline passed; "action" is "ai" or "abstain"), day_result, death,
+        mafia_target (mafia only), investigation (detective only), night_result, random_event,
+        game_over (winner and every role), snapshot / delta (see stateSync.py), pong, error
+
+Usage:
+    python server.py --port 7878
+    python -m mafia serve --port 7878
+    python server.py --day-seconds 90 --night-seconds 45 --timeout-action abstain
+'''
+
+from gameEngine import GameEngine
+from stateSync import StateTracker, PUBLIC, classes_for
+from timerWheel import TimerWheel
+import argparse
+import asyncio
+import itertools
+import json
+
+
+DEFAULT_PORT = 7878
+DEFAULT_LOBBY_SIZE = 8 # Size of the lobbies players are matched into when they name none
+MIN_PLAYERS = 3
+MAX_NAME_LENGTH = 32
+# Seconds a player has to act: the day vote, and each night role's action
+DEFAULT_DEADLINES = {"day": 60.0, "mafia": 30.0, "doctor": 30.0, "detective": 30.0}
+TIMEOUT_ACTIONS = ("ai", "abstain")
+# Bytes a client may leave unread in its outbound buffer before it is disconnected. Broadcasts and
+# deadline messages are written without awaiting drain(), so a client that stops reading would
+# otherwise make the server buffer everything sent to it for as long as the game lasts.
+MAX_BUFFERED_BYTES = 1 << 20
+
+
+class LobbyError(Exception):
+    """A request the lobby can't carry out; sent back to the client as an error message."""
+
+
+def encode(message):
+    """One protocol line."""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class Connection:
+    def __init__(self, writer):
+        self.writer = writer
+        self.lobby = None # Lobby this client sits in, if any
+        self.name = None # Player name in that lobby (None for a spectator)
+        self.sync = False # Receives state deltas instead of event messages
+
+    def send(self, message):
+        self.send_raw(encode(message))
+
+    def send_raw(self, data):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+            if self.writer.transport.get_write_buffer_size() > MAX_BUFFERED_BYTES:
+                # Drop the buffer and the connection now (close() would wait to flush it); the read
+                # loop then ends and the client leaves its lobby as on any disconnect
+                self.writer.transport.abort()
+
+
+class Lobby:
+    def __init__(self, lobby_id, size=None, random_events=True, on_close=None, wheel=None, deadlines=None, timeout_action="ai"):
+        self.lobby_id = lobby_id
+        self.size = size # Start automatically at this many players (None = wait for "start")
+        self.random_events = random_events
+        self.on_close = on_close # Called with the lobby when its game is over or everyone left
+        self.seats = {} # Casefolded name -> Connection, or None once the player left (the AI plays on)
+        self.names = [] # Player names in join order
+        self.engine = None # GameEngine, created when the game starts
+        self.phase = "lobby" # "lobby", "day", "night" or "over"
+        self.pending = {} # Players who still have to act this phase (dict keys keep seat order)
+        self.votes = None # Day votes, a VoteTally
+        self.mafia_votes = None # Mafia kill votes, a VoteTally
+        self.wheel = wheel # TimerWheel for action deadlines (None = wait as long as it takes)
+        self.deadlines = deadlines or DEFAULT_DEADLINES
+        self.timeout_action = timeout_action # What a player who misses a deadline does: "ai" or "abstain"
+        self.timers = {} # Pending player -> their deadline Timer
+        self.tracker = None # StateTracker producing the delta stream, created when the game starts
+        self.spectators = set() # Connections watching without a seat
+
+    """ =============================================================== MESSAGING ======================================================================= """
+
+    def broadcast(self, message):
+        """Send a message to every connected player, encoding it once."""
+        data = encode(message)
+        for conn in self.seats.values():
+            if conn:
+                conn.send_raw(data)
+
+    def send_to(self, player, message):
+        conn = self.seats.get(player.name.casefold())
+        if conn:
+            conn.send(message)
+
+    def notify(self, message, players=None):
+        """Send an event message to the given players (default: all) who are not on the delta stream."""
+        data = encode(message)
+        conns = self.seats.values() if players is None else [self.seats.get(p.name.casefold()) for p in players]
+        for conn in conns:
+            if conn and not conn.sync:
+                conn.send_raw(data)
+
+    def on_engine_event(self, event, data):
+        """Engine listener: tell the players what happened, each only what they may see."""
+        if event == "player_died":
+            self.notify({"type": "death", "player": data["player"].name, "cause": data["cause"]})
+        elif event == "day_vote_result":
+            eliminated = data["eliminated"]
+            self.notify({"type": "day_result", "eliminated": eliminated.name if eliminated else None})
+        elif event == "mafia_target":
+            self.notify({"type": "mafia_target", "target": data["target"]}, self.engine.alive_by_role["mafia"])
+        elif event == "investigation":
+            self.notify({"type": "investigation", "target": data["target"].name, "role": data["role"]}, [data["detective"]])
+        elif event == "night_result":
+            player = data["player"]
+            self.notify({"type": "night_result", "outcome": data["outcome"], "player": player.name if player else None})
+        elif event == "random_event" and data["event"]:
+            self.notify({"type": "random_event", "event": data["event"], "player": data["player"].name})
+        elif event == "game_over":
+            roles = {p.name: p.role for p in self.engine.player_list}
+            self.notify({"type": "game_over", "winner": data["winning_team"], "roles": roles})
+
+    """ =============================================================== JOINING ======================================================================= """
+
+    @property
+    def is_open(self):
+        return self.phase == "lobby" and (self.size is None or len(self.names) < self.size)
+
+    def join(self, conn, name, sync=False):
+        if not isinstance(name, str) or not name.strip() or len(name) > MAX_NAME_LENGTH:
+            raise LobbyError(f"Names must be 1 to {MAX_NAME_LENGTH} characters.")
+        if not self.is_open:
+            raise LobbyError(f"Lobby '{self.lobby_id}' is not open.")
+        key = name.casefold()
+        if key in self.seats:
+            raise LobbyError(f"A player named '{name}' is already in the lobby.")
+
+        self.seats[key] = conn
+        self.names.append(name)
+        conn.lobby, conn.name, conn.sync = self, name, sync
+        conn.send({"type": "joined", "lobby": self.lobby_id, "name": name, "players": self.names, "size": self.size})
+        self.broadcast({"type": "player_joined", "name": name})
+        if self.size is not None and len(self.names) == self.size:
+            self.start()
+
+    def watch(self, conn):
+        """Add a read-only spectator. Before the game starts they are subscribed once it does."""
+        self.spectators.add(conn)
+        conn.lobby, conn.sync = self, True
+        conn.send({"type": "watching", "lobby": self.lobby_id, "players": self.names})
+        if self.tracker:
+            self.tracker.subscribe(conn, [PUBLIC])
+
+    def leave(self, conn):
+        """Remove a client. Mid-game their seat stays and the AI takes it over."""
+        if self.tracker:
+            self.tracker.unsubscribe(conn)
+        if conn in self.spectators:
+            self.spectators.discard(conn)
+            conn.lobby = None
+            return
+        key = conn.name.casefold()
+        conn.lobby = conn.name = None
+        if self.phase == "lobby":
+            del self.seats[key]
+            self.names = [name for name in self.names if name.casefold() != key]
+        else:
+            self.seats[key] = None
+        self.broadcast({"type": "player_left", "name": self.engine.find_player(key).name if self.engine else key})
+
+        if not any(self.seats.values()):
+            self.close() # Nobody is left to play
+        elif self.phase in ("day", "night"):
+            self.act_for_absent()
+            self.advance()
+
+    def close(self):
+        self.cancel_deadlines()
+        if self.phase != "over":
+            self.phase = "over"
+            if self.on_close:
+                self.on_close(self)
+        for conn in self.seats.values():
+            if conn and conn.lobby is self:
+                conn.lobby = conn.name = None
+        for conn in self.spectators:
+            conn.lobby = None
+        self.spectators.clear()
+
+    """ =============================================================== GAME FLOW ======================================================================= """
+
+    def start(self):
+        if self.phase != "lobby":
+            raise LobbyError("The game has already started.")
+        if len(self.names) < MIN_PLAYERS:
+            raise LobbyError(f"A game needs at least {MIN_PLAYERS} players.")
+        self.engine = GameEngine(len(self.names))
+        self.engine.add_listener(self.on_engine_event)
+        for name in self.names:
+            self.engine.add_player(name)
+        self.tracker = StateTracker(self.engine, encode)
+        self.engine.assignRoles()
+        for player in self.engine.player_list:
+            conn = self.seats[player.name.casefold()]
+            if conn and conn.sync:
+                self.tracker.subscribe(conn, classes_for(player))
+        for conn in self.spectators:
+            self.tracker.subscribe(conn, [PUBLIC])
+
+        for player in self.engine.player_list:
+            message = {"type": "role", "role": player.role, "attribute": player.attribute}
+            if player.role == "mafia":
+                message["allies"] = [p.name for p in self.engine.alive_by_role["mafia"] if p is not player]
+            self.send_to(player, message)
+        self.begin_day()
+
+    def begin_phase(self, phase, actors):
+        self.phase = phase
+        self.engine.start_phase(phase)
+        self.pending = dict.fromkeys(actors)
+        alive = [p.name for p in self.engine.get_alive_players()]
+        for player in self.engine.player_list:
+            message = {"type": "phase", "phase": phase, "round": self.engine.round_cycle,
+                       "alive": alive, "acting": player in self.pending}
+            if self.wheel is not None and player in self.pending:
+                message["deadline"] = self.deadline_for(player)
+            self.send_to(player, message)
+        self.act_for_absent()
+        self.schedule_deadlines()
+        self.advance()
+
+    def begin_day(self):
+        self.votes = self.engine.new_tally()
+        self.begin_phase("day", self.engine.get_alive_players())
+
+    def begin_night(self):
+        self.mafia_votes = self.engine.new_tally()
+        actors = [p for role in ("mafia", "doctor", "detective") for p in self.engine.alive_by_role[role]]
+        self.begin_phase("night", actors)
+
+    def act(self, name, target_name):
+        """Carry out a player's action for the current phase."""
+        player = self.engine.find_player(name) if self.engine else None
+        if player is None or player not in self.pending:
+            raise LobbyError("You have nothing to do right now.")
+        exclude = None if player.role == "doctor" and self.phase == "night" else player
+        target = self.engine.find_alive_player(target_name, exclude=exclude)
+        if target is None:
+            raise LobbyError(f"'{target_name}' is not a valid target.")
+        self.apply(player, target)
+        self.send_to(player, {"type": "ack", "phase": self.phase, "target": target.name})
+        self.advance()
+
+    def apply(self, player, target):
+        """Record one action and take the player off the pending list."""
+        self.done(player)
+        if self.phase == "day":
+            self.engine.cast_vote(self.votes, target.name, player.name, "day")
+        elif player.role == "mafia":
+            self.engine.cast_vote(self.mafia_votes, target.name, player.name, "mafia")
+        elif player.role == "doctor":
+            self.engine.protect_player(player, target)
+        elif player.role == "detective":
+            self.engine.investigate(player, target)
+
+    def auto_act(self, player):
+        """Let the AI take a player's action (used for seats whose player has left)."""
+        engine = self.engine
+        alive = engine.get_alive_players()
+        level = engine.difficulty_for(player)
+        if self.phase == "night" and player.role == "doctor":
+            target = engine.ai_choice(level, "doctor", player, alive, self.phase)
+        else:
+            role = player.role if self.phase == "night" else ("mafia" if player.role == "mafia" else "villager")
+            target = engine.ai_target(level, role, player, alive, self.phase)
+        if target is None:
+            self.done(player) # Nobody to pick; the player abstains
+        else:
+            self.apply(player, target)
+
+    def act_for_absent(self):
+        for player in list(self.pending):
+            if self.seats.get(player.name.casefold()) is None:
+                self.auto_act(player)
+
+    def done(self, player):
+        """Take a player off the pending list and cancel their deadline."""
+        del self.pending[player]
+        timer = self.timers.pop(player, None)
+        if timer:
+            self.wheel.cancel(timer)
+
+    def advance(self):
+        """Finish the phase once everyone has acted."""
+        if self.pending:
+            return
+        if self.phase == "day":
+            self.finish_day()
+        elif self.phase == "night":
+            self.finish_night()
+
+    def finish_day(self):
+        self.engine.resolve_day_votes(self.votes)
+        if not self.game_over():
+            self.begin_night()
+
+    def finish_night(self):
+        self.engine.choose_mafia_target(self.mafia_votes)
+        self.engine.resolve_night()
+        if self.game_over():
+            return
+        if self.random_events:
+            self.engine.trigger_random_event()
+            if self.game_over():
+                return
+        self.begin_day()
+
+    def game_over(self):
+        if self.engine.check_win_conditions():
+            self.close()
+            return True
+        return False
+
+    """ =============================================================== DEADLINES ======================================================================= """
+
+    def deadline_for(self, player):
+        return self.deadlines["day" if self.phase == "day" else player.role]
+
+    def schedule_deadlines(self):
+        if self.wheel is not None:
+            for player in self.pending:
+                self.timers[player] = self.wheel.schedule(self.deadline_for(player), self.deadline_passed, player)
+
+    def cancel_deadlines(self):
+        for timer in self.timers.values():
+            self.wheel.cancel(timer)
+        self.timers.clear()
+
+    def deadline_passed(self, player):
+        """Wheel callback: the player didn't act in time, so the AI acts for them or they abstain."""
+        del self.timers[player]
+        if player not in self.pending:
+            return
+        if self.timeout_action == "ai":
+            self.auto_act(player)
+        else:
+            self.done(player)
+        self.send_to(player, {"type": "timeout", "phase": self.phase, "action": self.timeout_action})
+        self.advance()
+
+
+class MafiaServer:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, random_events=True, deadlines=None, timeout_action="ai"):
+        self.host = host
+        self.port = port # Replaced by the bound port after start() (useful with port 0)
+        self.random_events = random_events
+        self.deadlines = deadlines or DEFAULT_DEADLINES
+        self.timeout_action = timeout_action
+        self.wheel = TimerWheel() # One scheduler for the action deadlines of every lobby
+        self.wheel_task = None
+        self.lobbies = {} # Lobby id -> Lobby, for lobbies that have not finished
+        self.open_lobbies = {} # Size -> lobby players are currently matched into
+        self.connections = set()
+        self.handlers = set() # Client handler tasks, awaited on close
+        self.games_finished = 0
+        self.server = None
+        self._lobby_ids = itertools.count(1)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.wheel_task = asyncio.create_task(self.wheel.run())
+        return self
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        self.wheel_task.cancel()
+        for conn in list(self.connections):
+            conn.writer.close()
+        # Closed writers end each handler's read loop; let them finish before returning
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await asyncio.gather(self.wheel_task, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def handle_client(self, reader, writer):
+        conn = Connection(writer)
+        self.connections.add(conn)
+        self.handlers.add(asyncio.current_task())
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise LobbyError("Messages must be JSON objects.")
+                    self.dispatch(conn, message)
+                except (ValueError, LobbyError) as e:
+                    conn.send({"type": "error", "message": str(e)})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if conn.lobby:
+                conn.lobby.leave(conn)
+            self.connections.discard(conn)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def dispatch(self, conn, message):
+        op = message.get("op")
+        if op == "ping":
+            conn.send({"type": "pong", "id": message.get("id")})
+        elif op == "join":
+            if conn.lobby:
+                raise LobbyError("You are already in a lobby.")
+            self.find_lobby(message.get("lobby"), message.get("size")).join(conn, message.get("name"), bool(message.get("sync")))
+        elif op == "watch":
+            if conn.lobby:
+                raise LobbyError("You are already in a lobby.")
+            lobby = self.lobbies.get(str(message.get("lobby")))
+            if lobby is None:
+                raise LobbyError(f"There is no lobby '{message.get('lobby')}'.")
+            lobby.watch(conn)
+        elif conn.lobby is None:
+            raise LobbyError("Join a lobby first.")
+        elif conn.name is None and op != "leave":
+            raise LobbyError("Spectators can only leave.")
+        elif op == "start":
+            conn.lobby.start()
+        elif op == "act":
+            conn.lobby.act(conn.name, message.get("target"))
+        elif op == "leave":
+            conn.lobby.leave(conn)
+        else:
+            raise LobbyError(f"Unknown op {op!r}.")
+
+    def find_lobby(self, lobby_id, size):
+        """The named lobby (created on first use), or an open lobby of the given size."""
+        if size is not None and (not isinstance(size, int) or size < MIN_PLAYERS):
+            raise LobbyError(f"Lobby size must be a whole number of at least {MIN_PLAYERS}.")
+        if lobby_id is not None:
+            lobby_id = str(lobby_id)
+            if lobby_id not in self.lobbies:
+                self.lobbies[lobby_id] = self.new_lobby(lobby_id, size)
+            return self.lobbies[lobby_id]
+
+        size = size or DEFAULT_LOBBY_SIZE
+        lobby = self.open_lobbies.get(size)
+        if lobby is None or not lobby.is_open:
+            lobby_id = f"auto-{next(self._lobby_ids)}"
+            lobby = self.lobbies[lobby_id] = self.open_lobbies[size] = self.new_lobby(lobby_id, size)
+        return lobby
+
+    def new_lobby(self, lobby_id, size):
+        return Lobby(lobby_id, size, self.random_events, self.lobby_closed, self.wheel, self.deadlines, self.timeout_action)
+
+    def lobby_closed(self, lobby):
+        self.lobbies.pop(lobby.lobby_id, None)
+        if lobby.engine and lobby.engine.gameCompleted:
+            self.games_finished += 1
+
+
+async def run_server(host, port, random_events=True, deadlines=None, timeout_action="ai"):
+    server = await MafiaServer(host, port, random_events, deadlines, timeout_action).start()
+    print(f"Mafia server listening on {server.host}:{server.port}")
+    await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host networked Mafia lobbies over TCP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (0 = any free port)")
+    parser.add_argument("--no-random-events", action="store_true", help="Skip the multiplayer random events")
+    parser.add_argument("--day-seconds", type=float, default=DEFAULT_DEADLINES["day"], help="Time to cast the day vote")
+    parser.add_argument("--night-seconds", type=float, default=DEFAULT_DEADLINES["mafia"], help="Time for each night action")
+    parser.add_argument("--timeout-action", choices=TIMEOUT_ACTIONS, default="ai",
+                        help="What happens when a player misses a deadline: the AI acts for them, or they abstain")
+    args = parser.parse_args(argv)
+    deadlines = {"day": args.day_seconds, "mafia": args.night_seconds, "doctor": args.night_seconds, "detective": args.night_seconds}
+    try:
+        asyncio.run(run_server(args.host, args.port, not args.no_random_events, deadlines, args.timeout_action))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+'''
+simulation.py
+Description:
+    Batch simulator for balance tuning. Plays complete AI-only games (easy_ai, normal_ai, hard_ai
+    and expert_ai players) on the headless GameEngine and spreads them over a ProcessPoolExecutor.
+    Games are handed out in chunks; every worker returns one SimulationTally for its chunk and
+    the tallies are merged at the end into win rate by faction, rounds per game and deaths by role.
+    With --event-log every action of every game is also written to a binary event log
+    (eventLog.py); workers compress their own segments and the parent appends them to the file.
+
+    Every run has a root seed (--seed, or a fresh one that the report prints). Game i plays
+    with its own random stream, seeding.game_rng(root, i), whichever worker plays it, so a run
+    gives the same results with any number of workers and --game i plays game i again.
+
+Usage:
+    python simulation.py --players 10 --games 100000 --mix easy=1,normal=1,hard=1 --workers 64
+    python simulation.py --players 10 --games 100000 --event-log games.mlog
+    python simulation.py --players 10 --games 100000 --seed 42
+    python simulation.py --players 10 --seed 42 --game 4711
+    python simulation.py --players 10 --games 100 --mix hard=1,expert=1 --search-budget 0.02 --workers 4
+'''
+
+from collections import Counter
+from gameEngine import GameEngine, DIFFICULTY_EASY, DIFFICULTY_NORMAL, DIFFICULTY_HARD, DIFFICULTY_EXPERT
+from eventLog import EventLogWriter
+from seeding import new_root_seed, game_rng
+from itertools import accumulate
+import metrics
+import argparse
+import io
+import os
+import random
+import time
+
+
+DIFFICULTY_NAMES = {"easy": DIFFICULTY_EASY, "normal": DIFFICULTY_NORMAL, "hard": DIFFICULTY_HARD, "expert": DIFFICULTY_EXPERT}
+DEFAULT_MIX = "easy=1,normal=1,hard=1"
+MAX_ROUNDS = 1000 # Safety net; every day vote removes a player so real games end long before this
+
+
+class SimulationTally:
+    """Counts collected over a batch of games. Tallies from different workers are merged with merge()."""
+
+    def __init__(self):
+        self.games = 0
+        self.wins = Counter() # "Village"/"Mafia" -> games won
+        self.rounds = Counter() # rounds played -> number of games
+        self.deaths_by_role = Counter() # role -> players of that role who died
+        self.deaths_by_cause = Counter() # "vote"/"mafia"/random event -> deaths
+        self.elapsed = 0.0 # Seconds spent playing the games (summed over workers)
+        self.event_log = b"" # Compressed event log segments of this chunk's games (not merged)
+        self.seed = None # Root seed of the run the games came from
+
+    def add_game(self, result):
+        """Record the result dict returned by play_game."""
+        self.games += 1
+        self.wins[result["winning_team"]] += 1
+        self.rounds[result["rounds"]] += 1
+        self.deaths_by_role.update(result["deaths_by_role"])
+        self.deaths_by_cause.update(result["deaths_by_cause"])
+
+    def merge(self, other):
+        """Add another tally's counts into this one."""
+        self.games += other.games
+        self.wins.update(other.wins)
+        self.rounds.update(other.rounds)
+        self.deaths_by_role.update(other.deaths_by_role)
+        self.deaths_by_cause.update(other.deaths_by_cause)
+        self.elapsed += other.elapsed
+        self.seed = self.seed if self.seed is not None else other.seed
+        return self
+
+    def win_rates(self):
+        """Fraction of games won by each faction."""
+        return {team: count / self.games for team, count in self.wins.items()} if self.games else {}
+
+    def mean_rounds(self):
+        """Average number of rounds per game."""
+        return sum(r * n for r, n in self.rounds.items()) / self.games if self.games else 0.0
+
+
+def parse_mix(text):
+    """Turn "easy=1,normal=2,hard=1" into {1: 1.0, 2: 2.0, 3: 1.0}."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip().lower()
+        if name not in DIFFICULTY_NAMES:
+            raise ValueError(f"Unknown difficulty '{name}'. Choose from: {', '.join(DIFFICULTY_NAMES)}")
+        mix[DIFFICULTY_NAMES[name]] = float(weight) if weight else 1.0
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The difficulty mix needs at least one positive weight.")
+    return mix
+
+
+def play_game(num_players, difficulty_mix, random_events=True, event_log=None, rng=None, search_budget=None, search_workers=1):
+    """Play one complete AI-only game. Each seat draws its difficulty from difficulty_mix
+    (difficulty -> weight). Returns a dict with the winner, rounds and deaths.
+    With an EventLogWriter every action of the game is logged to it. rng is the game's
+    random stream (default: the global random module). search_budget and search_workers
+    configure the expert AI's search (GameEngine.search_budget / search_workers)."""
+    rng = random if rng is None else rng
+    game = GameEngine(num_players, rng=rng)
+    game.search_budget, game.search_workers = search_budget, search_workers
+    levels, weights = list(difficulty_mix), list(difficulty_mix.values())
+    for seat, level in enumerate(rng.choices(levels, weights, k=num_players)):
+        name = f"player{seat}"
+        game.add_player(name)
+        game.ai_difficulty[name] = level
+
+    deaths_by_role, deaths_by_cause = Counter(), Counter()
+
+    def record_death(event, data):
+        if event == "player_died":
+            deaths_by_role[data["player"].role] += 1
+            deaths_by_cause[data["cause"]] += 1
+
+    game.add_listener(record_death)
+    if event_log:
+        event_log.record(game)
+    game.assignRoles()
+    rounds = play_rounds(game, random_events)
+
+    return {
+        "winning_team": game.winning_team,
+        "rounds": rounds,
+        "deaths_by_role": deaths_by_role,
+        "deaths_by_cause": deaths_by_cause,
+    }
+
+
+def play_rounds(game, random_events=True):
+    """Play day/night rounds of a game whose roles are assigned until a team wins.
+    Every player is an AI. Returns the number of rounds played."""
+    rounds = 0
+    while rounds < MAX_ROUNDS:
+        rounds += 1
+        # Day: everyone alive votes
+        game.start_phase("day")
+        game.resolve_day_votes(game.ai_day_votes(game.get_alive_players()))
+        if game.check_win_conditions():
+            break
+        # Night: mafia, detective and doctor act, then the kill resolves
+        game.start_phase("night")
+        game.choose_mafia_target(game.ai_night_actions())
+        game.resolve_night()
+        if game.check_win_conditions():
+            break
+        if random_events:
+            game.trigger_random_event()
+            if game.check_win_conditions():
+                break
+    return rounds
+
+
+def simulate_chunk(num_players, difficulty_mix, num_games, random_events=True, event_log=False, seed=None, first_game=0,
+                   search_budget=None, search_workers=1):
+    """Work unit for one worker: play num_games games and return their SimulationTally
+    (with their compressed event log if event_log is set). With a root seed, the chunk's games
+    are games first_game, first_game + 1, ... of that run, each with its own stream."""
+    tally = SimulationTally()
+    tally.seed = seed
+    log_buffer = io.BytesIO()
+    writer = EventLogWriter(log_buffer) if event_log else None
+    start = time.perf_counter()
+    for index in range(first_game, first_game + num_games):
+        rng = game_rng(seed, index) if seed is not None else None
+        tally.add_game(play_game(num_players, difficulty_mix, random_events, writer, rng, search_budget, search_workers))
+    if writer:
+        writer.close()
+        tally.event_log = log_buffer.getvalue()
+    tally.elapsed = time.perf_counter() - start
+    return tally
+
+
+def chunk_sizes(num_games, workers, chunk_size=None):
+    """Split num_games into work units. By default each worker gets ~8 chunks so the pool stays busy."""
+    if chunk_size is None:
+        chunk_size = max(1, min(10000, num_games // (workers * 8)))
+    full, rest = divmod(num_games, chunk_size)
+    return [chunk_size] * full + ([rest] if rest else [])
+
+
+def run_simulation(num_players, difficulty_mix, num_games, workers=None, chunk_size=None, random_events=True, event_log=None,
+                   seed=None, search_budget=None, search_workers=1):
+    """Play num_games games across a process pool and return (merged tally, wall-clock seconds).
+    With an event_log path every game is appended to that binary event log. seed is the run's
+    root seed (a fresh one if None; the tally keeps it). search_budget and search_workers are
+    passed to every game's expert AI."""
+    workers = workers or os.cpu_count() or 1
+    seed = new_root_seed() if seed is None else seed
+    chunks = chunk_sizes(num_games, workers, chunk_size)
+    firsts = [0, *accumulate(chunks)][:-1] # Index of each chunk's first game in the run
+    total = SimulationTally()
+    total.seed = seed
+    log_file = open(event_log, "ab") if event_log else None
+    start = time.perf_counter()
+
+    def collect(tally):
+        if log_file:
+            log_file.write(tally.event_log)
+        total.merge(tally)
+
+    try:
+        if workers == 1:
+            # No pool needed; keeps single-core runs and debugging simple
+            for size, first in zip(chunks, firsts):
+                collect(simulate_chunk(num_players, difficulty_mix, size, random_events, bool(log_file), seed, first,
+                                       search_budget, search_workers))
+        else:
+            # Imported here: the pool machinery is most of this module's import time
+            from concurrent.futures import ProcessPoolExecutor
+            n = len(chunks)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for tally in pool.map(simulate_chunk, [num_players] * n, [difficulty_mix] * n, chunks, [random_events] * n,
+                                      [bool(log_file)] * n, [seed] * n, firsts, [search_budget] * n, [search_workers] * n):
+                    collect(tally)
+    finally:
+        if log_file:
+            log_file.close()
+
+    return total, time.perf_counter() - start
+
+
+def format_report(tally, wall_time):
+    """Human-readable summary of a simulation run."""
+    lines = [f"Games played: {tally.games} in {wall_time:.2f}s ({tally.games / wall_time:,.0f} games/sec)"]
+    if tally.seed is not None:
+        lines.append(f"  Seed: {tally.seed}")
+    for team, rate in sorted(tally.win_rates().items()):
+        lines.append(f"  {team} win rate: {rate:.2%}")
+    lines.append(f"  Rounds per game: {tally.mean_rounds():.2f} (min {min(tally.rounds)}, max {max(tally.rounds)})")
+    lines.append("  Deaths by role: " + ", ".join(f"{role}: {count}" for role, count in sorted(tally.deaths_by_role.items())))
+    lines.append("  Deaths by cause: " + ", ".join(f"{cause}: {count}" for cause, count in sorted(tally.deaths_by_cause.items())))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run AI-only Mafia games in parallel and report balance statistics.")
+    parser.add_argument("--players", type=int, default=10, help="Players per game")
+    parser.add_argument("--games", type=int, default=10000, help="Number of games to play")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Difficulty weights, e.g. easy=2,hard=1")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Games per work unit")
+    parser.add_argument("--no-random-events", action="store_true", help="Skip the multiplayer random events")
+    parser.add_argument("--event-log", default=None, help="Append every game's actions to this binary event log")
+    parser.add_argument("--seed", type=int, default=None, help="Root seed of the run (default: a fresh one, printed in the report)")
+    parser.add_argument("--game", type=int, default=None, help="Play only this game of the seeded run and print its result")
+    parser.add_argument("--search-budget", type=float, default=None, help="Seconds the expert AI searches per decision (default: 0.05)")
+    parser.add_argument("--search-workers", type=int, default=1, help="Processes searching each expert AI decision")
+    parser.add_argument("--metrics", default=None, help="Write engine counters in Prometheus text format to this file (runs in one process)")
+    args = parser.parse_args(argv)
+
+    if args.players < 3:
+        parser.error("A game needs at least 3 players.")
+    if args.game is not None:
+        if args.seed is None:
+            parser.error("--game needs the --seed of the run it comes from.")
+        print(play_game(args.players, parse_mix(args.mix), not args.no_random_events, None, game_rng(args.seed, args.game),
+                        args.search_budget, args.search_workers))
+        return
+    if args.metrics:
+        # Counters live in the process that plays the games, so keep them all here
+        metrics.enable()
+        args.workers = 1
+    tally, wall_time = run_simulation(args.players, parse_mix(args.mix), args.games, args.workers, args.chunk_size,
+                                      not args.no_random_events, args.event_log, args.seed, args.search_budget, args.search_workers)
+    print(format_report(tally, wall_time))
+    if args.metrics:
+        with open(args.metrics, "w") as f:
+            f.write(metrics.registry.to_prometheus())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+'''
+stateSync.py
+Description:
+    Versioned state deltas for networked clients. A StateTracker listens to a GameEngine and
+    turns each change into a small delta (a death, one candidate's new vote count, a phase
+    change, ...) instead of resending the game state. Every delta belongs to one visibility
+    class and only that class's subscribers receive it:
+        public          everyone, including read-only spectators: players, phases, day votes,
+                        deaths, night results, random events and the final roles
+        mafia           the mafia team (what mafia_ally_list shows) and the mafia's votes and target
+        player:<name>   one player's own role, and the detective's investigation results
+                        (what show_investigation_result shows)
+    Each delta is encoded once and the same bytes are written to every subscriber of its class.
+
+    Versions count every delta of the game, so a client sees gaps for the classes it can't see;
+    within one class deltas arrive in version order. At the start of every phase the tracker
+    takes a keyframe (each class's state, encoded once). A client that subscribes late gets the
+    keyframe of its classes plus the deltas since, and apply_delta rebuilds the same state the
+    tracker holds. Clients keep one state dict per class and apply each delta to its class.
+
+Messages:
+    {"type": "snapshot", "v": 12, "class": "public", "state": {...}}
+    {"type": "delta", "v": 13, "class": "public", "op": "death", "player": "bob", "cause": "vote"}
+    op is one of players, role, allies, phase, votes, day_result, death, target, investigation,
+    night_result, random_event, game_over.
+'''
+
+import json
+
+PUBLIC = "public"
+MAFIA = "mafia"
+
+
+def private_class(name):
+    """Visibility class of the deltas only this player may see."""
+    return "player:" + name.casefold()
+
+
+def classes_for(player):
+    """Every class a player subscribes to once roles are known."""
+    classes = [PUBLIC, private_class(player.name)]
+    if player.role == "mafia":
+        classes.append(MAFIA)
+    return classes
+
+
+def apply_delta(state, delta):
+    """Apply one delta to the state dict of its class (the same code runs on the tracker and the clients)."""
+    op = delta["op"]
+    if op == "players":
+        state["alive"] = list(delta["players"])
+        state["dead"] = {}
+    elif op == "role":
+        state["role"] = delta["role"]
+        state["attribute"] = delta["attribute"]
+    elif op == "allies":
+        state["allies"] = list(delta["players"])
+    elif op == "phase":
+        state["phase"] = delta["phase"]
+        state["round"] = delta["round"]
+    elif op == "votes":
+        tally = state.get("votes")
+        if tally is None or tally["round"] != delta["round"]:
+            tally = state["votes"] = {"round": delta["round"], "counts": {}} # New vote, new tally
+        if delta["count"]:
+            tally["counts"][delta["candidate"]] = delta["count"]
+        else:
+            tally["counts"].pop(delta["candidate"], None)
+    elif op == "day_result":
+        state["eliminated"] = delta["eliminated"]
+    elif op == "death":
+        state["alive"].remove(delta["player"])
+        state["dead"][delta["player"]] = delta["cause"]
+    elif op == "target":
+        state["target"] = delta["target"]
+    elif op == "investigation":
+        state.setdefault("investigations", {})[delta["target"]] = delta["role"]
+    elif op == "night_result":
+        state["night_result"] = {"outcome": delta["outcome"], "player": delta["player"]}
+    elif op == "random_event":
+        state["random_event"] = {"event": delta["event"], "player": delta["player"]}
+    elif op == "game_over":
+        state["winner"] = delta["winner"]
+        state["roles"] = delta["roles"]
+    state["v"] = delta["v"]
+
+
+def encode_line(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class StateTracker:
+    def __init__(self, engine, encode=encode_line):
+        self.engine = engine
+        self.encode = encode # message -> bytes for the wire
+        self.version = 0 # Version of the latest delta
+        self.states = {} # Class -> current state, kept by applying every delta
+        self.subscribers = {} # Class -> {subscriber: None}; a subscriber has send_raw(bytes)
+        self.keyframe_version = 0
+        self.keyframe = {} # Class -> encoded snapshot message at keyframe_version
+        self.recent = [] # (version, class, encoded delta) since the keyframe
+        engine.add_listener(self.on_engine_event)
+        self.publish(PUBLIC, "players", players=[p.name for p in engine.player_list])
+
+    """ =============================================================== PRODUCING ======================================================================= """
+
+    def publish(self, cls, op, **fields):
+        """Record a delta, encode it once and send it to the class's subscribers."""
+        self.version += 1
+        delta = {"type": "delta", "v": self.version, "class": cls, "op": op, **fields}
+        apply_delta(self.states.setdefault(cls, {}), delta)
+        data = self.encode(delta)
+        self.recent.append((self.version, cls, data))
+        for subscriber in self.subscribers.get(cls, ()):
+            subscriber.send_raw(data)
+
+    def take_keyframe(self):
+        """Snapshot every class now; late subscribers start from here instead of the whole history."""
+        self.keyframe_version = self.version
+        self.keyframe = {cls: self.encode({"type": "snapshot", "v": self.version, "class": cls, "state": state})
+                         for cls, state in self.states.items()}
+        self.recent = []
+
+    def on_engine_event(self, event, data):
+        """Engine listener: turn each event into deltas for the classes allowed to see it."""
+        if event == "roles_assigned":
+            for player in self.engine.player_list:
+                self.publish(private_class(player.name), "role", role=player.role, attribute=player.attribute)
+            self.publish(MAFIA, "allies", players=[p.name for p in self.engine.alive_by_role["mafia"]])
+        elif event == "phase_started":
+            self.publish(PUBLIC, "phase", phase=data["phase"], round=data["round"])
+            self.take_keyframe()
+        elif event == "vote_cast":
+            changed = [data["candidate"]]
+            if data["previous"] not in (None, data["candidate"]):
+                changed.insert(0, data["previous"]) # A replaced ballot also lowers the old candidate's count
+            for candidate in changed:
+                self.publish(PUBLIC if data["kind"] == "day" else MAFIA, "votes", round=self.engine.round_cycle,
+                             candidate=candidate, count=data["votes"].counts.get(candidate, 0))
+        elif event == "day_vote_result":
+            eliminated = data["eliminated"]
+            self.publish(PUBLIC, "day_result", eliminated=eliminated.name if eliminated else None)
+        elif event == "player_died":
+            player = data["player"]
+            self.publish(PUBLIC, "death", player=player.name, cause=data["cause"])
+            if player.role == "mafia":
+                self.publish(MAFIA, "allies", players=[p.name for p in self.engine.alive_by_role["mafia"]])
+        elif event == "mafia_target":
+            self.publish(MAFIA, "target", target=data["target"])
+        elif event == "investigation":
+            self.publish(private_class(data["detective"].name), "investigation",
+                         target=data["target"].name, role=data["role"])
+        elif event == "night_result":
+            player = data["player"]
+            self.publish(PUBLIC, "night_result", outcome=data["outcome"], player=player.name if player else None)
+        elif event == "random_event" and data["event"]:
+            self.publish(PUBLIC, "random_event", event=data["event"], player=data["player"].name)
+        elif event == "game_over":
+            self.publish(PUBLIC, "game_over", winner=data["winning_team"],
+                         roles={p.name: p.role for p in self.engine.player_list})
+
+    """ =============================================================== SUBSCRIBING ======================================================================= """
+
+    def subscribe(self, subscriber, classes):
+        """Catch a subscriber up (keyframe plus recent deltas of its classes), then stream new deltas to it."""
+        classes = set(classes)
+        for cls in classes:
+            if cls in self.keyframe:
+                subscriber.send_raw(self.keyframe[cls])
+            self.subscribers.setdefault(cls, {})[subscriber] = None
+        for _, cls, data in self.recent:
+            if cls in classes:
+                subscriber.send_raw(data)
+
+    def unsubscribe(self, subscriber):
+        for members in self.subscribers.values():
+            members.pop(subscriber, None)
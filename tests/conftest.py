@@ -0,0 +1,11 @@
+'''
+conftest.py
+Description:
+    The game modules live at the top of the repository, not in a package, so put the
+    repository root on sys.path for the tests.
+'''
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
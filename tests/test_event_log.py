@@ -0,0 +1,103 @@
+'''
+test_event_log.py
+Description:
+    Checks that the event log written by the engine's direct writer calls reads back as whole
+    games: one GAME_START ... GAME_OVER run per simulated game, across several segments, whose
+    replay gives back the deaths the simulation counted and the events the engine sent its
+    listeners, although phases, night results and deaths have no record of their own. Version 1
+    logs, with a DEATH record per death, still read the same way.
+'''
+
+from eventLog import (EventLogWriter, read_games, describe, SEGMENT_HEADER, SEGMENT_MAGIC, GAME_START, ROLES,
+                      VOTES, DEATH, NIGHT_RESULT, GAME_OVER, WINNERS, CAUSES, NO_SEAT)
+from replay import GameReplay
+from player import Player
+from voteTally import VoteTally
+from seeding import game_rng
+from collections import Counter
+import simulation
+import io
+import zlib
+
+
+def replayed_deaths(records):
+    deaths = Counter()
+    GameReplay(records, keyframe_interval=None).play(
+        [lambda event, data: deaths.update((data["cause"],)) if event == "player_died" else None])
+    return deaths
+
+
+def event_trace():
+    """A listener and the list it fills with the game's events, players as names and tallies as ballots."""
+    events = []
+
+    def listen(event, data):
+        if event not in ("vote_cast", "hint", "suspicion_radar"):
+            events.append((event, *(value.name if isinstance(value, Player) else dict(value.ballots)
+                                    if isinstance(value, VoteTally) else value for value in data.values())))
+
+    return events, listen
+
+
+def test_logged_games_match_the_simulation():
+    out = io.BytesIO()
+    writer = EventLogWriter(out, segment_bytes=2048) # Small segments, so games span several
+    mix = simulation.parse_mix(simulation.DEFAULT_MIX)
+    results = [simulation.play_game(10, mix, True, writer, game_rng(3, index)) for index in range(60)]
+    writer.close()
+
+    out.seek(0)
+    games = list(read_games(out))
+    assert len(games) == len(results) == writer.games
+    for game, result in zip(games, results):
+        assert game[0] == (GAME_START, (10,))
+        assert game[1][0] == ROLES and len(describe(*game[1])[1]["roles"]) == 10
+        assert game[-1] == (GAME_OVER, (WINNERS.index(result["winning_team"]),))
+        assert not any(code == DEATH for code, _ in game)
+        assert replayed_deaths(game) == result["deaths_by_cause"]
+
+
+def test_writer_detaches_at_game_over():
+    writer = EventLogWriter(io.BytesIO())
+    game = simulation.GameEngine(6, rng=game_rng(1, 0))
+    for seat in range(6):
+        game.add_player(f"player{seat}")
+    writer.record(game)
+    game.assignRoles()
+    simulation.play_rounds(game)
+    assert game.event_log is None and writer.engine is None
+
+
+def test_replay_sees_the_events_of_the_game():
+    for index in range(20):
+        writer = EventLogWriter(io.BytesIO())
+        game = simulation.GameEngine(10, rng=game_rng(5, index))
+        for seat in range(10):
+            game.add_player(f"player{seat}")
+            game.ai_difficulty[f"player{seat}"] = seat % 3
+        original, listen = event_trace()
+        game.add_listener(listen)
+        writer.record(game)
+        game.assignRoles()
+        simulation.play_rounds(game)
+        writer.close()
+
+        writer.out.seek(0)
+        records, = read_games(writer.out)
+        replayed, listen = event_trace()
+        replay = GameReplay(records, keyframe_interval=None)
+        replay.play([listen])
+        assert replayed == original # Phases, night results and deaths included, though none has a record of its own
+        seats = [(p.attribute, replay.engine.ai_difficulty[p.name]) for p in replay.engine.player_list]
+        assert seats == [(p.attribute, game.ai_difficulty[p.name]) for p in game.player_list]
+
+
+def test_version_1_deaths_read_into_the_records_that_imply_them():
+    vote, mafia = CAUSES.index("vote"), CAUSES.index("mafia")
+    raw = bytes((GAME_START, 3, VOTES, 2, 0, 1, 2, 1, DEATH, 1, vote, NIGHT_RESULT, 1, 2, DEATH, 2, mafia,
+                 GAME_OVER, 1))
+    data = zlib.compress(raw)
+    game, = read_games(io.BytesIO(SEGMENT_HEADER.pack(SEGMENT_MAGIC, 1, len(raw), len(data)) + data))
+    assert game == [(GAME_START, (3,)), (VOTES, (2, 0, 1, 2, 1, 1)), (NIGHT_RESULT, (1, 2)), (GAME_OVER, (1,))]
+    assert describe(*game[1]) == ("votes", {"ballots": {0: 1, 2: 1}, "eliminated": 1})
+    assert describe(VOTES, (0, NO_SEAT))[1]["eliminated"] == NO_SEAT
@@ -0,0 +1,26 @@
+'''
+test_player.py
+Description:
+    Checks the compact Player layout documented in player.py: no per-instance __dict__ and no
+    more than PLAYER_BYTES per Player, with role and status still readable as strings.
+'''
+
+from player import Player, PLAYER_BYTES, ROLE_MAFIA, player_size
+import sys
+
+
+def test_player_has_no_instance_dict():
+    assert not hasattr(Player("mafia", "p1"), "__dict__")
+
+
+def test_player_fits_documented_size():
+    player = Player("mafia", "p1")
+    assert sys.getsizeof(player) <= PLAYER_BYTES
+    assert player_size(player) == sys.getsizeof(player)
+
+
+def test_role_and_status_round_trip_through_codes():
+    player = Player("mafia", "p1")
+    assert player.role_code == ROLE_MAFIA and player.role == "mafia"
+    player.status = "dead"
+    assert player.alive is False and player.status == "dead"
@@ -0,0 +1,50 @@
+'''
+test_role_beliefs.py
+Description:
+    Checks that public evidence moves the hard AI's beliefs about the doctor and detective, not
+    only about the mafia: a mafia observer learns who votes against its allies and who gets saved.
+'''
+
+from gameEngine import GameEngine, DIFFICULTY_HARD
+from player import ROLE_MAFIA
+from roleBeliefs import DOCTOR, DETECTIVE
+from seeding import game_rng
+
+
+def hard_game(seed, num_players=10):
+    game = GameEngine(num_players, rng=game_rng(seed, 0))
+    for seat in range(num_players):
+        game.add_player(f"player{seat}")
+        game.ai_difficulty[f"player{seat}"] = DIFFICULTY_HARD
+    game.assignRoles()
+    return game
+
+
+def test_a_vote_against_an_ally_points_at_the_detective():
+    game = hard_game(1)
+    mafia = [p for p in game.player_list if p.role_code == ROLE_MAFIA]
+    voter = next(p for p in game.player_list if p.role_code != ROLE_MAFIA)
+    other = next(p for p in game.player_list if p.role_code != ROLE_MAFIA and p is not voter)
+    beliefs = game.role_beliefs()
+    observer = mafia[0]
+    votes = game.new_tally()
+    votes.cast(mafia[1].name, voter.name)
+    votes.cast(mafia[1].name, other.name)
+    votes.cast(voter.name, mafia[0].name)
+    before = beliefs.beliefs_of(observer)[DETECTIVE].copy()
+    game.resolve_day_votes(votes)
+    after = beliefs.beliefs_of(observer)[DETECTIVE]
+    assert after[game.player_list.index(voter)] > before[game.player_list.index(voter)]
+
+
+def test_a_save_points_at_the_doctor_or_detective():
+    game = hard_game(2)
+    observer = next(p for p in game.player_list if p.role_code == ROLE_MAFIA)
+    target = next(p for p in game.player_list if p.role_code != ROLE_MAFIA)
+    seat = game.player_list.index(target)
+    beliefs = game.role_beliefs()
+    before = beliefs.beliefs_of(observer)[[DOCTOR, DETECTIVE], seat].sum()
+    game.mafia_target = target.name
+    target.protected = True
+    assert game.resolve_night() == ("saved", target)
+    assert beliefs.beliefs_of(observer)[[DOCTOR, DETECTIVE], seat].sum() > before
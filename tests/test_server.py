@@ -0,0 +1,80 @@
+'''
+test_server.py
+Description:
+    Lobby server edge cases over real loopback connections: a client that stops reading is
+    disconnected instead of buffered without limit, and a failed join leaves the connection as
+    it was.
+'''
+
+from server import MafiaServer, MAX_BUFFERED_BYTES
+import asyncio
+import json
+
+
+async def connect(server):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    return reader, writer
+
+
+def send(writer, message):
+    writer.write((json.dumps(message) + "\n").encode())
+
+
+async def settle(condition, timeout=5.0):
+    """Wait until condition() holds (the server handles messages on the same loop)."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_client_that_stops_reading_is_disconnected():
+    async def run():
+        server = await MafiaServer(port=0).start()
+        try:
+            _, writer = await connect(server)
+            try:
+                send(writer, {"op": "join", "lobby": "slow", "name": "idle"})
+                await settle(lambda: "slow" in server.lobbies and server.lobbies["slow"].seats)
+                lobby = server.lobbies["slow"]
+                conn = lobby.seats["idle"]
+                # The client never reads: the kernel's socket buffers fill first (a few MB on loopback),
+                # then the rest waits in the transport until it passes the limit
+                chunk = b" " * MAX_BUFFERED_BYTES
+                for _ in range(256):
+                    conn.send_raw(chunk)
+                    if conn.writer.is_closing():
+                        break
+                assert conn.writer.is_closing()
+                assert conn.writer.transport.get_write_buffer_size() == 0 # Aborted, not left to flush
+                await settle(lambda: conn not in server.connections)
+                assert "slow" not in server.lobbies
+            finally:
+                writer.close()
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_failed_join_keeps_sync_flag():
+    async def run():
+        server = await MafiaServer(port=0).start()
+        try:
+            first_reader, first = await connect(server)
+            second_reader, second = await connect(server)
+            try:
+                send(first, {"op": "join", "lobby": "dup", "name": "alice"})
+                assert json.loads(await first_reader.readline())["type"] == "joined"
+                send(second, {"op": "join", "lobby": "dup", "name": "Alice", "sync": True})
+                assert json.loads(await second_reader.readline())["type"] == "error"
+                conn = next(c for c in server.connections if c.lobby is None)
+                assert conn.sync is False
+            finally:
+                first.close()
+                second.close()
+        finally:
+            await server.close()
+
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+'''
+test_snapshot.py
+Description:
+    Checks gameSnapshot round trips: a restored game plays on exactly like the original (same
+    draws, same AI decisions, hard AI beliefs included), and blobs in the older layouts (version 1
+    without the rng state, version 2 without the beliefs) still restore.
+'''
+
+from gameEngine import GameEngine, DIFFICULTY_EASY, DIFFICULTY_NORMAL, DIFFICULTY_HARD
+from gameSnapshot import snapshot, restore, HEADER, MAGIC, FORMAT_VERSION, RNG_STATE
+from seeding import game_rng
+import simulation
+import pytest
+
+
+def start_game(seed, levels):
+    """A seeded 10-player game played through its first day and night."""
+    game = GameEngine(10, rng=game_rng(seed, 0))
+    for seat in range(10):
+        game.add_player(f"player{seat}")
+        game.ai_difficulty[f"player{seat}"] = levels[seat % len(levels)]
+    game.assignRoles()
+    game.resolve_day_votes(game.ai_day_votes(game.get_alive_players()))
+    game.choose_mafia_target(game.ai_night_actions())
+    game.resolve_night()
+    return game
+
+
+def play_out(game):
+    """Play the game to the end; returns what a replay must match."""
+    deaths = []
+    game.add_listener(lambda event, data: deaths.append((data["player"].name, data["cause"])) if event == "player_died" else None)
+    rounds = simulation.play_rounds(game)
+    return game.winning_team, rounds, deaths
+
+
+def older(data, version):
+    """The same snapshot in an older layout: a game without beliefs ends with a one-byte beliefs
+    section (version 3) after its rng section (version 2), so dropping them gives the old blob."""
+    cut = 1 + (version < 2) * (1 + RNG_STATE.size)
+    return HEADER.pack(MAGIC, version) + data[HEADER.size:-cut]
+
+
+@pytest.mark.parametrize("levels", [(DIFFICULTY_EASY,), (DIFFICULTY_EASY, DIFFICULTY_NORMAL, DIFFICULTY_HARD), (DIFFICULTY_HARD,)])
+def test_restored_game_plays_on_identically(levels):
+    for seed in range(8):
+        game = start_game(seed, levels)
+        data = snapshot(game)
+        copy = restore(data)
+        assert snapshot(copy) == data
+        assert play_out(copy) == play_out(game)
+
+
+def test_version_2_blob_restores_and_plays_on():
+    game = start_game(1, (DIFFICULTY_EASY,))
+    data = snapshot(game)
+    assert play_out(restore(older(data, 2))) == play_out(restore(data))
+
+
+def test_version_1_blob_restores_the_table():
+    game = start_game(2, (DIFFICULTY_EASY,))
+    copy = restore(older(snapshot(game), 1))
+    assert [(p.name, p.role, p.alive, p.attribute) for p in copy.player_list] == \
+           [(p.name, p.role, p.alive, p.attribute) for p in game.player_list]
+    assert (copy.round_cycle, copy.ai_difficulty) == (game.round_cycle, game.ai_difficulty)
+
+
+def test_newer_versions_are_rejected():
+    data = snapshot(start_game(3, (DIFFICULTY_EASY,)))
+    with pytest.raises(ValueError):
+        restore(HEADER.pack(MAGIC, FORMAT_VERSION + 1) + data[HEADER.size:])
@@ -0,0 +1,58 @@
+'''
+test_tree_search.py
+Description:
+    Checks how the engine drives the expert AI's search: the phase of a pick comes from the
+    caller, not from engine.phase, the engine's search settings reach the TreeSearch, and the
+    search is closed when the game ends. Rollouts play on GameState forks, which must leave the
+    public position they came from alone.
+'''
+
+from gameEngine import GameEngine, DIFFICULTY_EXPERT
+from player import ROLE_VILLAGER, ROLE_MAFIA, ROLE_DOCTOR, ROLE_DETECTIVE
+from treeSearch import TreeSearch, DAY, NIGHT, play_phase
+from gameState import GameState
+from seeding import game_rng
+import simulation
+import random
+
+
+def expert_game(seed, num_players=7):
+    game = GameEngine(num_players, rng=game_rng(seed, 0))
+    for seat in range(num_players):
+        game.add_player(f"player{seat}")
+        game.ai_difficulty[f"player{seat}"] = DIFFICULTY_EXPERT
+    game.assignRoles()
+    game.search_budget = 0.002
+    return game
+
+
+def test_decision_takes_the_phase_from_the_caller():
+    game = expert_game(1)
+    assert game.phase is None # Like the GUI, which never calls start_phase
+    mafioso = next(p for p in game.player_list if p.role_code == ROLE_MAFIA)
+    others = [p for p in game.get_alive_players() if p is not mafioso]
+    search = TreeSearch()
+    assert search.decision(game, "mafia", mafioso, others, "day").phase == DAY
+    assert search.decision(game, "mafia", mafioso, others, "night").phase == NIGHT
+    assert search.decision(game, "detective", mafioso, others, "night") is None
+
+
+def test_search_uses_the_engine_settings_and_closes_at_game_over():
+    game = expert_game(2)
+    game.resolve_day_votes(game.ai_day_votes(game.get_alive_players()))
+    assert game.search.budget == 0.002 and game.search.workers == 1
+    simulation.play_rounds(game, random_events=False)
+    assert game.winning_team and game.search is None
+
+
+def test_rollouts_leave_the_position_alone():
+    root = GameState(range(7), [0] * 7, round_cycle=1, phase="day")
+    rng = random.Random(4)
+    for _ in range(50):
+        state = root.determinize([ROLE_MAFIA, ROLE_MAFIA] + [ROLE_VILLAGER] * 3 + [ROLE_DOCTOR, ROLE_DETECTIVE])
+        phase = DAY
+        while state.winner() is None:
+            play_phase(state, phase, 0, None, rng)
+            phase = NIGHT if phase == DAY else DAY
+        assert state.alive != root.alive
+    assert (root.alive, root.round_cycle, root.phase, root.votes, root.mafia_votes) == (0b1111111, 1, "day", {}, {})
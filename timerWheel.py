@@ -0,0 +1,92 @@
+'''
+timerWheel.py
+Description:
+    Hashed timing wheel: one scheduler for every phase deadline of every game the server hosts.
+    Time is cut into ticks (0.1 s by default) and the wheel is a ring of slots; a timer due at
+    tick t sits in slot t % num_slots, keyed by the timer itself, so
+        schedule   O(1)  (compute the slot, insert into its dict)
+        cancel     O(1)  (delete from that dict)
+        tick       O(timers in the slot), looking only at the one slot the tick lands on.
+    Timers further away than one lap stay in their slot and are skipped until their tick comes
+    round, so 100k pending deadlines cost nothing until they are due, and a cancelled deadline
+    (the usual case: the player acted in time) never costs anything more.
+
+    Timers fire up to one tick late, never early. Callbacks run on the thread that calls
+    advance(); run() drives the wheel from an asyncio loop, so for the server they run on the
+    event loop thread alongside the lobby code.
+'''
+
+import asyncio
+import math
+import time
+import traceback
+
+
+class Timer:
+    __slots__ = ("deadline", "slot", "callback", "args")
+
+    def __init__(self, deadline, slot, callback, args):
+        self.deadline = deadline # Tick the timer is due on
+        self.slot = slot
+        self.callback = callback
+        self.args = args
+
+
+class TimerWheel:
+    def __init__(self, tick=0.1, num_slots=512, clock=time.monotonic):
+        self.tick = tick # Seconds per tick
+        self.num_slots = num_slots
+        self.clock = clock
+        self.slots = [{} for _ in range(num_slots)] # Slot -> {Timer: None}
+        self.origin = clock()
+        self.current_tick = 0 # Last tick processed
+        self.pending = 0 # Timers scheduled and neither fired nor cancelled
+
+    def schedule(self, delay, callback, *args):
+        """Call callback(*args) once delay seconds have passed. Returns the Timer (for cancel)."""
+        # Ticks count from the last processed tick, so catch up with the clock first
+        now_tick = int((self.clock() - self.origin) / self.tick)
+        deadline = max(now_tick, self.current_tick) + max(1, math.ceil(delay / self.tick))
+        slot = deadline % self.num_slots
+        timer = Timer(deadline, slot, callback, args)
+        self.slots[slot][timer] = None
+        self.pending += 1
+        return timer
+
+    def cancel(self, timer):
+        """Stop a timer from firing. Cancelling a timer that already fired or was cancelled does nothing."""
+        if self.slots[timer.slot].pop(timer, 0) is None:
+            self.pending -= 1
+
+    def advance(self, now=None):
+        """Process every tick up to now, firing the timers that are due. Returns how many fired."""
+        target = int(((self.clock() if now is None else now) - self.origin) / self.tick)
+        fired = 0
+        while self.current_tick < target:
+            if not self.pending:
+                self.current_tick = target # Nothing scheduled; skip the idle ticks
+                break
+            self.current_tick += 1
+            slot = self.slots[self.current_tick % self.num_slots]
+            if not slot:
+                continue
+            due = [timer for timer in slot if timer.deadline <= self.current_tick]
+            for timer in due:
+                del slot[timer]
+            self.pending -= len(due)
+            for timer in due:
+                try:
+                    timer.callback(*timer.args)
+                except Exception:
+                    traceback.print_exc() # One failing callback must not stop the other deadlines
+            fired += len(due)
+        return fired
+
+    async def run(self):
+        """Advance the wheel every tick until the task is cancelled."""
+        while True:
+            await asyncio.sleep(self.tick)
+            self.advance()
+
+    def __len__(self):
+        return self.pending
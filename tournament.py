@@ -0,0 +1,303 @@
+'''
+tournament.py
+Description:
+    Round-robin tournament between AI policies, to tell whether a change to an AI makes it
+    stronger. Every ordered pair of registered policies (including a policy against itself)
+    plays --games games at each table size: one policy controls every mafia seat, the other
+    every town seat (villagers, doctor, detective). Each pairing is also played with the
+    sides swapped on the same games, because game i of a table size uses the random stream
+    seeding.game_rng(seed, players, i) whoever plays it, so both directions see the same seats
+    and role assignments. Games have no random events: they are luck, not skill. Work units
+    are spread over a ProcessPoolExecutor the way simulation.py does it.
+
+    Ratings are Elo (400 points = 10:1 odds, mean 1500) fitted to every game at once by maximum
+    likelihood with a side term: P(mafia policy M beats town policy T) = logistic(edge + M - T).
+    The mafia wins most games in this ruleset, so without the edge term a policy's rating would
+    depend on how often it played mafia. A weak prior (sd 1000 Elo) keeps a policy that wins or
+    loses every game finite. The 95% intervals come from a parametric bootstrap: each pairing's
+    mafia wins are redrawn from a binomial at the observed win rate and the ratings refitted.
+
+    Results are cached in a JSON file keyed by each side's policy version: a hash of the source
+    of the code that policy runs (POLICIES) together with the shared game rules (RULES_SOURCES).
+    Only pairings with a new or changed policy are played again, and asking for more games
+    plays only the extra games. The expert policy's search budget and workers (--search-budget,
+    --search-workers) change how well it plays, so they are part of the key of its pairings.
+
+Usage:
+    python tournament.py --policies easy,normal,hard --games 2000 --players 7,10
+    python tournament.py --policies easy,normal,hard,expert --games 200 --workers 8
+    python tournament.py --policies hard,expert --games 200 --search-budget 0.2 --search-workers 4
+    python -m mafia tournament --cache tournament.json --seed 7
+'''
+
+from gameEngine import GameEngine, DIFFICULTY_EASY, DIFFICULTY_NORMAL, DIFFICULTY_HARD, DIFFICULTY_EXPERT
+from player import ROLE_MAFIA
+from seeding import game_rng
+from simulation import play_rounds, chunk_sizes
+from treeSearch import DEFAULT_BUDGET
+from collections import namedtuple
+import numpy as np
+import argparse
+import hashlib
+import inspect
+import json
+import math
+import os
+import time
+
+
+Policy = namedtuple("Policy", ("difficulty", "sources")) # sources: functions/modules whose code the policy runs
+
+POLICIES = {} # Name -> Policy
+DEFAULT_POLICIES = "easy,normal,hard" # expert_ai searches for ~50 ms a move, so it only plays when asked for
+DEFAULT_SEED = 1 # Fixed so that reruns hit the cache
+DEFAULT_CACHE = "tournament_cache.json"
+CACHE_VERSION = 1
+ELO_SCALE = 400 / math.log(10) # Elo points per unit of log-odds
+ELO_MEAN = 1500
+PRIOR_SD = 1000 / ELO_SCALE # Weak prior on each rating (and the edge), in log-odds
+CONFIDENCE = 0.95
+
+
+def register_policy(name, difficulty, *sources):
+    """Add a policy to the tournament: the GameEngine difficulty level it plays with and the
+    functions or modules it runs, whose source makes up its version."""
+    POLICIES[name] = Policy(difficulty, sources)
+
+
+register_policy("easy", DIFFICULTY_EASY, GameEngine.easy_ai)
+register_policy("normal", DIFFICULTY_NORMAL, GameEngine.normal_ai, GameEngine.is_suspected_mafia)
+register_policy("hard", DIFFICULTY_HARD, GameEngine.hard_ai, GameEngine.role_beliefs, GameEngine.is_suspected_mafia,
+                "roleBeliefs")
+register_policy("expert", DIFFICULTY_EXPERT, GameEngine.expert_ai, "treeSearch", *POLICIES["hard"].sources)
+
+# Code every policy plays under: a change here replays every pairing
+RULES_SOURCES = (GameEngine.assignRoles, GameEngine.role_distribution, GameEngine.start_phase, GameEngine.resolve_day_votes,
+                 GameEngine.choose_mafia_target, GameEngine.protect_player, GameEngine.investigate, GameEngine.resolve_night,
+                 GameEngine.kill_player, GameEngine.check_win_conditions, GameEngine.ai_choice, GameEngine.ai_target,
+                 GameEngine.ai_day_votes, GameEngine.ai_night_actions, GameEngine.new_tally, GameEngine.as_tally,
+                 "player", "voteTally", "seeding", play_rounds)
+
+
+""" =============================================================== VERSIONS ======================================================================= """
+
+def source_hash(sources):
+    """Short hash of the source code of functions and modules (given as objects or module names)."""
+    digest = hashlib.blake2b(digest_size=6)
+    for source in sources:
+        if isinstance(source, str):
+            with open(inspect.getsourcefile(__import__(source)), "rb") as f:
+                digest.update(f.read())
+        else:
+            digest.update(inspect.getsource(source).encode())
+    return digest.hexdigest()
+
+
+def policy_versions(names):
+    """Name -> version of each policy, the shared rules included."""
+    rules = source_hash(RULES_SOURCES + (play_match,))
+    return {name: f"{source_hash(POLICIES[name].sources)}-{rules}" for name in names}
+
+
+def pairing_key(mafia, town, versions, num_players, seed, search_budget=None, search_workers=1):
+    """Cache key of one pairing at one table size. Pairings with an expert side also key on its search."""
+    key = f"{mafia}@{versions[mafia]} vs {town}@{versions[town]} | {num_players} players | seed {seed}"
+    if DIFFICULTY_EXPERT in (POLICIES[mafia].difficulty, POLICIES[town].difficulty):
+        key += f" | search {search_budget or DEFAULT_BUDGET:g}s x{search_workers}"
+    return key
+
+
+""" =============================================================== GAMES ======================================================================= """
+
+def play_match(num_players, mafia_level, town_level, rng, search_budget=None, search_workers=1):
+    """Play one game with every mafia seat at mafia_level and every town seat at town_level.
+    Returns 1 for a mafia win, 0 for a town win and 0.5 if neither side won."""
+    game = GameEngine(num_players, rng=rng)
+    game.search_budget, game.search_workers = search_budget, search_workers # Only the expert AI searches
+    for seat in range(num_players):
+        game.add_player(f"player{seat}")
+    game.assignRoles() # Roles come from rng alone, so both sides of a pairing get the same table
+    for player in game.player_list:
+        game.ai_difficulty[player.name] = mafia_level if player.role_code == ROLE_MAFIA else town_level
+    if max(mafia_level, town_level) >= DIFFICULTY_HARD:
+        game.role_beliefs() # assignRoles starts these for hard AI seats; the levels weren't known yet
+    play_rounds(game, random_events=False)
+    return {"Mafia": 1.0, "Village": 0.0}.get(game.winning_team, 0.5)
+
+
+def play_chunk(num_players, mafia_level, town_level, seed, first_game, num_games, search_budget=None, search_workers=1):
+    """Work unit for one worker: games first_game... of a pairing. Returns the mafia's wins."""
+    return sum(play_match(num_players, mafia_level, town_level, game_rng(seed, num_players, index), search_budget, search_workers)
+               for index in range(first_game, first_game + num_games))
+
+
+def load_cache(path):
+    """Cached results ({pairing key: {"games", "mafia_wins"}}), empty if there is no usable cache."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("results", {}) if data.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(path, results):
+    """Write the cache through a temporary file, so an interrupted run never leaves half a file."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"version": CACHE_VERSION, "results": results}, f, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def run_tournament(names, sizes, num_games, seed=DEFAULT_SEED, workers=None, cache_path=DEFAULT_CACHE, chunk_size=None,
+                   search_budget=None, search_workers=1):
+    """Play every ordered pairing of the named policies that the cache doesn't already hold.
+    search_budget and search_workers configure the expert policy's search.
+    Returns ({(mafia, town): [games, mafia_wins]} over all table sizes, games played, wall-clock seconds)."""
+    workers = workers or os.cpu_count() or 1
+    versions = policy_versions(names)
+    cache = load_cache(cache_path) if cache_path else {}
+    pairings = [(mafia, town, num_players) for mafia in names for town in names for num_players in sizes]
+    # Games each pairing is missing, as (key, num_players, mafia level, town level, first game, count) work units
+    missing = []
+    for mafia, town, num_players in pairings:
+        key = pairing_key(mafia, town, versions, num_players, seed, search_budget, search_workers)
+        done = cache.setdefault(key, {"games": 0, "mafia_wins": 0.0})["games"]
+        if done < num_games:
+            missing.append((key, num_players, POLICIES[mafia].difficulty, POLICIES[town].difficulty, done, num_games - done))
+    total_missing = sum(unit[-1] for unit in missing)
+    chunk_size = chunk_size or max(1, min(1000, total_missing // (workers * 8))) # ~8 units per worker over the whole run
+    units = []
+    for key, num_players, mafia_level, town_level, first, count in missing:
+        for games in chunk_sizes(count, workers, chunk_size):
+            units.append((key, (num_players, mafia_level, town_level, seed, first, games, search_budget, search_workers)))
+            first += games
+
+    def collect(key, args, mafia_wins):
+        # Units of a key finish in order, so the cache always holds games 0..n-1 of a pairing
+        cache[key]["games"] += args[5]
+        cache[key]["mafia_wins"] += mafia_wins
+
+    start = time.perf_counter()
+    try:
+        if workers == 1 or len(units) <= 1:
+            for key, args in units:
+                collect(key, args, play_chunk(*args))
+        else:
+            # Imported here, as in simulation.py
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for (key, args), mafia_wins in zip(units, pool.map(play_chunk, *zip(*(args for _, args in units)))):
+                    collect(key, args, mafia_wins)
+    finally:
+        if cache_path:
+            save_cache(cache_path, cache)
+
+    results = {}
+    for mafia, town, num_players in pairings:
+        entry = cache[pairing_key(mafia, town, versions, num_players, seed, search_budget, search_workers)]
+        totals = results.setdefault((mafia, town), [0, 0.0])
+        totals[0] += entry["games"]
+        totals[1] += entry["mafia_wins"]
+    return results, total_missing, time.perf_counter() - start
+
+
+""" =============================================================== RATINGS ======================================================================= """
+
+def fit_ratings(names, games, mafia_wins, rows, columns):
+    """Maximum likelihood ratings (log-odds) and the mafia edge for each set of wins.
+    games (pairings,) and mafia_wins (samples, pairings); pairing j is rows[j] as mafia vs
+    columns[j] as town. Returns ratings (samples, policies) centred on 0 and edges (samples,)."""
+    pairings = len(games)
+    design = np.zeros((pairings, len(names) + 1)) # Columns: one per policy, then the mafia edge
+    design[np.arange(pairings), rows] += 1.0
+    design[np.arange(pairings), columns] -= 1.0
+    design[:, -1] = 1.0
+    precision = np.eye(len(names) + 1) / PRIOR_SD ** 2
+    theta = np.zeros((len(mafia_wins), len(names) + 1))
+    for _ in range(50):
+        # Newton steps for every sample at once
+        p = 1.0 / (1.0 + np.exp(-theta @ design.T)) # (samples, pairings)
+        gradient = (mafia_wins - games * p) @ design - theta @ precision
+        weights = games * p * (1.0 - p)
+        hessian = np.einsum("sj,jk,jl->skl", weights, design, design) + precision
+        step = np.linalg.solve(hessian, gradient[..., None])[..., 0]
+        theta += step
+        if np.abs(step).max() < 1e-9:
+            break
+    ratings = theta[:, :-1]
+    return ratings - ratings.mean(axis=1, keepdims=True), theta[:, -1]
+
+
+def elo_ratings(results, names, samples=1000, seed=DEFAULT_SEED):
+    """{name: (elo, low, high)} with the CONFIDENCE interval, and the mafia edge in Elo points."""
+    pairs = list(results)
+    index = {name: i for i, name in enumerate(names)}
+    rows = np.array([index[mafia] for mafia, _ in pairs])
+    columns = np.array([index[town] for _, town in pairs])
+    games = np.array([results[pair][0] for pair in pairs], dtype=float)
+    wins = np.array([results[pair][1] for pair in pairs], dtype=float)
+    ratings, edge = fit_ratings(names, games, wins[None, :], rows, columns)
+    rates = np.divide(wins, games, out=np.zeros_like(wins), where=games > 0)
+    resampled = np.random.default_rng(seed).binomial(games.astype(np.int64), rates, size=(samples, len(pairs)))
+    boot, _ = fit_ratings(names, games, resampled.astype(float), rows, columns)
+    tail = (1 - CONFIDENCE) / 2 * 100
+    low, high = np.percentile(boot, [tail, 100 - tail], axis=0)
+    ratings = {name: (ELO_MEAN + ELO_SCALE * ratings[0, i], ELO_MEAN + ELO_SCALE * low[i], ELO_MEAN + ELO_SCALE * high[i])
+               for name, i in index.items()}
+    return ratings, ELO_SCALE * edge[0]
+
+
+def format_report(results, names, ratings, edge, versions, played, wall_time):
+    """Ratings table (best first) and each pairing's mafia win rate."""
+    cached = sum(games for games, _ in results.values()) - played
+    lines = [f"Games played: {played} in {wall_time:.2f}s" + (f" ({cached} more from the cache)" if cached else "")]
+    lines.append(f"  Mafia edge: {edge:+.0f} Elo")
+    lines.append(f"  {'policy':<10} {'version':<27} {'Elo':>6}   {CONFIDENCE:.0%} interval   games")
+    for name in sorted(names, key=lambda name: -ratings[name][0]):
+        elo, low, high = ratings[name]
+        games = sum(results[pair][0] for pair in results if name in pair and pair[0] != pair[1])
+        lines.append(f"  {name:<10} {versions[name]:<27} {elo:>6.0f}   [{low:.0f}, {high:.0f}]   {games}")
+    lines.append("  Mafia win rate (rows: mafia policy, columns: town policy):")
+    lines.append("  " + " " * 10 + "".join(f"{town:>10}" for town in names))
+    for mafia in names:
+        cells = "".join(f"{results[mafia, town][1] / results[mafia, town][0]:>10.1%}" if results[mafia, town][0] else f"{'-':>10}"
+                        for town in names)
+        lines.append(f"  {mafia:<10}{cells}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play AI policies against each other and rate them with Elo.")
+    parser.add_argument("--policies", default=DEFAULT_POLICIES, help=f"Comma-separated policies ({', '.join(POLICIES)})")
+    parser.add_argument("--games", type=int, default=1000, help="Games per pairing and table size")
+    parser.add_argument("--players", default="7,10", help="Comma-separated table sizes")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Root seed of the games (cached results are per seed)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Games per work unit")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="Results cache file")
+    parser.add_argument("--no-cache", action="store_true", help="Play every game and leave the cache alone")
+    parser.add_argument("--search-budget", type=float, default=None, help=f"Seconds the expert policy searches per decision (default: {DEFAULT_BUDGET:g})")
+    parser.add_argument("--search-workers", type=int, default=1, help="Processes searching each expert decision")
+    parser.add_argument("--bootstrap", type=int, default=1000, help="Bootstrap samples for the confidence intervals")
+    args = parser.parse_args(argv)
+
+    names = [name.strip().lower() for name in args.policies.split(",") if name.strip()]
+    unknown = [name for name in names if name not in POLICIES]
+    if unknown:
+        parser.error(f"Unknown policy '{unknown[0]}'. Choose from: {', '.join(POLICIES)}")
+    if len(set(names)) < 2:
+        parser.error("A tournament needs at least two policies.")
+    names = list(dict.fromkeys(names))
+    sizes = [int(size) for size in args.players.split(",")]
+    if min(sizes) < 3:
+        parser.error("A game needs at least 3 players.")
+    results, played, wall_time = run_tournament(names, sizes, args.games, args.seed, args.workers,
+                                                None if args.no_cache else args.cache, args.chunk_size,
+                                                args.search_budget, args.search_workers)
+    ratings, edge = elo_ratings(results, names, args.bootstrap, args.seed)
+    print(format_report(results, names, ratings, edge, policy_versions(names), played, wall_time))
+
+
+if __name__ == "__main__":
+    main()
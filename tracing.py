@@ -0,0 +1,159 @@
+'''
+tracing.py
+Description:
+    Optional span tracing for a single slow session. Spans are recorded around the Tk callbacks
+    (handle_main_menu, start_role_call, show_player_role, transition_screen, the phase methods),
+    widget teardown in clear_frame, image decoding and the engine's AI and resolution steps, and
+    are written as a Chrome trace (JSON "traceEvents" of complete "X" events). Open the file in
+    chrome://tracing or https://ui.perfetto.dev; spans on the same thread nest by time.
+
+    Tracing is off by default and costs one attribute check per traced call while off. Sampling
+    is decided once per top-level span (a callback from the Tk loop, or an engine step called
+    directly): with sample_rate=0.1 one callback in ten is recorded together with everything it
+    calls, so traces stay complete while the volume stays low under load. max_events bounds the
+    buffer; spans past it are counted in `dropped` instead of recorded.
+
+Usage:
+    MAFIA_TRACE=trace.json MAFIA_TRACE_SAMPLE=0.25 python main.py
+    or in code: tracing.configure("trace.json", sample_rate=0.25)
+'''
+
+from functools import wraps
+import atexit
+import os
+import random
+import threading
+import time
+
+
+class Span:
+    """Context manager for one traced span. Only sampled spans are recorded."""
+    __slots__ = ("tracer", "name", "cat", "args", "start", "sampled")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.sampled = self.tracer._push()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.tracer._pop()
+        if self.sampled:
+            self.tracer._record(self.name, self.cat, self.start, end, self.args)
+        return False
+
+
+class Tracer:
+    def __init__(self, enabled=False, sample_rate=1.0, max_events=1_000_000):
+        self.enabled = enabled
+        self.sample_rate = sample_rate # Fraction of top-level spans recorded (with all their children)
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0 # Sampled spans not recorded because the buffer was full
+        self.pid = os.getpid()
+        self._origin = time.perf_counter_ns()
+        self._local = threading.local() # Per-thread stack of the enclosing spans' sampling decisions
+        self._sampler = random.Random() # Kept apart from the game's random stream
+        self._lock = threading.Lock()
+
+    def span(self, name, cat="game", **args):
+        """Context manager timing the enclosed block as one span."""
+        return Span(self, name, cat, args)
+
+    def _push(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        if stack:
+            sampled = stack[-1]
+        else:
+            sampled = self.enabled and (self.sample_rate >= 1.0 or self._sampler.random() < self.sample_rate)
+        stack.append(sampled)
+        return sampled
+
+    def _pop(self):
+        self._local.stack.pop()
+
+    def _record(self, name, cat, start, end, args):
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start - self._origin) / 1000, # Microseconds, as the trace format expects
+            "dur": (end - start) / 1000,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        with self._lock:
+            if len(self.events) < self.max_events:
+                self.events.append(event)
+            else:
+                self.dropped += 1
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+            self.dropped = 0
+
+    def to_chrome_trace(self):
+        """The recorded spans as a Chrome trace dict."""
+        with self._lock:
+            events = list(self.events)
+        threads = {event["tid"] for event in events}
+        metadata = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                     "args": {"name": "main" if tid == threading.main_thread().ident else f"thread-{tid}"}}
+                    for tid in threads]
+        return {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"sample_rate": self.sample_rate, "dropped": self.dropped},
+        }
+
+    def write(self, path):
+        """Write the trace to path as JSON."""
+        import json # Only needed when a trace is written; keeps it off the startup path
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+tracer = Tracer()
+
+
+def configure(path=None, sample_rate=1.0, max_events=1_000_000):
+    """Turn tracing on. With a path the trace is written there when the program exits."""
+    tracer.enabled = True
+    tracer.sample_rate = sample_rate
+    tracer.max_events = max_events
+    if path:
+        atexit.register(tracer.write, path)
+
+
+def disable():
+    tracer.enabled = False
+
+
+def traced(cat="game", name=None):
+    """Decorator recording every call as a span (named after the function unless name is given)."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(tracer, span_name, cat, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+if os.environ.get("MAFIA_TRACE"):
+    configure(os.environ["MAFIA_TRACE"], float(os.environ.get("MAFIA_TRACE_SAMPLE", "1.0")))
@@ -0,0 +1,341 @@
+'''
+treeSearch.py
+Description:
+    Information-set Monte Carlo tree search (ISMCTS) behind the expert AI (DIFFICULTY_EXPERT).
+    The AI can't see the other players' roles, so every iteration first samples a role
+    assignment consistent with what it knows: its own role, its allies if it is mafia, and the
+    beliefs the hard AI keeps (roleBeliefs.py) for everyone else (a uniform spread without them).
+    That determinized game is a fork of the public position (gameState.py: bitsets and seat
+    numbers, no events or Player objects), played out by GameState's rules:
+        selection   at each of the AI's own decisions seen before, UCB1 over the moves that are
+                    legal in this sample (ISMCTS counts how often each move was available),
+                    plus a progressive bias towards the move the hard AI's beliefs favour
+                    that fades as the move gets visits
+        expansion   the first unseen decision gets a node and its likeliest untried move
+        rollout     everyone plays randomly to the end of the game (the mafia never targets an
+                    ally), except that town votes lean towards the real mafia, as informed towns do
+        backprop    1 for a win of the AI's team, 0 for a loss, on every (node, move) visited
+    The AI's move at each phase changes who is alive; the other players' moves are sampled.
+
+    Nodes are keyed by a Zobrist hash of the public position (alive seats, phase, round), XORed
+    incrementally as players die, so positions reached by different move orders (A dies then B,
+    or B then A) share one node and its statistics.
+
+    The search is anytime: it iterates until the per-decision budget (50 ms by default) runs out
+    and then plays the most visited move, so a decision takes the budget whatever the table size.
+    The move the hard AI's beliefs favour stands, though, unless the searched move's win rate
+    beats it by MARGIN standard errors: most of a small visit gap is rollout noise.
+    With workers > 1 (or a pool) each worker searches its own samples for the same budget and the
+    root statistics are summed (root parallelization). Decisions that don't change the position
+    (the detective's investigation) are left to hard_ai, as are random events (not modeled).
+'''
+
+from player import ROLE_VILLAGER, ROLE_MAFIA, ROLE_DOCTOR, ROLE_DETECTIVE
+from gameState import GameState
+import math
+import random
+import time
+
+
+DEFAULT_BUDGET = 0.05 # Seconds per decision
+EXPLORATION = 0.7 # UCB1 exploration constant (rewards are 0 or 1)
+BIAS = 1.0 # Weight of the belief prior in selection, divided by the move's visits + 1
+MAX_ROUNDS = 64 # Rollouts that last longer count as a draw
+DAY, NIGHT = 0, 1
+KNOWN = 0.999 # A belief at least this strong is taken as certain
+TOWN_INFORMED = 0.15 # Chance a rollout town member votes for a real mafia member (the town votes on its beliefs)
+DETECTIVE_INFORMED = 0.5 # The same for the detective, who investigates
+MARGIN = 2.0 # Standard errors by which a move must beat the beliefs' favourite to be played instead
+
+# Zobrist keys. Drawn from a fixed seed so every worker process hashes positions the same way.
+_key_rng = random.Random(0x5EED)
+SEAT_KEYS = [] # Seat -> key XORed in while that seat is alive
+PHASE_KEY = _key_rng.getrandbits(64) # XORed in at night
+ROUND_KEYS = [_key_rng.getrandbits(64) for _ in range(MAX_ROUNDS + 2)]
+
+
+def seat_keys(num_seats):
+    """Zobrist keys for the seats of a table, extended (always in the same order) as tables grow."""
+    while len(SEAT_KEYS) < num_seats:
+        SEAT_KEYS.append(_key_rng.getrandbits(64))
+    return SEAT_KEYS
+
+
+def position_hash(alive, phase, round_cycle):
+    keys = seat_keys(len(alive))
+    h = (PHASE_KEY if phase == NIGHT else 0) ^ ROUND_KEYS[min(round_cycle, MAX_ROUNDS + 1)]
+    for seat, is_alive in enumerate(alive):
+        if is_alive:
+            h ^= keys[seat]
+    return h
+
+
+class Decision:
+    """One decision of the AI, as plain data (so it can be sent to worker processes)."""
+    __slots__ = ("observer", "role", "team", "candidates", "alive", "phase", "round", "counts", "beliefs")
+
+    def __init__(self, observer, role, team, candidates, alive, phase, round_cycle, counts, beliefs):
+        self.observer = observer # Seat of the AI player
+        self.role = role # The AI's role code
+        self.team = team # ROLE_MAFIA or ROLE_VILLAGER (the village team)
+        self.candidates = candidates # Seats the AI may pick
+        self.alive = alive # Alive flag per seat
+        self.phase = phase
+        self.round = round_cycle
+        self.counts = counts # Role code -> players with that role
+        self.beliefs = beliefs # Per seat, P(role) for role codes 1-4 as seen by the AI
+
+    def __getstate__(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+""" =============================================================== ROLLOUT ENGINE ======================================================================= """
+
+
+def sample_roles(decision, rng):
+    """A role per seat drawn from the AI's beliefs: certain roles first, then the rest of each
+    role's count without replacement, weighted by how likely each open seat is to have it."""
+    beliefs = decision.beliefs
+    roles = [0] * len(beliefs)
+    remaining = dict(decision.counts)
+    for seat, row in enumerate(beliefs):
+        for code in (ROLE_MAFIA, ROLE_DOCTOR, ROLE_DETECTIVE, ROLE_VILLAGER):
+            if row[code - 1] >= KNOWN and remaining[code] > 0:
+                roles[seat] = code
+                remaining[code] -= 1
+                break
+    open_seats = [seat for seat, role in enumerate(roles) if not role]
+    for code in (ROLE_MAFIA, ROLE_DOCTOR, ROLE_DETECTIVE):
+        for _ in range(min(remaining[code], len(open_seats))):
+            weights = [beliefs[seat][code - 1] + 1e-9 for seat in open_seats]
+            pick = rng.random() * sum(weights)
+            for index, weight in enumerate(weights):
+                pick -= weight
+                if pick <= 0:
+                    break
+            roles[open_seats.pop(index)] = code
+    for seat in open_seats:
+        roles[seat] = ROLE_VILLAGER
+    return roles
+
+
+def play_phase(state, phase, observer, move, rng):
+    """Play one phase of a determinized game (a GameState) with random players, the observer
+    playing move (None = random too). Town voters sometimes vote for a real mafia member, as
+    towns that vote on what they have learned do. Returns the seat that died, or None."""
+    living = state.alive_seats()
+    roles = state.roles
+    town = [seat for seat in living if roles[seat] != ROLE_MAFIA] # The mafia's picks (never an ally)
+    mafia = [seat for seat in living if roles[seat] == ROLE_MAFIA]
+    choice = rng.choice
+    ballots = {}
+    if phase == DAY:
+        for seat in living:
+            if seat == observer and move is not None:
+                target = move
+            elif roles[seat] == ROLE_MAFIA:
+                target = choice(town)
+            elif mafia and rng.random() < (DETECTIVE_INFORMED if roles[seat] == ROLE_DETECTIVE else TOWN_INFORMED):
+                target = choice(mafia)
+            else:
+                target = choice(living) # Redraw on itself: a uniform pick of another player without a list per voter
+                while target == seat:
+                    target = choice(living)
+            ballots[seat] = target
+        state.cast(ballots)
+        return state.resolve_day(rng)
+    for seat in living:
+        if roles[seat] == ROLE_MAFIA:
+            ballots[seat] = move if seat == observer and move is not None else choice(town)
+        elif roles[seat] == ROLE_DOCTOR:
+            state.protect(move if seat == observer and move is not None else choice(living))
+    state.cast(ballots, mafia=True)
+    outcome, target = state.resolve_night(rng)
+    return target if outcome == "killed" else None
+
+
+def move_prior(decision, phase, seat):
+    """How good the AI's beliefs say a move is, in [0, 1] (the hard AI's targeting, roleBeliefs.py)."""
+    row = decision.beliefs[seat]
+    if decision.role == ROLE_MAFIA:
+        return row[ROLE_DOCTOR - 1] + row[ROLE_DETECTIVE - 1] # The village's special roles
+    if phase == DAY:
+        return row[ROLE_MAFIA - 1]
+    return (row[ROLE_DETECTIVE - 1] + 1.0 - row[ROLE_MAFIA - 1]) / 2 # The doctor guards the likely detective
+
+
+def observer_moves(state, phase, observer):
+    """The observer's legal moves this phase (None if it has no move that changes the position)."""
+    if not state.is_alive(observer):
+        return None
+    roles = state.roles
+    role = roles[observer]
+    if phase == DAY:
+        return [seat for seat in state.alive_seats() if seat != observer]
+    if role == ROLE_MAFIA:
+        return [seat for seat in state.alive_seats() if roles[seat] != ROLE_MAFIA]
+    if role == ROLE_DOCTOR:
+        return state.alive_seats()
+    return None
+
+
+""" =============================================================== SEARCH ======================================================================= """
+
+
+def search(decision, budget, seed=None):
+    """Run ISMCTS on one decision for budget seconds. Returns the root statistics
+    {move: [wins, visits]} and the number of iterations."""
+    deadline = time.perf_counter() + budget
+    rng = random.Random(seed)
+    keys = seat_keys(len(decision.alive))
+    table = {} # Position hash -> {move: [wins, visits, times available, prior]}
+    root_hash = position_hash(decision.alive, decision.phase, decision.round)
+    # The public position; each iteration forks it with sampled roles (unknown, 0, until then)
+    root = GameState(range(len(decision.alive)), [0] * len(decision.alive),
+                     sum(1 << seat for seat, is_alive in enumerate(decision.alive) if is_alive),
+                     decision.round, "day" if decision.phase == DAY else "night")
+    observer = decision.observer
+    team = "Mafia" if decision.team == ROLE_MAFIA else "Village"
+    iterations = 0
+    while iterations == 0 or time.perf_counter() < deadline:
+        iterations += 1
+        state = root.determinize(sample_roles(decision, rng))
+        phase, h = decision.phase, root_hash
+        path = []
+        in_tree, at_root = True, True
+        result = None
+        while True:
+            moves = decision.candidates if at_root else observer_moves(state, phase, observer)
+            at_root = False
+            move = None
+            if moves and in_tree:
+                node = table.get(h)
+                if node is None:
+                    node = table[h] = {}
+                    in_tree = False # Expand this node, then roll out
+                for candidate in moves:
+                    stats = node.get(candidate)
+                    if stats is None:
+                        stats = node[candidate] = [0.0, 0, 0, move_prior(decision, phase, candidate)]
+                    stats[2] += 1
+                untried = [candidate for candidate in moves if node[candidate][1] == 0]
+                if untried:
+                    move = max(untried, key=lambda m: (node[m][3], rng.random()))
+                    in_tree = False
+                else:
+                    move = max(moves, key=lambda m: node[m][0] / node[m][1] + EXPLORATION * math.sqrt(math.log(node[m][2]) / node[m][1])
+                               + BIAS * node[m][3] / (node[m][1] + 1))
+                path.append(node[move])
+            victim = play_phase(state, phase, observer, move, rng)
+            if victim is not None:
+                h ^= keys[victim]
+            result = state.winner()
+            if result:
+                break
+            if phase == NIGHT:
+                round_cycle = state.round_cycle
+                if round_cycle > decision.round + MAX_ROUNDS:
+                    break
+                h ^= ROUND_KEYS[min(round_cycle - 1, MAX_ROUNDS + 1)] ^ ROUND_KEYS[min(round_cycle, MAX_ROUNDS + 1)]
+            phase = NIGHT if phase == DAY else DAY
+            h ^= PHASE_KEY
+        reward = 1.0 if result == team else 0.0 if result else 0.5
+        for stats in path:
+            stats[0] += reward
+            stats[1] += 1
+    root = table.get(root_hash, {})
+    return {move: stats[:2] for move, stats in root.items() if move in decision.candidates}, iterations
+
+
+def beats(stats, other):
+    """Whether a move's [wins, visits] beat another's by MARGIN standard errors of the difference."""
+    (wins, visits), (other_wins, other_visits) = stats, other
+    if not visits or not other_visits:
+        return False
+    mean, other_mean = wins / visits, other_wins / other_visits
+    pooled = (wins + other_wins) / (visits + other_visits)
+    error = math.sqrt(pooled * (1.0 - pooled) * (1.0 / visits + 1.0 / other_visits))
+    return mean - other_mean > MARGIN * error
+
+
+class TreeSearch:
+    def __init__(self, budget=DEFAULT_BUDGET, workers=1, pool=None):
+        self.budget = budget # Seconds per decision
+        self.workers = workers # Searches run side by side (each in its own process) and merged
+        self.pool = pool # Executor for the workers; created on first use if workers > 1 and none is given
+        self._own_pool = False
+        self.iterations = 0 # Iterations of the last decision, summed over workers
+
+    def decision(self, engine, role, player, cur_list, phase):
+        """The Decision for an AI player's pick in phase ("day" or "night"), or None if the search
+        doesn't model it."""
+        if phase == "night" and not (role == "mafia" and player.role_code == ROLE_MAFIA or
+                                     role == "doctor" and player.role_code == ROLE_DOCTOR):
+            return None # The detective's pick changes what it knows, not the position
+        players = engine.player_list
+        seat = {p: index for index, p in enumerate(players)}
+        distribution = engine.role_distribution()
+        beliefs = engine.role_beliefs()
+        if beliefs is not None:
+            rows = beliefs.beliefs_of(player).T.tolist()
+        else:
+            # Without NumPy: the AI knows its own role (and its allies), the rest is spread evenly
+            rows = [[0.25] * 4 for _ in players]
+            for p in players:
+                if p is player or (player.role_code == ROLE_MAFIA and p.role_code == ROLE_MAFIA):
+                    rows[seat[p]] = [1.0 if code == p.role_code else 0.0 for code in range(1, 5)]
+        team = ROLE_MAFIA if player.role_code == ROLE_MAFIA else ROLE_VILLAGER
+        counts = {ROLE_VILLAGER: distribution["villager"], ROLE_MAFIA: distribution["mafia"],
+                  ROLE_DOCTOR: distribution["doctor"], ROLE_DETECTIVE: distribution["detective"]}
+        return Decision(seat[player], player.role_code, team, [seat[p] for p in cur_list], [p.alive for p in players],
+                        DAY if phase == "day" else NIGHT, engine.round_cycle, counts, rows)
+
+    def choose(self, engine, role, player, cur_list, phase):
+        """The most visited move of a search on this pick (the beliefs' favourite unless the search
+        is sure it does better), or None if the search doesn't model it."""
+        decision = self.decision(engine, role, player, cur_list, phase)
+        if decision is None or not cur_list:
+            return None
+        seed = engine.rng.getrandbits(64)
+        if self.workers > 1 or self.pool is not None:
+            results = self.search_parallel(decision, seed)
+        else:
+            results = [search(decision, self.budget, seed)]
+        totals = {}
+        self.iterations = 0
+        for root, iterations in results:
+            self.iterations += iterations
+            for move, (wins, visits) in root.items():
+                total = totals.setdefault(move, [0.0, 0])
+                total[0] += wins
+                total[1] += visits
+        if not totals:
+            return None
+        best = max(totals, key=lambda move: (totals[move][1], totals[move][0]))
+        # The hard AI's move (the beliefs' favourite) stands unless the search is sure it does worse:
+        # a single ballot barely moves a random rollout, so most of the visit gap is noise
+        priors = {move: move_prior(decision, decision.phase, move) for move in totals}
+        top = max(priors.values())
+        favourite = max((move for move in totals if priors[move] >= top - 1e-9), key=lambda move: totals[move][1])
+        if best != favourite and not beats(totals[best], totals[favourite]):
+            best = favourite
+        return engine.player_list[best]
+
+    def search_parallel(self, decision, seed):
+        if self.pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._own_pool = True
+        # Leave a little of the budget for sending the decision and the statistics back
+        futures = [self.pool.submit(search, decision, self.budget * 0.9, seed + index) for index in range(max(self.workers, 1))]
+        return [future.result() for future in futures]
+
+    def close(self):
+        if self._own_pool:
+            self.pool.shutdown()
+            self.pool = None
+            self._own_pool = False
@@ -0,0 +1,131 @@
+'''
+voteTally.py
+Description:
+    VoteTally is the one plurality tally used for every vote in the game: the day vote, the
+    multiplayer hot-seat vote and the mafia's night vote. It tracks the current leader and the
+    tied set as each ballot arrives, so the live standings can be read in O(1) after every vote
+    without recounting. Ballots cast with a voter can be changed or retracted.
+
+    Ties are settled by a pluggable tie-break policy: any callable that takes the list of tied
+    candidates and returns one of them. random_tie_break(rng) picks uniformly with the given
+    random.Random (or the global random module), so a seeded RNG makes the outcome reproducible;
+    first_tie_break picks the candidate that reached the top count first. arrival_order() and
+    VoteTally.restore save and rebuild a tally with that order intact (gameSnapshot.py).
+'''
+
+import random
+
+
+def random_tie_break(rng=random):
+    """Tie-break policy that picks uniformly among the tied candidates using rng."""
+    return rng.choice
+
+
+def first_tie_break(tied):
+    """Tie-break policy that picks the candidate that reached the top count first."""
+    return tied[0]
+
+
+class VoteTally:
+    def __init__(self, tie_break=None):
+        self.tie_break = tie_break or random_tie_break() # Called with the tied candidates
+        self.counts = {} # candidate -> votes
+        self.ballots = {} # voter -> candidate, for ballots that can be changed or retracted
+        self.total = 0 # Number of votes currently counted
+        self.top = 0 # Highest vote count
+        self._by_count = {} # count -> candidates with that count (dict keys keep arrival order)
+
+    @classmethod
+    def from_counts(cls, counts, tie_break=None):
+        """Build a tally from an existing {candidate: count} dict."""
+        tally = cls(tie_break)
+        for candidate, count in counts.items():
+            for _ in range(count):
+                tally.cast(candidate)
+        return tally
+
+    @classmethod
+    def restore(cls, counts, ballots, order, tie_break=None):
+        """Rebuild a tally exactly, tie order included, from its counts, ballots and arrival_order()."""
+        tally = cls(tie_break)
+        tally.counts = dict(counts)
+        tally.ballots = dict(ballots)
+        tally.total = sum(tally.counts.values())
+        tally.top = max(tally.counts.values(), default=0)
+        for candidate in order:
+            tally._by_count.setdefault(tally.counts[candidate], {})[candidate] = None
+        return tally
+
+    def _move(self, candidate, old, new):
+        """Move a candidate between count buckets and keep top current. Counts only change by one."""
+        if old:
+            bucket = self._by_count[old]
+            del bucket[candidate]
+            if not bucket:
+                del self._by_count[old]
+        if new:
+            self._by_count.setdefault(new, {})[candidate] = None
+            self.counts[candidate] = new
+        else:
+            del self.counts[candidate]
+        if new > self.top:
+            self.top = new
+        elif old == self.top and old not in self._by_count:
+            # The only leader lost a vote; it now sits in the bucket just below
+            self.top = old - 1
+
+    def cast(self, candidate, voter=None):
+        """Count a vote for candidate. If this voter already voted, their old ballot is replaced."""
+        if voter is not None:
+            if voter in self.ballots:
+                self.retract(voter)
+            self.ballots[voter] = candidate
+        old = self.counts.get(candidate, 0)
+        self._move(candidate, old, old + 1)
+        self.total += 1
+
+    def retract(self, voter):
+        """Withdraw a voter's ballot. Returns the candidate they had voted for, or None."""
+        candidate = self.ballots.pop(voter, None)
+        if candidate is not None:
+            old = self.counts[candidate]
+            self._move(candidate, old, old - 1)
+            self.total -= 1
+        return candidate
+
+    def tied(self):
+        """Candidates that share the highest count (the leader alone if there is no tie)."""
+        return list(self._by_count.get(self.top, ()))
+
+    def leader(self):
+        """A current leader without breaking ties (the first to reach the top count), or None."""
+        return next(iter(self._by_count.get(self.top, ())), None)
+
+    def winner(self):
+        """The plurality winner, ties settled by the tie-break policy. None if nobody has voted."""
+        tied = self.tied()
+        if not tied:
+            return None
+        return tied[0] if len(tied) == 1 else self.tie_break(tied)
+
+    def arrival_order(self):
+        """Every candidate, grouped by count, each group in the order its candidates reached that count."""
+        return [candidate for bucket in self._by_count.values() for candidate in bucket]
+
+    def get(self, candidate, default=0):
+        return self.counts.get(candidate, default)
+
+    def items(self):
+        return self.counts.items()
+
+    def __contains__(self, candidate):
+        return candidate in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __bool__(self):
+        return self.total > 0
+
+    def __repr__(self):
+        return repr(self.counts)